@@ -1,13 +1,268 @@
+import copy
 import json
-import boto3
-from typing import List, Dict, Any, Optional
+import time
+import random
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 
 
-network_manager = boto3.client('networkmanager')
+# Created on first use and reused across warm invocations; see _get_network_manager()
+_network_manager = None
+_network_manager_lock = threading.Lock()
+
+
+ROUTE_FETCH_WORKERS = 8
+ROUTE_FETCH_MAX_RETRIES = 5
+THROTTLING_ERROR_CODES = ('ThrottlingException', 'TooManyRequestsException', 'RequestLimitExceeded')
+ROUTE_TABLE_COLUMNS = ['segment', 'edge_location', 'prefix', 'state', 'type', 'destinations']
+
+# batch_actions limits. Bedrock Agents reject Lambda responses over 25 KB, so the batch body is
+# kept under MAX_RESPONSE_BYTES, leaving room for the response envelope.
+BATCH_MAX_CALLS = 20
+BATCH_WORKERS = 8
+MAX_RESPONSE_BYTES = 22 * 1024
+
+
+# Per-action result TTLs in seconds. Cached results survive across warm Lambda invocations.
+ACTION_TTLS = {
+    'get_global_networks': 600,
+    'get_core_networks': 300,
+    'get_core_network_details': 300,
+    'get_core_network_policy': 300,
+    'get_network_routes': 60,
+    'get_all_network_routes': 60
+}
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Client-side request rate per Network Manager operation: sustained requests per second and burst size
+RATE_LIMIT_PER_SECOND = 5.0
+RATE_LIMIT_BURST = 10
+
+
+class RateLimiter:
+    """
+    Token bucket per Network Manager operation, hooked into the client's before-send event.
+
+    before-send fires once per HTTP attempt, so botocore's own retries also wait for a token.
+    Also counts requests sent, retries, throttling errors and the seconds spent waiting or backing off.
+    """
+
+    def __init__(self, rate: float = RATE_LIMIT_PER_SECOND, burst: int = RATE_LIMIT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self.counters = {'calls': 0, 'retries': 0, 'throttle_errors': 0, 'throttled_seconds': 0.0}
+
+    def acquire(self, operation: str) -> None:
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, updated_at = self._buckets.get(operation, (float(self.burst), now))
+                tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+                if tokens >= 1:
+                    self._buckets[operation] = (tokens - 1, now)
+                    self.counters['calls'] += 1
+                    self.counters['throttled_seconds'] += waited
+                    return
+                self._buckets[operation] = (tokens, now)
+                delay = (1 - tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def record(self, retries: int = 0, throttled: bool = False, backoff_seconds: float = 0.0) -> None:
+        with self._lock:
+            self.counters['retries'] += retries
+            self.counters['throttle_errors'] += int(throttled)
+            self.counters['throttled_seconds'] += backoff_seconds
+
+    def install(self, client) -> None:
+        def before_send(event_name, **kwargs):
+            self.acquire(event_name.rsplit('.', 1)[-1])
+
+        def after_call(parsed, **kwargs):
+            error_code = parsed.get('Error', {}).get('Code')
+            self.record(parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0), error_code in THROTTLING_ERROR_CODES)
+
+        client.meta.events.register('before-send', before_send)
+        client.meta.events.register('after-call', after_call)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.counters)
+        stats['throttled_seconds'] = round(stats['throttled_seconds'], 3)
+        return stats
+
+
+rate_limiter = RateLimiter()
+
+
+def _get_network_manager():
+    """
+    Returns the shared Network Manager client, creating it on first use.
+
+    boto3 is imported here rather than at module load, so cold starts that only need the cache
+    or stats actions skip it. Adaptive retry mode lets botocore slow down on its own when
+    Network Manager throttles.
+    """
+    global _network_manager
+    if _network_manager is None:
+        with _network_manager_lock:
+            if _network_manager is None:
+                import boto3
+                from botocore.config import Config
+
+                client = boto3.client('networkmanager', config=Config(retries={'mode': 'adaptive', 'max_attempts': 8}))
+                rate_limiter.install(client)
+                _network_manager = client
+    return _network_manager
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with per-entry TTL, bounded by entry count and approximate JSON size.
+
+    Values are copied on the way in and out, so callers may modify the results they get.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES,
+                 clock: Callable[[], float] = time.monotonic):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._entries = OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['expires_at'] <= self._clock():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry['value']
+        return True, copy.deepcopy(value)
+
+    def put(self, key, value, ttl: float) -> None:
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {'value': value, 'expires_at': self._clock() + ttl, 'size': size}
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, core_network_id: Optional[str] = None) -> int:
+        """
+        Drop cached results for a core network, or everything when no ID is given.
+
+        Args:
+            core_network_id (str, optional): The core network whose results should be dropped.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        with self._lock:
+            stale = [key for key in self._entries if core_network_id is None or core_network_id in key[1]]
+            for key in stale:
+                self._remove(key)
+            return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.total_bytes
+            }
+
+    def _remove(self, key) -> None:
+        self.total_bytes -= self._entries.pop(key)['size']
+
+
+result_cache = ResultCache()
+
+
+# Cache misses currently being fetched, so concurrent callers of the same key share one API call
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def cached(action_name: str):
+    """
+    Serve a NetworkManagerActions method from the result cache.
+
+    Concurrent misses for the same arguments wait for the first caller's result instead of
+    repeating the API call. The wrapped method accepts an extra bypass_cache argument
+    ("true"/True) that forces a fresh call.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, bypass_cache=False, **kwargs):
+            # Bind to the signature so positional and keyword calls share one cache key
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (action_name, tuple(str(value) for value in bound.arguments.values()))
+            if str(bypass_cache).lower() in ('true', '1', 'yes'):
+                result = func(*args, **kwargs)
+                result_cache.put(key, result, ACTION_TTLS.get(action_name, 60))
+                return result
+
+            hit, value = result_cache.get(key)
+            if hit:
+                return value
+            with _in_flight_lock:
+                call = _in_flight.get(key)
+                leader = call is None
+                if leader:
+                    call = {'done': threading.Event()}
+                    _in_flight[key] = call
+            if not leader:
+                call['done'].wait()
+                if 'error' in call:
+                    raise call['error']
+                return copy.deepcopy(call['result'])
+
+            try:
+                call['result'] = func(*args, **kwargs)
+                result_cache.put(key, call['result'], ACTION_TTLS.get(action_name, 60))
+                return call['result']
+            except Exception as e:
+                call['error'] = e
+                raise
+            finally:
+                with _in_flight_lock:
+                    del _in_flight[key]
+                call['done'].set()
+        return wrapper
+    return decorator
 
 
 class NetworkManagerActions:
     @staticmethod
+    @cached('get_global_networks')
     def get_global_networks() -> List[Dict[str, Any]]:
         """
         Retrieves all global networks.
@@ -15,10 +270,11 @@ class NetworkManagerActions:
         Returns:
             List[Dict[str, Any]]: A list of dictionaries containing global network information.
         """
-        response = network_manager.describe_global_networks()
-        return response['GlobalNetworks']
+        paginator = _get_network_manager().get_paginator('describe_global_networks')
+        return [network for page in paginator.paginate() for network in page['GlobalNetworks']]
 
     @staticmethod
+    @cached('get_core_networks')
     def get_core_networks() -> List[Dict[str, Any]]:
         """
         Retrieves all core networks.
@@ -26,10 +282,11 @@ class NetworkManagerActions:
         Returns:
             List[Dict[str, Any]]: A list of dictionaries containing core network information.
         """
-        response = network_manager.list_core_networks()
-        return response['CoreNetworks']
+        paginator = _get_network_manager().get_paginator('list_core_networks')
+        return [network for page in paginator.paginate() for network in page['CoreNetworks']]
 
     @staticmethod
+    @cached('get_core_network_details')
     def get_core_network_details(core_network_id: str) -> Dict[str, Any]:
         """
         Retrieves details for a specific core network.
@@ -40,10 +297,11 @@ class NetworkManagerActions:
         Returns:
             Dict[str, Any]: Details of the specified core network.
         """
-        response = network_manager.get_core_network(CoreNetworkId=core_network_id)
+        response = _get_network_manager().get_core_network(CoreNetworkId=core_network_id)
         return response['CoreNetwork']
 
     @staticmethod
+    @cached('get_core_network_policy')
     def get_core_network_policy(core_network_id: str, policy_version_id: Optional[int] = None, alias: str = 'LIVE') -> Dict[str, Any]:
         """
         Retrieves the policy for a core network.
@@ -63,10 +321,11 @@ class NetworkManagerActions:
         if policy_version_id:
             params['PolicyVersionId'] = policy_version_id
 
-        response = network_manager.get_core_network_policy(**params)
+        response = _get_network_manager().get_core_network_policy(**params)
         return response['CoreNetworkPolicy']
 
     @staticmethod
+    @cached('get_network_routes')
     def get_network_routes(global_network_id: str, core_network_id: str, segment_name: str, edge_location: str) -> List[Dict[str, Any]]:
         """
         Retrieves routes for a specific segment and edge location in a core network.
@@ -88,14 +347,257 @@ class NetworkManagerActions:
             }
         }
         try:
-            response = network_manager.get_network_routes(
+            response = _get_network_manager().get_network_routes(
                 GlobalNetworkId=global_network_id,
                 RouteTableIdentifier=route_table_identifier
             )
             return response.get('NetworkRoutes', [])
-        except network_manager.exceptions.ValidationException:
+        except _get_network_manager().exceptions.ValidationException:
             return []
 
+    @staticmethod
+    def get_segment_edge_pairs(core_network_id: str) -> List[Dict[str, str]]:
+        """
+        Lists the (segment, edge location) pairs that actually have a route table.
+
+        Uses each segment's own EdgeLocations instead of the cross-product of all segments and edges.
+
+        Args:
+            core_network_id (str): The ID of the core network.
+
+        Returns:
+            List[Dict[str, str]]: Pairs as dictionaries with 'segment' and 'edge_location'.
+        """
+        core_network = NetworkManagerActions.get_core_network_details(core_network_id)
+        return [
+            {'segment': segment['Name'], 'edge_location': edge_location}
+            for segment in core_network.get('Segments', [])
+            for edge_location in segment.get('EdgeLocations', [])
+        ]
+
+    @staticmethod
+    @cached('get_all_network_routes')
+    def get_all_network_routes(global_network_id: str, core_network_id: str) -> Dict[str, Any]:
+        """
+        Collects the routes of every segment at every edge location of a core network in one table.
+
+        Route tables are fetched concurrently, with jittered backoff when Network Manager throttles.
+
+        Args:
+            global_network_id (str): The ID of the global network.
+            core_network_id (str): The ID of the core network.
+
+        Returns:
+            Dict[str, Any]: A columnar route table with 'columns' and 'rows', sorted by segment,
+            edge location and prefix, plus any (segment, edge) pairs that could not be fetched in 'errors'.
+        """
+        pairs = NetworkManagerActions.get_segment_edge_pairs(core_network_id)
+
+        def fetch(pair):
+            return _call_with_backoff(
+                NetworkManagerActions.get_network_routes,
+                global_network_id, core_network_id, pair['segment'], pair['edge_location'],
+                bypass_cache=True
+            )
+
+        rows = []
+        errors = []
+        with ThreadPoolExecutor(max_workers=ROUTE_FETCH_WORKERS) as executor:
+            futures = [(pair, executor.submit(fetch, pair)) for pair in pairs]
+            for pair, future in futures:
+                try:
+                    routes = future.result()
+                except Exception as e:
+                    errors.append({'segment': pair['segment'], 'edge_location': pair['edge_location'], 'error': str(e)})
+                    continue
+                for route in routes:
+                    rows.append([
+                        pair['segment'],
+                        pair['edge_location'],
+                        route.get('DestinationCidrBlock') or route.get('PrefixListId'),
+                        route.get('State'),
+                        route.get('Type'),
+                        [
+                            destination.get('CoreNetworkAttachmentId') or destination.get('ResourceId') or destination.get('TransitGatewayAttachmentId')
+                            for destination in route.get('Destinations', [])
+                        ]
+                    ])
+
+        rows.sort(key=lambda row: (row[0], row[1], row[2] or ''))
+        return {
+            'core_network_id': core_network_id,
+            'columns': ROUTE_TABLE_COLUMNS,
+            'rows': rows,
+            'errors': errors
+        }
+
+
+def _call_with_backoff(func, *args, **kwargs):
+    """
+    Calls func, retrying throttling errors with full-jitter exponential backoff.
+    """
+    for attempt in range(ROUTE_FETCH_MAX_RETRIES + 1):
+        try:
+            return func(*args, **kwargs)
+        except _get_network_manager().exceptions.ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in THROTTLING_ERROR_CODES or attempt == ROUTE_FETCH_MAX_RETRIES:
+                raise
+            delay = random.uniform(0, min(10.0, 0.5 * (2 ** attempt)))
+            rate_limiter.record(retries=1, backoff_seconds=delay)
+            time.sleep(delay)
+
+
+# Threads shared by every AsyncNetworkManagerActions call; sessions waiting on them hold no thread
+ASYNC_WORKERS = 16
+_async_executor = ThreadPoolExecutor(max_workers=ASYNC_WORKERS, thread_name_prefix='networkmanager')
+
+
+def _make_async(func):
+    """
+    Wraps a NetworkManagerActions method as a coroutine that runs it on the shared async pool.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        # Imported here so synchronous Lambda invocations never load asyncio
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_async_executor, functools.partial(func, *args, **kwargs))
+    return staticmethod(wrapper)
+
+
+class AsyncNetworkManagerActions:
+    """
+    asyncio variants of NetworkManagerActions for callers that serve many requests from one event loop.
+
+    Each coroutine runs the synchronous action, so caching, rate limiting and results are the same.
+    """
+    get_global_networks = _make_async(NetworkManagerActions.get_global_networks)
+    get_core_networks = _make_async(NetworkManagerActions.get_core_networks)
+    get_core_network_details = _make_async(NetworkManagerActions.get_core_network_details)
+    get_core_network_policy = _make_async(NetworkManagerActions.get_core_network_policy)
+    get_network_routes = _make_async(NetworkManagerActions.get_network_routes)
+    get_segment_edge_pairs = _make_async(NetworkManagerActions.get_segment_edge_pairs)
+    get_all_network_routes = _make_async(NetworkManagerActions.get_all_network_routes)
+
+
+def _shrink_rows(result: Dict[str, Any]) -> bool:
+    """
+    Halves the largest top-level row list of a batch result in place. Returns False if there is none to shrink.
+
+    Only whole rows are dropped: a list result itself, or a list value of a dict result other
+    than a table's 'columns', so every kept row still matches its columns. The trimmed list's
+    owner records 'truncated' and the number of rows 'omitted' (per key for dict results).
+    """
+    value = result['result']
+    if isinstance(value, list):
+        candidates = [(value, None)]
+    elif isinstance(value, dict):
+        candidates = [(rows, key) for key, rows in value.items() if isinstance(rows, list) and key != 'columns']
+    else:
+        candidates = []
+    candidates = [(rows, key) for rows, key in candidates if rows]
+    if not candidates:
+        return False
+    rows, key = max(candidates, key=lambda candidate: len(json.dumps(candidate[0], default=str)))
+    omitted = len(rows) - len(rows) // 2
+    del rows[len(rows) // 2:]
+    if key is None:
+        result['omitted'] = result.get('omitted', 0) + omitted
+    else:
+        value['truncated'] = True
+        value.setdefault('omitted', {})
+        value['omitted'][key] = value['omitted'].get(key, 0) + omitted
+    return True
+
+
+def fit_response(results: List[Dict[str, Any]], max_bytes: int = MAX_RESPONSE_BYTES) -> List[Dict[str, Any]]:
+    """
+    Trims batch results until their JSON encoding fits in max_bytes.
+
+    The largest row list of the largest result is halved repeatedly (see _shrink_rows), and each
+    trimmed result is marked 'truncated' so the agent knows to ask for that action on its own.
+    Results that cannot be trimmed further are replaced by a note.
+
+    Args:
+        results (List[Dict[str, Any]]): The per-call batch results.
+        max_bytes (int): The size budget for the encoded results.
+
+    Returns:
+        List[Dict[str, Any]]: The results, trimmed in place where needed.
+    """
+    sizes = [len(json.dumps(result, default=str, separators=(',', ':'))) for result in results]
+    while sum(sizes) > max_bytes:
+        index = max(range(len(results)), key=sizes.__getitem__)
+        result = results[index]
+        if 'result' not in result or not _shrink_rows(result):
+            results[index] = {
+                'function': result['function'],
+                'truncated': True,
+                'error': 'Result too large for a batch response; call this function on its own'
+            }
+        else:
+            result['truncated'] = True
+        sizes[index] = len(json.dumps(results[index], default=str, separators=(',', ':')))
+    return results
+
+
+def batch_actions(calls: str) -> Dict[str, Any]:
+    """
+    Runs several actions concurrently in one invocation.
+
+    Calls share the result cache, and concurrent calls that need the same data (for example
+    get_all_network_routes and get_core_network_details for one core network) make a single
+    API call for it. Results keep the order of the calls and are trimmed to fit the Bedrock
+    Agent response size limit.
+
+    Args:
+        calls (str): A JSON list of {"function": ..., "parameters": {...}} objects.
+
+    Returns:
+        Dict[str, Any]: 'results' with one entry per call, holding 'result' or 'error'.
+    """
+    try:
+        requested = json.loads(calls) if isinstance(calls, str) else calls
+    except ValueError as e:
+        raise ValueError(f"calls must be a JSON list: {str(e)}")
+    if not isinstance(requested, list) or not all(isinstance(call, dict) and 'function' in call for call in requested):
+        raise ValueError('calls must be a JSON list of {"function": ..., "parameters": {...}} objects')
+    if len(requested) > BATCH_MAX_CALLS:
+        raise ValueError(f"At most {BATCH_MAX_CALLS} calls are allowed per batch")
+
+    def run(call):
+        function = call['function']
+        if function not in ACTIONS:
+            return {'function': function, 'error': f"Invalid function '{function}'"}
+        try:
+            return {'function': function, 'result': ACTIONS[function](**(call.get('parameters') or {}))}
+        except Exception as e:
+            return {'function': function, 'error': str(e)}
+
+    with ThreadPoolExecutor(max_workers=BATCH_WORKERS) as executor:
+        results = list(executor.map(run, requested))
+    # Round-trip through JSON so results are trimmed and measured exactly as they will be sent
+    results = json.loads(json.dumps(results, default=str))
+    return {'results': fit_response(results)}
+
+
+# Actions a batch can call; LAMBDA_ACTIONS adds batch_actions itself, so batches cannot nest
+ACTIONS = {
+    'get_global_networks': NetworkManagerActions.get_global_networks,
+    'get_core_networks': NetworkManagerActions.get_core_networks,
+    'get_core_network_details': NetworkManagerActions.get_core_network_details,
+    'get_core_network_policy': NetworkManagerActions.get_core_network_policy,
+    'get_network_routes': NetworkManagerActions.get_network_routes,
+    'get_all_network_routes': NetworkManagerActions.get_all_network_routes,
+    'invalidate_cache': lambda core_network_id=None: {'removed': result_cache.invalidate(core_network_id)},
+    'get_cache_stats': result_cache.stats,
+    'get_rate_limit_stats': rate_limiter.stats
+}
+
+# Actions the agent can call, built once per container rather than on every invocation
+LAMBDA_ACTIONS = dict(ACTIONS, batch_actions=batch_actions)
+
 
 def lambda_handler(event, context):
     """
@@ -118,15 +620,7 @@ def lambda_handler(event, context):
     # Convert parameters to a dictionary
     param_dict = {param['name']: param['value'] for param in parameters}
 
-    action_map = {
-        'get_global_networks': NetworkManagerActions.get_global_networks,
-        'get_core_networks': NetworkManagerActions.get_core_networks,
-        'get_core_network_details': NetworkManagerActions.get_core_network_details,
-        'get_core_network_policy': NetworkManagerActions.get_core_network_policy,
-        'get_network_routes': NetworkManagerActions.get_network_routes
-    }
-
-    if function not in action_map:
+    if function not in LAMBDA_ACTIONS:
         responseBody = {
             "TEXT": {
                 "body": f"Invalid function '{function}'"
@@ -134,8 +628,12 @@ def lambda_handler(event, context):
         }
     else:
         try:
-            result = action_map[function](**param_dict)
-            result_text = json.dumps(result, indent=2, default=str)
+            result = LAMBDA_ACTIONS[function](**param_dict)
+            if function == 'batch_actions':
+                # Compact JSON, matching the size budget the batch was trimmed to
+                result_text = json.dumps(result, default=str, separators=(',', ':'))
+            else:
+                result_text = json.dumps(result, indent=2, default=str)
             responseBody = {
                 "TEXT": {
                     "body": f"Here is the result for {function}: {result_text}"
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# The Lambda module is deployed on its own, so it is imported from src/ as the Lambda runtime does
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+import cloud_wan_agent  # noqa: E402
+
+
+@pytest.fixture
+def stubber(monkeypatch):
+    """
+    A Stubber on the shared Network Manager client, with an empty result cache.
+    """
+    import boto3
+    from botocore.stub import Stubber
+
+    client = boto3.client("networkmanager", region_name="us-west-2")
+    monkeypatch.setattr(cloud_wan_agent, "_network_manager", client)
+    cloud_wan_agent.result_cache.invalidate()
+    with Stubber(client) as stub:
+        yield stub
+    cloud_wan_agent.result_cache.invalidate()
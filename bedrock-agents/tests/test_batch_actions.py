@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+import cloud_wan_agent
+from cloud_wan_agent import batch_actions, fit_response, lambda_handler
+
+CORE_NETWORK = {"CoreNetworkId": "core-network-1", "GlobalNetworkId": "global-network-1", "Segments": []}
+
+
+def _event(function, **parameters):
+    return {
+        "agent": {}, "actionGroup": "cloudwan", "function": function, "messageVersion": "1.0",
+        "parameters": [{"name": name, "value": value} for name, value in parameters.items()],
+    }
+
+
+def _body(response):
+    return response["response"]["functionResponse"]["responseBody"]["TEXT"]["body"]
+
+
+def test_duplicate_calls_make_one_api_call(stubber):
+    stubber.add_response("get_core_network", {"CoreNetwork": CORE_NETWORK}, {"CoreNetworkId": "core-network-1"})
+    call = {"function": "get_core_network_details", "parameters": {"core_network_id": "core-network-1"}}
+
+    results = batch_actions(json.dumps([call] * 4))["results"]
+
+    assert [result["result"]["CoreNetworkId"] for result in results] == ["core-network-1"] * 4
+    stubber.assert_no_pending_responses()
+
+
+def test_failing_call_does_not_fail_the_batch(stubber, monkeypatch):
+    # One worker, so the stubbed responses are consumed in call order
+    monkeypatch.setattr(cloud_wan_agent, "BATCH_WORKERS", 1)
+    stubber.add_client_error("describe_global_networks", "AccessDeniedException", "Not allowed")
+    stubber.add_response("list_core_networks", {"CoreNetworks": [{"CoreNetworkId": "core-network-1"}]})
+
+    results = batch_actions([
+        {"function": "get_global_networks"},
+        {"function": "get_core_networks"},
+        {"function": "no_such_action"},
+    ])["results"]
+
+    assert results[0]["function"] == "get_global_networks" and "AccessDeniedException" in results[0]["error"]
+    assert results[1] == {"function": "get_core_networks", "result": [{"CoreNetworkId": "core-network-1"}]}
+    assert results[2] == {"function": "no_such_action", "error": "Invalid function 'no_such_action'"}
+
+
+def test_batch_rejects_malformed_calls():
+    for calls in ("not json", json.dumps({"function": "get_core_networks"}), json.dumps([{"parameters": {}}])):
+        with pytest.raises(ValueError):
+            batch_actions(calls)
+    with pytest.raises(ValueError):
+        batch_actions([{"function": "get_core_networks"}] * (cloud_wan_agent.BATCH_MAX_CALLS + 1))
+
+
+def _route_table(rows):
+    return {
+        "core_network_id": "core-network-1",
+        "columns": cloud_wan_agent.ROUTE_TABLE_COLUMNS,
+        "rows": [["prod", "us-east-1", f"10.{i // 256}.{i % 256}.0/24", "ACTIVE", "PROPAGATED", ["attachment-" + "0" * 40]]
+                 for i in range(rows)],
+        "errors": [],
+    }
+
+
+def test_oversized_response_is_trimmed_by_whole_rows(monkeypatch):
+    monkeypatch.setitem(cloud_wan_agent.ACTIONS, "get_all_network_routes", lambda **kwargs: _route_table(2000))
+    monkeypatch.setitem(cloud_wan_agent.ACTIONS, "get_core_networks", lambda: [{"CoreNetworkId": "core-network-1"}])
+
+    results = batch_actions([{"function": "get_all_network_routes"}, {"function": "get_core_networks"}])["results"]
+
+    assert len(json.dumps(results, separators=(",", ":"))) <= cloud_wan_agent.MAX_RESPONSE_BYTES
+    table = results[0]["result"]
+    assert results[0]["truncated"] and table["truncated"]
+    assert table["columns"] == cloud_wan_agent.ROUTE_TABLE_COLUMNS
+    assert all(len(row) == len(table["columns"]) for row in table["rows"])
+    assert len(table["rows"]) + table["omitted"]["rows"] == 2000
+    assert results[1] == {"function": "get_core_networks", "result": [{"CoreNetworkId": "core-network-1"}]}
+
+
+def test_fit_response_never_splits_a_row():
+    # Down to one row, the largest list is that row; it must be dropped whole, not halved
+    results = [{"function": "get_all_network_routes", "result": _route_table(3)}]
+    fit_response(results, max_bytes=250)
+    table = results[0]["result"]
+    assert all(len(row) == len(table["columns"]) for row in table["rows"])
+    assert table["omitted"]["rows"] == 3 - len(table["rows"])
+
+    results = [{"function": "get_core_networks", "result": [{"CoreNetworkId": "core-network-%d" % i} for i in range(50)]}]
+    fit_response(results, max_bytes=300)
+    assert results[0]["truncated"] and len(results[0]["result"]) + results[0]["omitted"] == 50
+
+    results = [{"function": "get_core_network_details", "result": {"Description": "x" * 500}}]
+    fit_response(results, max_bytes=300)
+    assert results[0]["truncated"] and "error" in results[0]
+
+
+def test_lambda_handler_dispatch(stubber):
+    stubber.add_response("list_core_networks", {"CoreNetworks": [{"CoreNetworkId": "core-network-1"}]})
+    body = _body(lambda_handler(_event("batch_actions", calls=json.dumps([{"function": "get_core_networks"}])), None))
+    assert body.startswith("Here is the result for batch_actions: ")
+    assert json.loads(body.split(": ", 1)[1]) == {
+        "results": [{"function": "get_core_networks", "result": [{"CoreNetworkId": "core-network-1"}]}]}
+
+    assert _body(lambda_handler(_event("no_such_action"), None)) == "Invalid function 'no_such_action'"
+    nested = json.dumps([{"function": "batch_actions", "parameters": {"calls": "[]"}}])
+    assert "Invalid function 'batch_actions'" in _body(lambda_handler(_event("batch_actions", calls=nested), None))
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import cloud_wan_agent
+from cloud_wan_agent import AsyncNetworkManagerActions, NetworkManagerActions
+
+CORE_NETWORK_ID = "core-network-1"
+GLOBAL_NETWORK_ID = "global-network-1"
+CORE_NETWORK = {
+    "CoreNetworkId": CORE_NETWORK_ID,
+    "GlobalNetworkId": GLOBAL_NETWORK_ID,
+    "Segments": [
+        {"Name": "prod", "EdgeLocations": ["us-east-1", "eu-west-1"]},
+        {"Name": "dev", "EdgeLocations": ["us-east-1"]},
+    ],
+}
+
+
+def _route(cidr, attachment):
+    return {"DestinationCidrBlock": cidr, "State": "ACTIVE", "Type": "PROPAGATED",
+            "Destinations": [{"CoreNetworkAttachmentId": attachment}]}
+
+
+def _routes_params(segment, edge_location):
+    return {
+        "GlobalNetworkId": GLOBAL_NETWORK_ID,
+        "RouteTableIdentifier": {"CoreNetworkSegmentEdge": {
+            "CoreNetworkId": CORE_NETWORK_ID, "SegmentName": segment, "EdgeLocation": edge_location}},
+    }
+
+
+@pytest.fixture
+def core_network(stubber):
+    stubber.add_response("get_core_network", {"CoreNetwork": CORE_NETWORK}, {"CoreNetworkId": CORE_NETWORK_ID})
+    return stubber
+
+
+def test_segment_edge_pairs_follow_each_segments_edges(core_network):
+    assert NetworkManagerActions.get_segment_edge_pairs(CORE_NETWORK_ID) == [
+        {"segment": "prod", "edge_location": "us-east-1"},
+        {"segment": "prod", "edge_location": "eu-west-1"},
+        {"segment": "dev", "edge_location": "us-east-1"},
+    ]
+
+
+def test_all_network_routes_with_stubbed_calls(core_network, monkeypatch):
+    # One worker, so the stubbed responses are consumed in pair order
+    monkeypatch.setattr(cloud_wan_agent, "ROUTE_FETCH_WORKERS", 1)
+    monkeypatch.setattr(cloud_wan_agent.random, "uniform", lambda low, high: 0.0)
+    stubber = core_network
+    stubber.add_response("get_network_routes", {"NetworkRoutes": [
+        _route("10.2.0.0/16", "attachment-b"), _route("10.1.0.0/16", "attachment-a")]}, _routes_params("prod", "us-east-1"))
+    # Throttled once, then retried with backoff
+    stubber.add_client_error("get_network_routes", "ThrottlingException", "Rate exceeded")
+    stubber.add_response("get_network_routes", {"NetworkRoutes": [_route("10.3.0.0/16", "attachment-c")]},
+                         _routes_params("prod", "eu-west-1"))
+    stubber.add_client_error("get_network_routes", "AccessDeniedException", "Not allowed")
+
+    table = NetworkManagerActions.get_all_network_routes(GLOBAL_NETWORK_ID, CORE_NETWORK_ID)
+
+    assert table["columns"] == cloud_wan_agent.ROUTE_TABLE_COLUMNS
+    assert table["rows"] == [
+        ["prod", "eu-west-1", "10.3.0.0/16", "ACTIVE", "PROPAGATED", ["attachment-c"]],
+        ["prod", "us-east-1", "10.1.0.0/16", "ACTIVE", "PROPAGATED", ["attachment-a"]],
+        ["prod", "us-east-1", "10.2.0.0/16", "ACTIVE", "PROPAGATED", ["attachment-b"]],
+    ]
+    assert len(table["errors"]) == 1
+    assert table["errors"][0]["segment"] == "dev" and "AccessDeniedException" in table["errors"][0]["error"]
+    stubber.assert_no_pending_responses()
+
+
+def test_route_table_without_routes_is_empty(stubber):
+    stubber.add_client_error("get_network_routes", "ValidationException", "No route table")
+    assert NetworkManagerActions.get_network_routes(GLOBAL_NETWORK_ID, CORE_NETWORK_ID, "prod", "us-east-1") == []
+
+
+def _concurrent_fake_routes(monkeypatch, pairs):
+    """
+    Replace get_network_routes with a fake that only returns once every pair has been requested,
+    finishing in reverse order. 'dev' fails.
+    """
+    barrier = threading.Barrier(pairs, timeout=5)
+    delays = {"us-east-1": 0.05, "eu-west-1": 0.0}
+
+    def fake(global_network_id, core_network_id, segment_name, edge_location, bypass_cache=False):
+        barrier.wait()
+        time.sleep(delays[edge_location] if segment_name == "prod" else 0.0)
+        if segment_name == "dev":
+            raise RuntimeError("route table unavailable")
+        return [_route(f"10.{len(edge_location)}.0.0/16", f"attachment-{edge_location}")]
+
+    monkeypatch.setattr(NetworkManagerActions, "get_network_routes", staticmethod(fake))
+
+
+def test_all_network_routes_fetch_pairs_concurrently(core_network, monkeypatch):
+    _concurrent_fake_routes(monkeypatch, pairs=3)
+
+    table = NetworkManagerActions.get_all_network_routes(GLOBAL_NETWORK_ID, CORE_NETWORK_ID)
+
+    assert [row[:3] for row in table["rows"]] == [["prod", "eu-west-1", "10.9.0.0/16"], ["prod", "us-east-1", "10.9.0.0/16"]]
+    assert table["errors"] == [{"segment": "dev", "edge_location": "us-east-1", "error": "route table unavailable"}]
+
+
+def test_async_actions_match_the_sync_results(core_network, monkeypatch):
+    _concurrent_fake_routes(monkeypatch, pairs=3)
+
+    async def gather():
+        return await asyncio.gather(
+            AsyncNetworkManagerActions.get_all_network_routes(GLOBAL_NETWORK_ID, CORE_NETWORK_ID),
+            AsyncNetworkManagerActions.get_core_network_details(CORE_NETWORK_ID),
+            AsyncNetworkManagerActions.get_segment_edge_pairs(CORE_NETWORK_ID),
+        )
+
+    table, details, pairs = asyncio.run(gather())
+    assert details == CORE_NETWORK
+    assert pairs == NetworkManagerActions.get_segment_edge_pairs(CORE_NETWORK_ID)
+    assert table == NetworkManagerActions.get_all_network_routes(GLOBAL_NETWORK_ID, CORE_NETWORK_ID)
+    # Concurrent lookups of the same core network made one API call
+    core_network.assert_no_pending_responses()
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+import cloud_wan_agent
+from cloud_wan_agent import ResultCache, cached
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def shared_cache(monkeypatch, clock):
+    """
+    Replace the cache behind @cached with an empty one on the fake clock.
+    """
+    cache = ResultCache(clock=clock)
+    monkeypatch.setattr(cloud_wan_agent, "result_cache", cache)
+    return cache
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = ResultCache(clock=clock)
+    cache.put(("a", ()), [1], ttl=60)
+    clock.now += 59.9
+    assert cache.get(("a", ())) == (True, [1])
+    clock.now += 0.1
+    assert cache.get(("a", ())) == (False, None)
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 0, "bytes": 0}
+
+
+def test_least_recently_used_entries_are_evicted_by_size(clock):
+    value = {"data": "x" * 100}
+    size = len(json.dumps(value))
+    cache = ResultCache(max_bytes=size * 2, clock=clock)
+    cache.put(("a", ()), value, ttl=60)
+    cache.put(("b", ()), value, ttl=60)
+    assert cache.get(("a", ()))[0]
+    cache.put(("c", ()), value, ttl=60)
+
+    assert [cache.get((key, ()))[0] for key in "abc"] == [True, False, True]
+    assert cache.stats()["evictions"] == 1
+    cache.put(("huge", ()), {"data": "x" * size * 3}, ttl=60)
+    assert cache.get(("huge", ())) == (False, None)
+
+
+def test_invalidate_by_core_network(clock):
+    cache = ResultCache(clock=clock)
+    cache.put(("get_core_networks", ()), [], ttl=60)
+    cache.put(("get_core_network_details", ("core-network-1",)), {}, ttl=60)
+    cache.put(("get_core_network_details", ("core-network-2",)), {}, ttl=60)
+
+    assert cache.invalidate("core-network-1") == 1
+    assert cache.get(("get_core_network_details", ("core-network-2",)))[0]
+    assert cache.invalidate() == 2
+
+
+def test_cached_results_are_copies(clock):
+    cache = ResultCache(clock=clock)
+    original = {"Segments": [{"Name": "prod"}]}
+    cache.put(("a", ()), original, ttl=60)
+    original["Segments"].clear()
+
+    hit = cache.get(("a", ()))[1]
+    assert hit == {"Segments": [{"Name": "prod"}]}
+    hit["Segments"].clear()
+    assert cache.get(("a", ()))[1] == {"Segments": [{"Name": "prod"}]}
+
+
+def test_cached_decorator(shared_cache, clock):
+    calls = []
+
+    @cached("get_core_network_policy")
+    def get_policy(core_network_id, alias="LIVE"):
+        calls.append((core_network_id, alias))
+        return {"CoreNetworkId": core_network_id, "Alias": alias}
+
+    assert get_policy("core-network-1") == {"CoreNetworkId": "core-network-1", "Alias": "LIVE"}
+    get_policy(core_network_id="core-network-1", alias="LIVE")["Alias"] = "mutated"
+    assert get_policy("core-network-1")["Alias"] == "LIVE"
+    assert len(calls) == 1
+
+    # The Lambda passes parameters as strings
+    get_policy("core-network-1", bypass_cache="true")
+    assert len(calls) == 2
+    get_policy("core-network-1", bypass_cache="false")
+    assert len(calls) == 2
+
+    clock.now += cloud_wan_agent.ACTION_TTLS["get_core_network_policy"]
+    get_policy("core-network-1")
+    assert len(calls) == 3
+
+    assert shared_cache.invalidate("core-network-1") == 1
+    get_policy("core-network-1")
+    assert len(calls) == 4
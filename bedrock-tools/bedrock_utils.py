@@ -1,26 +1,45 @@
 # bedrock_utils.py
-import boto3
+from __future__ import annotations
+
+import copy
+import hashlib
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from botocore.exceptions import BotoCoreError, ClientError
-from typing import Dict, List, Any, Optional
+from typing import TYPE_CHECKING, Dict, List, Any, Iterable, Iterator, Optional, Tuple
+from tools.async_tools import run_blocking
+from tools.aws_clients import get_client
+from tools.rate_limit import backoff_delay, is_throttling_error, rate_limiter
+from tools.tracing import span, start_span, use_span
+
+if TYPE_CHECKING:
+    import boto3
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
-# Define available models
+# Define available models. prompt_caching marks models that support Bedrock prompt caching,
+# in which case cache points are placed after the system prompt and the tool configuration.
 AVAILABLE_MODELS = {
-    "claude_3_sonnet": "anthropic.claude-3-sonnet-20240229-v1:0",
-    "claude_3_haiku": "anthropic.claude-3-haiku-20240307-v1:0",
-    "claude_2": "anthropic.claude-v2:1",
+    "claude_3_sonnet": {"model_id": "anthropic.claude-3-sonnet-20240229-v1:0", "prompt_caching": False},
+    "claude_3_haiku": {"model_id": "anthropic.claude-3-haiku-20240307-v1:0", "prompt_caching": False},
+    "claude_3_5_haiku": {"model_id": "us.anthropic.claude-3-5-haiku-20241022-v1:0", "prompt_caching": True},
+    "claude_3_7_sonnet": {"model_id": "us.anthropic.claude-3-7-sonnet-20250219-v1:0", "prompt_caching": True},
+    "claude_2": {"model_id": "anthropic.claude-v2:1", "prompt_caching": False},
     # Add more models as needed
 }
 
 # Default model
 DEFAULT_MODEL = "claude_3_haiku"
 
+# Extra attempts, with jittered backoff, when Bedrock still throttles after botocore's own retries
+MAX_THROTTLE_RETRIES = 3
+
 
 SYSTEM_MESSAGE = """
 You are an AWS Network Assistant, designed to help with AWS networking tasks and queries. \
@@ -44,10 +63,14 @@ Your role is to provide accurate information and assist with AWS networking oper
    - Explain AWS concepts clearly when relevant to the user's query.
    - If a user's request is unclear or could be interpreted in multiple ways, ask for clarification.
 
-5. Tool Limitations:
+5. Compact Tool Results:
+   - Large tool results may list records as a table: "columns" holds the field names and each entry in "rows" holds one record's values in the same order.
+   - If a table has "prefixes", the prefix for that column was removed from every value (e.g. prefix "subnet-" and value "0abc" mean "subnet-0abc"). Always show full IDs to the user.
+
+6. Tool Limitations:
    - Be aware of the limitations of your tools. If a user asks for something beyond your tools' capabilities, explain this limitation clearly.
 
-6. Privacy and Security:
+7. Privacy and Security:
    - Do not ask for or store AWS credentials or sensitive information.
    - Remind users not to share sensitive information if they attempt to do so.
 
@@ -56,12 +79,119 @@ Always prioritize providing correct information over guessing or making assumpti
 """
 
 
+CACHE_POINT = {"cachePoint": {"type": "default"}}
+
+# Memoized request prefixes (system prompt and tool configuration), keyed by model and a hash of
+# the tool specs so that equal tool lists share one prefix; least recently used first
+MAX_REQUEST_PREFIXES = 32
+_request_prefixes: "OrderedDict[Tuple[str, str], Tuple[List[Dict[str, Any]], Dict[str, Any]]]" = OrderedDict()
+_request_prefixes_lock = threading.Lock()
+
+_usage_lock = threading.Lock()
+_usage_stats = {
+    "calls": 0,
+    "inputTokens": 0,
+    "outputTokens": 0,
+    "cacheReadInputTokens": 0,
+    "cacheWriteInputTokens": 0,
+    "latencyMs": 0,
+}
+
+
+def get_model_config(model_key: str) -> Dict[str, Any]:
+    """
+    Look up the configuration of an available model.
+
+    Args:
+    model_key (str): Key for the model in AVAILABLE_MODELS.
+
+    Returns:
+    Dict[str, Any]: The model configuration, with 'model_id' and 'prompt_caching'.
+
+    Raises:
+    ValueError: If an invalid model key is provided.
+    """
+    config = AVAILABLE_MODELS.get(model_key)
+    if not config:
+        raise ValueError(f"Invalid model key: {model_key}. Available models are: {', '.join(AVAILABLE_MODELS.keys())}")
+    return config
+
+
+def record_usage(usage: Optional[Dict[str, Any]], metrics: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Add the token usage and latency of one Bedrock response to the running totals.
+
+    Args:
+    usage (Dict[str, Any], optional): The 'usage' field of a converse response or stream metadata event.
+    metrics (Dict[str, Any], optional): The 'metrics' field of the same response.
+    """
+    usage = usage or {}
+    with _usage_lock:
+        _usage_stats["calls"] += 1
+        for key in ("inputTokens", "outputTokens", "cacheReadInputTokens", "cacheWriteInputTokens"):
+            _usage_stats[key] += usage.get(key, 0)
+        _usage_stats["latencyMs"] += (metrics or {}).get("latencyMs", 0)
+    logger.info(f"Bedrock usage: input={usage.get('inputTokens', 0)} output={usage.get('outputTokens', 0)} "
+                f"cache_read={usage.get('cacheReadInputTokens', 0)} cache_write={usage.get('cacheWriteInputTokens', 0)} "
+                f"latency_ms={(metrics or {}).get('latencyMs', 0)}")
+
+
+def get_usage_stats() -> Dict[str, int]:
+    """
+    Return the accumulated Bedrock token usage, including prompt cache reads and writes, and latency.
+
+    Returns:
+    Dict[str, int]: The usage totals since the process started.
+    """
+    with _usage_lock:
+        return dict(_usage_stats)
+
+
+def _usage_attributes(usage: Optional[Dict[str, Any]], metrics: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    usage = usage or {}
+    return {
+        "usage.input_tokens": usage.get('inputTokens', 0),
+        "usage.output_tokens": usage.get('outputTokens', 0),
+        "usage.cache_read_tokens": usage.get('cacheReadInputTokens', 0),
+        "usage.cache_write_tokens": usage.get('cacheWriteInputTokens', 0),
+        "bedrock.latency_ms": (metrics or {}).get('latencyMs', 0)
+    }
+
+
+def _get_request_prefix(model_key: str, tools: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    # The prefix is built once per model and tool list and shared by every request, so it must not be mutated
+    key = (model_key, hashlib.sha1(json.dumps(tools, sort_keys=True, default=str).encode()).hexdigest())
+    with _request_prefixes_lock:
+        cached = _request_prefixes.get(key)
+        if cached is not None:
+            _request_prefixes.move_to_end(key)
+            return cached
+
+    system = [{"text": SYSTEM_MESSAGE}]
+    # A copy, since later callers with equal tool specs share this prefix
+    tool_list = copy.deepcopy(tools)
+    if get_model_config(model_key)["prompt_caching"]:
+        system.append(CACHE_POINT)
+        tool_list.append(CACHE_POINT)
+    tool_config = {
+        "tools": tool_list,
+        "toolChoice": {"auto": {}}
+    }
+    with _request_prefixes_lock:
+        _request_prefixes[key] = (system, tool_config)
+        _request_prefixes.move_to_end(key)
+        while len(_request_prefixes) > MAX_REQUEST_PREFIXES:
+            _request_prefixes.popitem(last=False)
+    return system, tool_config
+
+
 def initialize_bedrock_client(region_name: str = "us-west-2") -> boto3.client:
     """
     Initialize and return a Bedrock runtime client.
 
-    This function creates a boto3 client for the Bedrock runtime service.
-    It's used to interact with the Bedrock API for model invocations.
+    This function returns the pooled boto3 client for the Bedrock runtime service.
+    It's used to interact with the Bedrock API for model invocations. The client uses adaptive
+    retries and the shared client-side rate limiter.
 
     Args:
     region_name (str): The AWS region to connect to. Defaults to "us-east-1".
@@ -73,7 +203,7 @@ def initialize_bedrock_client(region_name: str = "us-west-2") -> boto3.client:
     BotoCoreError: If there's an issue creating the Bedrock client.
     """
     try:
-        client = boto3.client("bedrock-runtime", region_name=region_name)
+        client = get_client("bedrock-runtime", region=region_name)
         logger.info(f"Bedrock client initialized for region: {region_name}")
         return client
     except BotoCoreError as e:
@@ -94,6 +224,9 @@ def create_converse_request(
 
     This function prepares the request payload for a conversation with the Bedrock model,
     including the conversation history, system message, and tool configurations.
+    The system message and tool configuration are built once per model and tool list and reused;
+    for models with prompt_caching enabled they end with cache points, so Bedrock can serve them
+    from its prompt cache.
 
     Args:
     messages (List[Dict[str, Any]]): The conversation history.
@@ -110,23 +243,19 @@ def create_converse_request(
     ValueError: If an invalid model key is provided.
     """
     try:
-        model_id = AVAILABLE_MODELS.get(model_key)
-        if not model_id:
-            raise ValueError(f"Invalid model key: {model_key}. Available models are: {', '.join(AVAILABLE_MODELS.keys())}")
+        model_id = get_model_config(model_key)["model_id"]
+        system, tool_config = _get_request_prefix(model_key, tools)
 
         request = {
             "modelId": model_id,
             "messages": messages,
-            "system": [{"text": SYSTEM_MESSAGE}],
+            "system": system,
             "inferenceConfig": {
                 "maxTokens": max_tokens,
                 "temperature": temperature,
                 "topP": top_p
             },
-            "toolConfig": {
-                "tools": tools,
-                "toolChoice": {"auto":{}}
-            }
+            "toolConfig": tool_config
         }
         logger.debug(f"Created converse request for model: {model_id}")
         return request
@@ -135,6 +264,20 @@ def create_converse_request(
         raise
 
 
+def _call_with_throttle_retry(operation: Any, request: Dict[str, Any]) -> Dict[str, Any]:
+    # Retry ThrottlingException with full-jitter backoff before giving up
+    for attempt in range(MAX_THROTTLE_RETRIES + 1):
+        try:
+            return operation(**request)
+        except ClientError as e:
+            if not is_throttling_error(e) or attempt == MAX_THROTTLE_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"Bedrock throttled the request, retrying in {delay:.2f}s")
+            rate_limiter.record_retries(1, throttled=True, backoff_seconds=delay)
+            time.sleep(delay)
+
+
 def converse_with_claude(bedrock_client: boto3.client, request: Dict[str, Any], model_key: str = DEFAULT_MODEL) -> Optional[Dict[str, Any]]:
     """
     Send a request to Claude via the Bedrock converse API.
@@ -155,13 +298,17 @@ def converse_with_claude(bedrock_client: boto3.client, request: Dict[str, Any],
     Exception: For any other unexpected errors.
     """
     try:
-        model_id = AVAILABLE_MODELS.get(model_key)
-        if not model_id:
-            raise ValueError(f"Invalid model key: {model_key}. Available models are: {', '.join(AVAILABLE_MODELS.keys())}")
+        model_id = get_model_config(model_key)["model_id"]
 
         request["modelId"] = model_id  # Ensure the correct model ID is used
-        response = bedrock_client.converse(**request)
+        with span("bedrock.converse", model_id=model_id) as converse_span:
+            if converse_span.recording:
+                converse_span.set_attribute("request_bytes", len(json.dumps(request, default=str)))
+            response = _call_with_throttle_retry(bedrock_client.converse, request)
+            converse_span.set_attributes(_usage_attributes(response.get('usage'), response.get('metrics')))
+            converse_span.set_attribute("stop_reason", response.get('stopReason'))
         logger.info(f"Successfully received response from Bedrock using model: {model_id}")
+        record_usage(response.get('usage'), response.get('metrics'))
         return response['output']['message']
     except ClientError as e:
         error_code = e.response['Error']['Code']
@@ -172,4 +319,144 @@ def converse_with_claude(bedrock_client: boto3.client, request: Dict[str, Any],
         raise
     except Exception as e:
         logger.error(f"Unexpected error in converse_with_claude: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+async def aconverse_with_claude(bedrock_client: boto3.client, request: Dict[str, Any], model_key: str = DEFAULT_MODEL) -> Optional[Dict[str, Any]]:
+    """
+    asyncio variant of converse_with_claude(); the blocking call runs on the shared AWS I/O pool.
+
+    Args:
+    bedrock_client (boto3.client): The Bedrock runtime client.
+    request (Dict[str, Any]): The request payload for the Bedrock API.
+    model_key (str): The key of the model to use from AVAILABLE_MODELS. Defaults to DEFAULT_MODEL.
+
+    Returns:
+    Optional[Dict[str, Any]]: The model's response message.
+    """
+    return await run_blocking(converse_with_claude, bedrock_client, request, model_key=model_key)
+
+def iter_stream_events(event_stream: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, Any]]:
+    """
+    Turn a Bedrock ConverseStream event stream into text deltas, completed tool uses and the final message.
+
+    Tool use input arrives as JSON fragments spread across contentBlockDelta events; the fragments
+    are buffered per content block and parsed once the block stops, so each tool use is yielded
+    as soon as it is complete rather than at the end of the message. Any iterable of event
+    dictionaries works, which makes the function easy to drive with a stubbed stream.
+
+    Args:
+    event_stream (Iterable[Dict[str, Any]]): The 'stream' from a converse_stream response.
+
+    Yields:
+    Tuple[str, Any]: One of
+        - ("text", str):            a text delta
+        - ("tool_use", dict):       a completed toolUse block with parsed input
+        - ("metadata", dict):       the usage and metrics reported at the end of the stream
+        - ("message", dict):        the assembled assistant message, always yielded last
+    """
+    blocks: Dict[int, Dict[str, Any]] = {}
+    role = "assistant"
+    stop_reason = None
+
+    for event in event_stream:
+        if 'messageStart' in event:
+            role = event['messageStart'].get('role', role)
+        elif 'contentBlockStart' in event:
+            start = event['contentBlockStart']
+            tool_use = start.get('start', {}).get('toolUse')
+            if tool_use:
+                blocks[start['contentBlockIndex']] = {
+                    "toolUse": {"toolUseId": tool_use['toolUseId'], "name": tool_use['name']},
+                    "input_json": []
+                }
+        elif 'contentBlockDelta' in event:
+            delta_event = event['contentBlockDelta']
+            index = delta_event['contentBlockIndex']
+            delta = delta_event['delta']
+            if 'text' in delta:
+                block = blocks.setdefault(index, {"text": []})
+                block["text"].append(delta['text'])
+                yield "text", delta['text']
+            elif 'toolUse' in delta:
+                blocks[index]["input_json"].append(delta['toolUse'].get('input', ''))
+        elif 'contentBlockStop' in event:
+            block = blocks.get(event['contentBlockStop']['contentBlockIndex'])
+            if block and 'toolUse' in block:
+                raw_input = "".join(block.pop("input_json"))
+                block['toolUse']['input'] = json.loads(raw_input) if raw_input else {}
+                yield "tool_use", block['toolUse']
+        elif 'messageStop' in event:
+            stop_reason = event['messageStop'].get('stopReason')
+        elif 'metadata' in event:
+            yield "metadata", event['metadata']
+        else:
+            for error_key in ('internalServerException', 'modelStreamErrorException', 'validationException',
+                              'throttlingException', 'serviceUnavailableException'):
+                if error_key in event:
+                    raise RuntimeError(f"Bedrock stream error ({error_key}): {event[error_key].get('message')}")
+
+    content = []
+    for index in sorted(blocks):
+        block = blocks[index]
+        if 'text' in block:
+            content.append({"text": "".join(block['text'])})
+        elif 'toolUse' in block and 'input' in block['toolUse']:
+            content.append({"toolUse": block['toolUse']})
+    yield "message", {"role": role, "content": content, "stopReason": stop_reason}
+
+
+def converse_stream_with_claude(bedrock_client: boto3.client, request: Dict[str, Any], model_key: str = DEFAULT_MODEL) -> Iterator[Tuple[str, Any]]:
+    """
+    Send a request to Claude via the Bedrock ConverseStream API and yield the response as it arrives.
+
+    Args:
+    bedrock_client (boto3.client): The Bedrock runtime client.
+    request (Dict[str, Any]): The prepared request payload.
+    model_key (str): Key for the model to use. Defaults to DEFAULT_MODEL.
+
+    Yields:
+    Tuple[str, Any]: The events produced by iter_stream_events().
+
+    Raises:
+    ClientError: If there's an API-specific error from Bedrock.
+    ValueError: If an invalid model key is provided.
+    """
+    model_id = get_model_config(model_key)["model_id"]
+
+    request["modelId"] = model_id  # Ensure the correct model ID is used
+    # Not the current span while events are yielded: the consumer's own spans, such as tools
+    # submitted mid-stream, belong to its turn rather than to this call
+    converse_span = start_span("bedrock.converse_stream", model_id=model_id)
+    ended = False
+    try:
+        if converse_span.recording:
+            converse_span.set_attribute("request_bytes", len(json.dumps(request, default=str)))
+        try:
+            with use_span(converse_span):
+                response = _call_with_throttle_retry(bedrock_client.converse_stream, request)
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            error_message = e.response['Error']['Message']
+            logger.error(f"Bedrock API error: {error_code} - {error_message}")
+            if error_code == "ValidationException":
+                logger.warning("Check if the conversation alternates correctly between user and assistant roles")
+            raise
+        logger.info(f"Streaming response from Bedrock using model: {model_id}")
+        for event_type, payload in iter_stream_events(response['stream']):
+            if event_type == "metadata":
+                record_usage(payload.get('usage'), payload.get('metrics'))
+                converse_span.set_attributes(_usage_attributes(payload.get('usage'), payload.get('metrics')))
+            elif event_type == "message":
+                # Emitted once messageStop and metadata are read: the call is over, whatever the
+                # consumer does with the message
+                converse_span.set_attribute("stop_reason", payload.get('stopReason'))
+                converse_span.end()
+                ended = True
+            yield event_type, payload
+    except Exception as e:
+        if not ended:
+            converse_span.set_error(e)
+        raise
+    finally:
+        if not ended:
+            converse_span.end()
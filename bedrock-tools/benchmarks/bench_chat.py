@@ -0,0 +1,227 @@
+"""
+Benchmark the chat loop and the tool layer against synthetic moto-backed accounts.
+
+For each account size (VPCs, subnets per VPC, routes per route table) the harness creates the
+resources in moto and replays a scripted conversation through chat(). A stub Bedrock client
+returns the scripted toolUse turns, so no model or AWS credentials are needed. The report has
+per-stage latency, EC2 API call counts, bytes sent to the model and peak traced memory, and is
+written to JSON so runs can be compared.
+
+Requires moto (pip install "moto[ec2]").
+
+Usage:
+    python benchmarks/bench_chat.py --scale 5,4,10 --scale 50,8,50 --output bench_chat.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REGION = "us-west-2"
+
+
+class ScriptedBedrockClient:
+    """
+    Stub Bedrock runtime client that answers each converse call with the next scripted turn.
+
+    It records the bytes of every request's messages and the time spent inside converse.
+    """
+
+    def __init__(self, turns: List[List[Dict[str, Any]]]):
+        self.turns = turns
+        self.calls = 0
+        self.request_bytes = []
+        self.seconds = 0.0
+
+    def converse(self, **request):
+        start = time.perf_counter()
+        self.request_bytes.append(len(json.dumps(request["messages"], default=str)))
+        content = self.turns[min(self.calls, len(self.turns) - 1)]
+        self.calls += 1
+        response = {
+            "output": {"message": {"role": "assistant", "content": content}},
+            "stopReason": "tool_use" if any("toolUse" in item for item in content) else "end_turn",
+            "usage": {"inputTokens": 0, "outputTokens": 0, "totalTokens": 0},
+            "metrics": {"latencyMs": 0}
+        }
+        self.seconds += time.perf_counter() - start
+        return response
+
+
+def create_account(vpcs: int, subnets: int, routes: int) -> List[str]:
+    """
+    Create VPCs with subnets, an Internet Gateway and extra routes in the main route table.
+    """
+    import boto3
+
+    ec2 = boto3.client("ec2", region_name=REGION)
+    vpc_ids = []
+    for v in range(vpcs):
+        vpc_id = ec2.create_vpc(CidrBlock=f"10.{v % 256}.0.0/16")["Vpc"]["VpcId"]
+        vpc_ids.append(vpc_id)
+        for s in range(subnets):
+            ec2.create_subnet(VpcId=vpc_id, CidrBlock=f"10.{v % 256}.{s}.0/24")
+        igw_id = ec2.create_internet_gateway()["InternetGateway"]["InternetGatewayId"]
+        ec2.attach_internet_gateway(InternetGatewayId=igw_id, VpcId=vpc_id)
+        route_table_id = ec2.describe_route_tables(
+            Filters=[{"Name": "vpc-id", "Values": [vpc_id]}]
+        )["RouteTables"][0]["RouteTableId"]
+        for r in range(routes):
+            ec2.create_route(RouteTableId=route_table_id, GatewayId=igw_id,
+                             DestinationCidrBlock=f"172.16.{r // 256}.{r % 256}/32")
+    return vpc_ids
+
+
+def build_script(vpc_ids: List[str]) -> List[List[Dict[str, Any]]]:
+    """
+    The scripted assistant turns: list the VPCs, inspect every VPC in parallel, describe the
+    whole region, then answer.
+    """
+    def tool_use(index: int, name: str, tool_input: Dict[str, Any]) -> Dict[str, Any]:
+        return {"toolUse": {"toolUseId": f"tooluse_{index}", "name": name, "input": tool_input}}
+
+    per_vpc = []
+    for vpc_id in vpc_ids:
+        for name in ("list_subnets", "get_route_tables", "describe_network_acls"):
+            per_vpc.append(tool_use(len(per_vpc) + 1, name, {"vpc_id": vpc_id, "region": REGION}))
+    return [
+        [tool_use(0, "list_vpcs", {"region": REGION})],
+        per_vpc,
+        [tool_use(len(per_vpc) + 1, "describe_region_network", {"region": REGION})],
+        [{"text": "Benchmark complete."}]
+    ]
+
+
+def run_scale(vpcs: int, subnets: int, routes: int) -> Dict[str, Any]:
+    """
+    Run the benchmark for one account size inside a fresh moto account.
+    """
+    from moto import mock_aws
+
+    with mock_aws():
+        from chat_engine import chat
+        from tools import get_all_tools, get_client, invalidate_cache, get_rate_limit_stats
+
+        setup_start = time.perf_counter()
+        vpc_ids = create_account(vpcs, subnets, routes)
+        setup_seconds = time.perf_counter() - setup_start
+
+        invalidate_cache()
+        operations = Counter()
+        ec2 = get_client("ec2", region=REGION)
+
+        def count_call(model, **kwargs):
+            operations[model.name] += 1
+
+        ec2.meta.events.register("before-call", count_call)
+        try:
+            bedrock_client = ScriptedBedrockClient(build_script(vpc_ids))
+            tool_timings = []
+            history_reports = []
+            calls_before = get_rate_limit_stats()["calls"]
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            messages = chat("Describe my network.", [], bedrock_client, get_all_tools(),
+                            tool_timings=tool_timings, history_reports=history_reports)
+            total_seconds = time.perf_counter() - start
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            calls_after = get_rate_limit_stats()["calls"]
+        finally:
+            ec2.meta.events.unregister("before-call", count_call)
+
+    per_tool = {}
+    for timing in tool_timings:
+        stats = per_tool.setdefault(timing["name"], {"calls": 0, "seconds": 0.0, "errors": 0})
+        stats["calls"] += 1
+        stats["seconds"] += timing["seconds"]
+        stats["errors"] += timing["status"] != "success"
+    for stats in per_tool.values():
+        stats["seconds"] = round(stats["seconds"], 4)
+
+    tool_seconds = sum(timing["seconds"] for timing in tool_timings)
+    return {
+        "scale": {"vpcs": vpcs, "subnets_per_vpc": subnets, "routes_per_table": routes},
+        "setup_seconds": round(setup_seconds, 3),
+        "latency_seconds": {
+            "total": round(total_seconds, 4),
+            "model_stub": round(bedrock_client.seconds, 4),
+            "tools_cumulative": round(tool_seconds, 4),
+            "outside_model": round(max(0.0, total_seconds - bedrock_client.seconds), 4)
+        },
+        "tools": per_tool,
+        "aws_api_calls": {"total": calls_after - calls_before, "by_operation": dict(operations)},
+        "model": {
+            "converse_calls": bedrock_client.calls,
+            "request_bytes": bedrock_client.request_bytes,
+            "total_request_bytes": sum(bedrock_client.request_bytes),
+            "history_bytes_saved": sum(report["bytes_saved"] for report in history_reports)
+        },
+        "messages": len(messages),
+        "peak_memory_bytes": peak_bytes
+    }
+
+
+def _parse_scale(value: str) -> Tuple[int, int, int]:
+    try:
+        vpcs, subnets, routes = (int(part) for part in value.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError("Scale must be VPCS,SUBNETS,ROUTES (e.g. 5,4,10)")
+    return vpcs, subnets, routes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chat() and the tools against synthetic moto accounts.")
+    parser.add_argument("--scale", type=_parse_scale, action="append",
+                        help="VPCS,SUBNETS,ROUTES per run; may be repeated. Defaults to 5,4,10 and 25,8,50.")
+    parser.add_argument("--output", default="bench_chat.json", help="Where to write the JSON report")
+    parser.add_argument("--keep-rate-limits", action="store_true",
+                        help="Keep the client-side rate limits, which otherwise dominate moto timings")
+    args = parser.parse_args()
+
+    # moto needs region and credentials but never checks them
+    os.environ.setdefault("AWS_DEFAULT_REGION", REGION)
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+    from tools import rate_limit
+    if not args.keep_rate_limits:
+        for service in list(rate_limit.SERVICE_RATE_LIMITS):
+            rate_limit.SERVICE_RATE_LIMITS[service] = (1e9, 10 ** 9)
+        rate_limit.DEFAULT_RATE_LIMIT = (1e9, 10 ** 9)
+    logging.disable(logging.INFO)
+
+    scales = args.scale or [(5, 4, 10), (25, 8, 50)]
+    results = []
+    for vpcs, subnets, routes in scales:
+        result = run_scale(vpcs, subnets, routes)
+        results.append(result)
+        print(f"{vpcs} VPCs x {subnets} subnets x {routes} routes: "
+              f"{result['latency_seconds']['total']:.3f}s total, "
+              f"{result['aws_api_calls']['total']} API calls, "
+              f"{result['model']['total_request_bytes']} bytes to model, "
+              f"{result['peak_memory_bytes'] / 1024:.0f} KiB peak")
+
+    report = {
+        "benchmark": "bench_chat",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "rate_limits": "enabled" if args.keep_rate_limits else "disabled",
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
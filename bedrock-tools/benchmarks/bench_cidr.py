@@ -0,0 +1,94 @@
+"""
+Benchmark batch CIDR analysis against one calculate_cidr_range call per CIDR.
+
+Generates a mix of IPv4 and IPv6 prefixes (VPC-sized blocks with nested subnets, like a large
+organization's address plan), then times calculate_cidr_ranges() on the whole list and
+calculate_cidr_range() in a loop. Results are written to JSON.
+
+Usage:
+    python benchmarks/bench_cidr.py --count 100000 --output bench_cidr.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.general_tools import calculate_cidr_range, calculate_cidr_ranges
+
+
+def generate_prefixes(count: int, ipv6_share: float = 0.2, seed: int = 7) -> List[str]:
+    """
+    Generate count prefixes: /16 IPv4 blocks with /24 subnets, and /56 IPv6 blocks with /64 subnets.
+    """
+    rng = random.Random(seed)
+    prefixes = []
+    while len(prefixes) < count:
+        if rng.random() < ipv6_share:
+            block = rng.getrandbits(24)
+            prefixes.append(f"2600:{block >> 8:x}:{block & 255:x}00::/56")
+            prefixes.extend(f"2600:{block >> 8:x}:{block & 255:x}{subnet:02x}::/64" for subnet in range(rng.randint(1, 8)))
+        else:
+            first, second = rng.choice((10, 172, 192)), rng.randint(0, 255)
+            prefixes.append(f"{first}.{second}.0.0/16")
+            prefixes.extend(f"{first}.{second}.{subnet}.0/24" for subnet in rng.sample(range(256), rng.randint(1, 16)))
+    return prefixes[:count]
+
+
+def timed(func, *args):
+    # Time an untraced run, then measure peak memory in a second run, since tracemalloc itself
+    # slows allocation-heavy code several times over
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch CIDR analysis.")
+    parser.add_argument("--count", type=int, default=100000, help="Number of prefixes")
+    parser.add_argument("--output", default="bench_cidr.json", help="Where to write the JSON report")
+    args = parser.parse_args()
+
+    prefixes = generate_prefixes(args.count)
+    table, batch_seconds, batch_peak = timed(calculate_cidr_ranges, prefixes)
+    _, loop_seconds, loop_peak = timed(lambda cidrs: [calculate_cidr_range(cidr) for cidr in cidrs], prefixes)
+
+    contained = sum(1 for row in table["rows"] if row[-1] is not None)
+    result = {
+        "prefixes": len(prefixes),
+        "ipv6_prefixes": sum(1 for row in table["rows"] if row[1] == 6),
+        "contained_prefixes": contained,
+        "errors": len(table["errors"]),
+        "batch": {"seconds": round(batch_seconds, 4), "prefixes_per_second": round(len(prefixes) / batch_seconds),
+                  "peak_memory_bytes": batch_peak, "includes_containment": True},
+        "per_call_loop": {"seconds": round(loop_seconds, 4), "prefixes_per_second": round(len(prefixes) / loop_seconds),
+                          "peak_memory_bytes": loop_peak, "includes_containment": False},
+        "speedup": round(loop_seconds / batch_seconds, 2)
+    }
+    print(f"{len(prefixes)} prefixes: batch {batch_seconds:.3f}s (with containment), "
+          f"per-call loop {loop_seconds:.3f}s (without), {result['speedup']}x")
+
+    report = {
+        "benchmark": "bench_cidr",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "results": [result]
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
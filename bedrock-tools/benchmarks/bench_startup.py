@@ -0,0 +1,131 @@
+"""
+Measure startup cost of the CLI, server and Cloud WAN Lambda modules.
+
+Each target is imported in a fresh interpreter with `python -X importtime`, several times, and the
+median cumulative import time is reported together with the heaviest modules it pulled in. The
+Lambda target also runs one handler invocation that needs no AWS call, which is what a cold start
+for a cache or stats action costs.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 5 --top 10 --output bench_startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+BEDROCK_TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAMBDA_DIR = os.path.join(os.path.dirname(BEDROCK_TOOLS_DIR), "bedrock-agents", "src")
+
+LAMBDA_STATS_EVENT = {
+    "agent": {}, "actionGroup": "cloudwan", "function": "get_cache_stats", "messageVersion": "1.0"
+}
+
+# (label, working directory, module to import, code to run after the import)
+TARGETS = [
+    ("tools", BEDROCK_TOOLS_DIR, "tools", ""),
+    ("bedrock_utils", BEDROCK_TOOLS_DIR, "bedrock_utils", ""),
+    ("chat_engine", BEDROCK_TOOLS_DIR, "chat_engine", ""),
+    ("main", BEDROCK_TOOLS_DIR, "main", ""),
+    ("server", BEDROCK_TOOLS_DIR, "server", ""),
+    ("cloud_wan_agent", LAMBDA_DIR, "cloud_wan_agent", ""),
+    ("cloud_wan_agent:get_cache_stats", LAMBDA_DIR, "cloud_wan_agent",
+     "import contextlib, io\n"
+     "with contextlib.redirect_stdout(io.StringIO()):\n"
+     f"    cloud_wan_agent.lambda_handler({LAMBDA_STATS_EVENT!r}, None)"),
+]
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def measure(cwd: str, module: str, code: str) -> Dict[str, Any]:
+    """
+    Import a module in a fresh interpreter and return the import timings and wall-clock time.
+    """
+    env = dict(os.environ, AWS_DEFAULT_REGION=os.environ.get("AWS_DEFAULT_REGION", "us-west-2"))
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}\n{code}"],
+        cwd=cwd, env=env, capture_output=True, text=True
+    )
+    wall_seconds = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed: {completed.stderr.strip().splitlines()[-1]}")
+    modules = _parse_importtime(completed.stderr)
+    # A module's dependencies are the deeper-indented lines printed just before it
+    index = next((i for i, (name, _, _) in enumerate(modules) if name.strip() == module), None)
+    if index is None:
+        return {"import_us": 0, "wall_seconds": wall_seconds, "modules": []}
+    depth = len(modules[index][0]) - len(modules[index][0].lstrip())
+    start = index
+    while start > 0 and len(modules[start - 1][0]) - len(modules[start - 1][0].lstrip()) > depth:
+        start -= 1
+    return {"import_us": modules[index][2], "wall_seconds": wall_seconds, "modules": modules[start:index]}
+
+
+def run_target(label: str, cwd: str, module: str, code: str, repeat: int, top: int) -> Dict[str, Any]:
+    """
+    Measure one target repeat times and summarize the median run.
+    """
+    runs = [measure(cwd, module, code) for _ in range(repeat)]
+    median_run = sorted(runs, key=lambda run: run["import_us"])[len(runs) // 2]
+    heaviest = sorted(median_run["modules"], key=lambda entry: entry[2], reverse=True)[:top]
+    return {
+        "target": label,
+        "import_ms": round(statistics.median(run["import_us"] for run in runs) / 1000, 2),
+        "process_ms": round(statistics.median(run["wall_seconds"] for run in runs) * 1000, 2),
+        "modules_imported": len(median_run["modules"]) + 1,
+        "heaviest_imports": [
+            {"module": name.strip(), "depth": (len(name) - len(name.lstrip())) // 2 - 1,
+             "self_ms": round(self_us / 1000, 2), "cumulative_ms": round(cumulative_us / 1000, 2)}
+            for name, self_us, cumulative_us in heaviest
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import cost per module for the CLI, server and Lambda.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per target")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest imports to list per target")
+    parser.add_argument("--output", default="bench_startup.json", help="Where to write the JSON report")
+    args = parser.parse_args()
+
+    results = []
+    for label, cwd, module, code in TARGETS:
+        try:
+            result = run_target(label, cwd, module, code, args.repeat, args.top)
+        except RuntimeError as e:
+            print(f"{label}: skipped ({e})")
+            continue
+        results.append(result)
+        heaviest = ", ".join(f"{entry['module']} {entry['cumulative_ms']}ms" for entry in result["heaviest_imports"][:3])
+        print(f"{label}: {result['import_ms']}ms import, {result['process_ms']}ms process; heaviest: {heaviest}")
+
+    report = {
+        "benchmark": "bench_startup",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Load test the multi-session HTTP server.
+
+Each simulated user creates a session and sends its messages one after another; all users run
+concurrently. By default the harness starts an in-process server with the stub Bedrock client, so
+no model or AWS credentials are needed; pass --url to drive a server that is already running
+(e.g. python server.py --stub). The report has status counts, latency percentiles of accepted
+requests, throughput and the server's /metrics counters, and is written to JSON so runs can be
+compared.
+
+Usage:
+    python benchmarks/load_server.py --users 20 --messages 5 --max-model-calls 4 --max-queued 8
+    python benchmarks/load_server.py --url http://127.0.0.1:8080 --users 50
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def request_json(method: str, url: str, body: Dict[str, Any] = None) -> Tuple[int, Dict[str, Any]]:
+    """
+    Send one JSON request and return the status code and the decoded body, for errors too.
+    """
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=120) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def run_user(base_url: str, messages: int) -> List[Tuple[int, float]]:
+    """
+    Create a session and send its messages in order, returning (status, seconds) per message.
+    """
+    status, body = request_json("POST", f"{base_url}/sessions")
+    if status != 201:
+        return [(status, 0.0)] * messages
+    results = []
+    for i in range(messages):
+        start = time.perf_counter()
+        status, _ = request_json("POST", f"{base_url}/sessions/{body['session_id']}/messages",
+                                 {"message": f"Message {i}"})
+        results.append((status, time.perf_counter() - start))
+    return results
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    return round(samples[min(len(samples) - 1, int(len(samples) * fraction))], 3) if samples else 0.0
+
+
+def run_load(base_url: str, users: int, messages: int) -> Dict[str, Any]:
+    """
+    Run all users concurrently and summarize the responses.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        results = [r for user in executor.map(lambda _: run_user(base_url, messages), range(users)) for r in user]
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(seconds for status, seconds in results if status == 200)
+    return {
+        "users": users,
+        "messages_per_user": messages,
+        "statuses": dict(sorted(Counter(str(status) for status, _ in results).items())),
+        "latency_seconds": {
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+            "max": round(latencies[-1], 3) if latencies else 0.0
+        },
+        "throughput_per_second": round(len(latencies) / elapsed, 1),
+        "elapsed_seconds": round(elapsed, 3),
+        "server": request_json("GET", f"{base_url}/metrics")[1].get("service")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the multi-session HTTP server.")
+    parser.add_argument("--url", help="Base URL of a running server; by default a stub server is started in-process")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent sessions")
+    parser.add_argument("--messages", type=int, default=5, help="Messages each session sends in turn")
+    parser.add_argument("--max-model-calls", type=int, default=4, help="In-process server: concurrent model calls")
+    parser.add_argument("--max-queued", type=int, default=8, help="In-process server: requests queued for a model slot")
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="In-process server: seconds per model call")
+    parser.add_argument("--output", default="load_server.json", help="Where to write the JSON report")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        from server import ChatService, StubBedrockClient, create_server
+
+        service = ChatService(StubBedrockClient(latency=args.stub_latency), [],
+                              max_model_calls=args.max_model_calls, max_queued=args.max_queued)
+        server = create_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        result = run_load(base_url.rstrip("/"), args.users, args.messages)
+    finally:
+        if server:
+            server.shutdown()
+            server.server_close()
+    print(f"{args.users} users x {args.messages} messages: {result['statuses']}, "
+          f"p50 {result['latency_seconds']['p50']:.3f}s, p95 {result['latency_seconds']['p95']:.3f}s, "
+          f"{result['throughput_per_second']} replies/s")
+
+    report = {
+        "benchmark": "load_server",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "target": args.url or "in-process stub server",
+        "result": result
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,193 @@
 # chat_engine.py
+import contextvars
 import json
 import logging
-from typing import List, Dict, Any
-from tool_handler import handle_tool_use
-from bedrock_utils import converse_with_claude, create_converse_request
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from tool_handler import handle_tool_use, ahandle_tool_use
+from bedrock_utils import converse_with_claude, aconverse_with_claude, converse_stream_with_claude, create_converse_request, DEFAULT_MODEL
+from history_manager import compact_history, DEFAULT_TOKEN_BUDGET
+from tools.tracing import span, traced
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def chat(user_input: str, messages: List[Dict[str, Any]], bedrock_client: Any, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+# Bounds for concurrent tool dispatch within one assistant turn. A tool that times out cannot be
+# stopped: its thread keeps its worker until the AWS call returns, which the connect and read
+# timeouts in tools/aws_clients.py (CLIENT_TIMEOUTS) bound. Size the pool for the tools that may
+# still be running from abandoned turns.
+MAX_TOOL_WORKERS = 8
+TOOL_TIMEOUT_SECONDS = 30.0
+
+_tool_executor = ThreadPoolExecutor(max_workers=MAX_TOOL_WORKERS, thread_name_prefix="tool")
+
+
+def _timed_tool_use(tool_use: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+    start = time.perf_counter()
+    result = handle_tool_use(tool_use)
+    return result, time.perf_counter() - start
+
+
+def _tool_error_result(tool_use: Dict[str, Any], message: str) -> Dict[str, Any]:
+    return {
+        "toolResult": {
+            "toolUseId": tool_use['toolUseId'],
+            "content": [{"text": message}],
+            "status": "error"
+        }
+    }
+
+
+def submit_tool_use(tool_use: Dict[str, Any]) -> Tuple[Any, float]:
+    """
+    Start a tool use on the shared tool pool without waiting for it.
+
+    Args:
+    tool_use (Dict[str, Any]): The toolUse block requested by Claude.
+
+    Returns:
+    Tuple[Any, float]: The future for the tool run and the time it was dispatched.
+    """
+    # Run in a copy of the caller's context so the tool's spans nest under the current turn
+    context = contextvars.copy_context()
+    return _tool_executor.submit(context.run, _timed_tool_use, tool_use), time.perf_counter()
+
+
+def collect_tool_results(tool_uses: List[Dict[str, Any]], dispatched: List[Tuple[Any, float]], timeout: float = TOOL_TIMEOUT_SECONDS) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Wait for dispatched tool uses and build their toolResult blocks in tool use order.
+
+    Args:
+    tool_uses (List[Dict[str, Any]]): The toolUse blocks requested by Claude.
+    dispatched (List[Tuple[Any, float]]): The (future, dispatch time) pairs from submit_tool_use(), in the same order.
+    timeout (float): Seconds to wait for each tool, counted from its dispatch. Defaults to TOOL_TIMEOUT_SECONDS.
+
+    Returns:
+    Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: The toolResult content blocks, and the
+    per-tool timings as dictionaries with 'name', 'toolUseId', 'seconds' and 'status'.
+    """
+    results = []
+    timings = []
+    for tool_use, (future, dispatched_at) in zip(tool_uses, dispatched):
+        remaining = max(0.0, timeout - (time.perf_counter() - dispatched_at))
+        try:
+            tool_result, elapsed = future.result(timeout=remaining)
+            results.append(tool_result['content'][0])
+            # dispatch() reports tool failures in the result rather than raising
+            status = tool_result['content'][0]['toolResult']['status']
+        except FutureTimeoutError:
+            elapsed = time.perf_counter() - dispatched_at
+            logger.error(f"Tool {tool_use['name']} timed out after {timeout}s; it keeps running in the background and its result will be discarded")
+            results.append(_tool_error_result(tool_use, f"Tool {tool_use['name']} timed out after {timeout} seconds"))
+            status = "timeout"
+        except Exception as e:
+            elapsed = time.perf_counter() - dispatched_at
+            logger.error(f"Error in tool use: {str(e)}")
+            results.append(_tool_error_result(tool_use, str(e)))
+            status = "error"
+        logger.info(f"Tool {tool_use['name']} finished in {elapsed:.3f}s ({status})")
+        timings.append({"name": tool_use['name'], "toolUseId": tool_use['toolUseId'], "seconds": elapsed, "status": status})
+    return results, timings
+
+
+def run_tool_uses(tool_uses: List[Dict[str, Any]], timeout: float = TOOL_TIMEOUT_SECONDS) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Run the tool uses from one assistant turn concurrently on the shared tool pool.
+
+    Results are returned in the same order as the tool uses so the toolResult blocks sent back
+    to Claude are deterministic, regardless of which tool finishes first.
+
+    Args:
+    tool_uses (List[Dict[str, Any]]): The toolUse blocks requested by Claude.
+    timeout (float): Seconds to wait for each tool, counted from dispatch. Defaults to TOOL_TIMEOUT_SECONDS.
+
+    Returns:
+    Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: The toolResult content blocks and the per-tool timings.
+    """
+    dispatched = [submit_tool_use(tool_use) for tool_use in tool_uses]
+    return collect_tool_results(tool_uses, dispatched, timeout)
+
+
+def _stream_assistant_turn(bedrock_client: Any, request: Dict[str, Any], on_text: Optional[Callable[[str], None]], model_key: str = DEFAULT_MODEL) -> Tuple[Dict[str, Any], List[Dict[str, Any]], List[Tuple[Any, float]]]:
+    """
+    Stream one assistant turn, starting each tool as soon as its toolUse block is complete.
+
+    Returns:
+    Tuple: The assistant response message, the tool uses in order, and their (future, dispatch time) pairs.
+    """
+    response = None
+    tool_uses = []
+    dispatched = []
+    for event_type, payload in converse_stream_with_claude(bedrock_client, request, model_key=model_key):
+        if event_type == "text":
+            if on_text:
+                on_text(payload)
+        elif event_type == "tool_use":
+            logger.info(f"Claude is using the {payload['name']} tool.")
+            tool_uses.append(payload)
+            dispatched.append(submit_tool_use(payload))
+        elif event_type == "message":
+            response = payload
+    return response, tool_uses, dispatched
+
+
+async def _arun_tool_use(tool_use: Dict[str, Any], timeout: float) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    # Imported here so the synchronous chat path never loads asyncio
+    import asyncio
+
+    start = time.perf_counter()
+    try:
+        tool_result = (await asyncio.wait_for(ahandle_tool_use(tool_use), timeout))['content'][0]
+        status = tool_result['toolResult']['status']
+    except asyncio.TimeoutError:
+        logger.error(f"Tool {tool_use['name']} timed out after {timeout}s")
+        tool_result = _tool_error_result(tool_use, f"Tool {tool_use['name']} timed out after {timeout} seconds")
+        status = "timeout"
+    except Exception as e:
+        logger.error(f"Error in tool use: {str(e)}")
+        tool_result = _tool_error_result(tool_use, str(e))
+        status = "error"
+    elapsed = time.perf_counter() - start
+    logger.info(f"Tool {tool_use['name']} finished in {elapsed:.3f}s ({status})")
+    return tool_result, {"name": tool_use['name'], "toolUseId": tool_use['toolUseId'], "seconds": elapsed, "status": status}
+
+
+async def arun_tool_uses(tool_uses: List[Dict[str, Any]], timeout: float = TOOL_TIMEOUT_SECONDS) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    asyncio variant of run_tool_uses(): run one turn's tool uses concurrently on the event loop.
+
+    Args:
+    tool_uses (List[Dict[str, Any]]): The toolUse blocks requested by Claude.
+    timeout (float): Seconds to wait for each tool. Defaults to TOOL_TIMEOUT_SECONDS.
+
+    Returns:
+    Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: The toolResult content blocks, in tool use
+    order, and the per-tool timings.
+    """
+    import asyncio
+
+    outcomes = await asyncio.gather(*(_arun_tool_use(tool_use, timeout) for tool_use in tool_uses))
+    return [result for result, _ in outcomes], [timing for _, timing in outcomes]
+
+
+def _assistant_message(response: Dict[str, Any], log_tool_uses: bool = True) -> Dict[str, Any]:
+    assistant_message = {"role": "assistant", "content": []}
+    for content in response['content']:
+        if 'text' in content:
+            logger.info(f"Claude: {content['text']}")
+            assistant_message['content'].append({"text": content['text']})
+        elif 'toolUse' in content:
+            tool_use = content['toolUse']
+            if log_tool_uses:
+                logger.info(f"Claude is using the {tool_use['name']} tool.")
+            assistant_message['content'].append({"toolUse": tool_use})
+    return assistant_message
+
+
+@traced("chat.turn")
+def chat(user_input: str, messages: List[Dict[str, Any]], bedrock_client: Any, tools: List[Dict[str, Any]], tool_timings: Optional[List[Dict[str, Any]]] = None, stream: bool = False, on_text: Optional[Callable[[str], None]] = None, token_budget: int = DEFAULT_TOKEN_BUDGET, history_reports: Optional[List[Dict[str, int]]] = None, model_key: str = DEFAULT_MODEL) -> List[Dict[str, Any]]:
     """
     Main chat function to interact with Claude, handling tool use and maintaining conversation flow.
 
@@ -18,6 +196,13 @@ def chat(user_input: str, messages: List[Dict[str, Any]], bedrock_client: Any, t
     messages (List[Dict[str, Any]]): The conversation history.
     bedrock_client (Any): The Bedrock client for making API calls.
     tools (List[Dict[str, Any]]): List of available tools for Claude to use.
+    tool_timings (List[Dict[str, Any]], optional): If given, per-tool wall-clock timings are appended to it.
+    stream (bool): Use the ConverseStream API and start tools as soon as each toolUse block is complete. Defaults to False.
+    on_text (Callable[[str], None], optional): Called with each text delta when streaming.
+    token_budget (int): Estimated token budget for the history sent to Claude. Older tool results are
+                        summarized, then the oldest turns dropped, to stay within it. Defaults to DEFAULT_TOKEN_BUDGET.
+    history_reports (List[Dict[str, int]], optional): If given, the per-call compaction report is appended to it.
+    model_key (str): Key of the model in AVAILABLE_MODELS. Defaults to DEFAULT_MODEL.
 
     Returns:
     List[Dict[str, Any]]: Updated conversation history including Claude's responses and tool uses.
@@ -31,12 +216,20 @@ def chat(user_input: str, messages: List[Dict[str, Any]], bedrock_client: Any, t
         
         while True:
             # Get Claude's response
-            request = create_converse_request(messages, tools)
-            response = converse_with_claude(bedrock_client, request)
+            with span("chat.compact_history") as history_span:
+                request_messages, history_report = compact_history(messages, token_budget)
+                history_span.set_attributes(history_report)
+            if history_reports is not None:
+                history_reports.append(history_report)
+            request = create_converse_request(request_messages, tools, model_key=model_key)
+            dispatched = None
+            if stream:
+                response, streamed_tool_uses, dispatched = _stream_assistant_turn(bedrock_client, request, on_text, model_key=model_key)
+            else:
+                response = converse_with_claude(bedrock_client, request, model_key=model_key)
 
-            # Example Use Claude 3 Sonnet
-            # request = create_converse_request(messages, tools, model_key="claude_3_sonnet")
-            # response = converse_with_claude(bedrock_client, request, model_key="claude_3_sonnet")
+            # Example Use Claude 3.7 Sonnet, which also enables prompt caching
+            # chat(user_input, messages, bedrock_client, tools, model_key="claude_3_7_sonnet")
 
             
             if not response or 'content' not in response:
@@ -44,31 +237,23 @@ def chat(user_input: str, messages: List[Dict[str, Any]], bedrock_client: Any, t
                 raise ValueError("Invalid response from Claude")
             
             # Process Claude's response
-            assistant_message = {"role": "assistant", "content": []}
-            for content in response['content']:
-                if 'text' in content:
-                    logger.info(f"Claude: {content['text']}")
-                    assistant_message['content'].append({"text": content['text']})
-                elif 'toolUse' in content:
-                    tool_use = content['toolUse']
-                    logger.info(f"Claude is using the {tool_use['name']} tool.")
-                    assistant_message['content'].append({"toolUse": tool_use})
+            assistant_message = _assistant_message(response, log_tool_uses=not stream)
             
             # Add Claude's response to messages
             messages.append(assistant_message)
             
             # Check if Claude used a tool
             if any('toolUse' in item for item in assistant_message['content']):
-                # Handle all tool uses
-                user_message = {"role": "user", "content": []}
-                for item in assistant_message['content']:
-                    if 'toolUse' in item:
-                        try:
-                            tool_result = handle_tool_use(item['toolUse'])
-                            user_message['content'].append(tool_result['content'][0])
-                        except Exception as e:
-                            logger.error(f"Error in tool use: {str(e)}")
-                            user_message['content'].append({"toolResult": {"status": "error", "message": str(e)}})
+                # Handle all tool uses concurrently, keeping the toolResult order stable
+                if dispatched is not None:
+                    # Streamed tool uses were already started as their blocks completed
+                    tool_results, timings = collect_tool_results(streamed_tool_uses, dispatched)
+                else:
+                    tool_uses = [item['toolUse'] for item in assistant_message['content'] if 'toolUse' in item]
+                    tool_results, timings = run_tool_uses(tool_uses)
+                if tool_timings is not None:
+                    tool_timings.extend(timings)
+                user_message = {"role": "user", "content": tool_results}
                 
                 # Add tool results as a user message
                 messages.append(user_message)
@@ -81,6 +266,61 @@ def chat(user_input: str, messages: List[Dict[str, Any]], bedrock_client: Any, t
         logger.error(f"An error occurred in the chat function: {str(e)}")
         raise
 
+
+@traced("chat.turn")
+async def achat(user_input: str, messages: List[Dict[str, Any]], bedrock_client: Any, tools: List[Dict[str, Any]], tool_timings: Optional[List[Dict[str, Any]]] = None, token_budget: int = DEFAULT_TOKEN_BUDGET, history_reports: Optional[List[Dict[str, int]]] = None, model_key: str = DEFAULT_MODEL) -> List[Dict[str, Any]]:
+    """
+    asyncio variant of chat() for serving many sessions from one event loop.
+
+    The conversation flow, history compaction and toolResult ordering are the same as chat() with
+    stream=False. Bedrock and AWS calls run on the shared AWS I/O pool, so a waiting session holds
+    no thread of its own.
+
+    Args:
+    user_input (str): The user's input text.
+    messages (List[Dict[str, Any]]): The conversation history.
+    bedrock_client (Any): The Bedrock client for making API calls.
+    tools (List[Dict[str, Any]]): List of available tools for Claude to use.
+    tool_timings (List[Dict[str, Any]], optional): If given, per-tool wall-clock timings are appended to it.
+    token_budget (int): Estimated token budget for the history sent to Claude. Defaults to DEFAULT_TOKEN_BUDGET.
+    history_reports (List[Dict[str, int]], optional): If given, the per-call compaction report is appended to it.
+    model_key (str): Key of the model in AVAILABLE_MODELS. Defaults to DEFAULT_MODEL.
+
+    Returns:
+    List[Dict[str, Any]]: Updated conversation history including Claude's responses and tool uses.
+    """
+    try:
+        messages.append({"role": "user", "content": [{"text": user_input}]})
+
+        while True:
+            with span("chat.compact_history") as history_span:
+                request_messages, history_report = compact_history(messages, token_budget)
+                history_span.set_attributes(history_report)
+            if history_reports is not None:
+                history_reports.append(history_report)
+            request = create_converse_request(request_messages, tools, model_key=model_key)
+            response = await aconverse_with_claude(bedrock_client, request, model_key=model_key)
+
+            if not response or 'content' not in response:
+                logger.error("Unexpected response format from Claude.")
+                raise ValueError("Invalid response from Claude")
+
+            assistant_message = _assistant_message(response)
+            messages.append(assistant_message)
+
+            tool_uses = [item['toolUse'] for item in assistant_message['content'] if 'toolUse' in item]
+            if not tool_uses:
+                break
+            tool_results, timings = await arun_tool_uses(tool_uses)
+            if tool_timings is not None:
+                tool_timings.extend(timings)
+            messages.append({"role": "user", "content": tool_results})
+
+        return messages
+    except Exception as e:
+        logger.error(f"An error occurred in the achat function: {str(e)}")
+        raise
+
 def print_conversation(messages: List[Dict[str, Any]]) -> None:
     """
     Print the entire conversation history in a readable format.
@@ -110,7 +350,11 @@ def print_conversation(messages: List[Dict[str, Any]]) -> None:
                 if 'toolUseId' in tool_result:
                     print(f"    ID: {tool_result['toolUseId']}")
                 if 'content' in tool_result:
-                    print(f"    Output: {json.dumps(tool_result['content'][0]['json'], indent=2)}")
+                    output = tool_result['content'][0]
+                    if 'json' in output:
+                        print(f"    Output: {json.dumps(output['json'], indent=2)}")
+                    else:
+                        print(f"    Output: {output.get('text')}")
                 if 'message' in tool_result:
                     print(f"    Message: {tool_result['message']}")
         print("-" * 50)
\ No newline at end of file
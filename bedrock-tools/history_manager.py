@@ -0,0 +1,142 @@
+# history_manager.py
+import json
+import logging
+from typing import List, Dict, Any, Tuple
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+# Rough characters-per-token ratio for JSON-heavy Claude prompts
+CHARS_PER_TOKEN = 4
+
+# Default token budget for the conversation history sent on each converse call
+DEFAULT_TOKEN_BUDGET = 20000
+
+# The most recent messages are never compacted, so Claude always sees the latest tool results in full
+KEEP_RECENT_MESSAGES = 4
+
+
+def message_size(message: Dict[str, Any]) -> int:
+    """
+    Return the serialized size of a message in bytes.
+
+    Args:
+    message (Dict[str, Any]): A conversation message.
+
+    Returns:
+    int: The length of the message's JSON encoding.
+    """
+    return len(json.dumps(message, default=str))
+
+
+def estimate_tokens(message: Dict[str, Any]) -> int:
+    """
+    Estimate the number of input tokens a message will cost.
+
+    Args:
+    message (Dict[str, Any]): A conversation message.
+
+    Returns:
+    int: The estimated token count.
+    """
+    return -(-message_size(message) // CHARS_PER_TOKEN)
+
+
+def _summarize_tool_result(tool_result: Dict[str, Any], tokens: int) -> Dict[str, Any]:
+    keys = []
+    for item in tool_result.get('content', []):
+        if isinstance(item.get('json'), dict):
+            keys.extend(item['json'].keys())
+    summary = f"[Earlier tool result removed to save space: about {tokens} tokens"
+    if keys:
+        summary += f", fields: {', '.join(keys)}"
+    summary += ". Call the tool again if these details are needed.]"
+    return {
+        "toolResult": {
+            "toolUseId": tool_result['toolUseId'],
+            "content": [{"text": summary}],
+            "status": tool_result.get('status', 'success')
+        }
+    }
+
+
+def _is_turn_start(message: Dict[str, Any]) -> bool:
+    # A turn starts with a user message that carries text rather than tool results
+    return message['role'] == 'user' and not any('toolResult' in item for item in message['content'])
+
+
+def compact_history(messages: List[Dict[str, Any]], token_budget: int = DEFAULT_TOKEN_BUDGET) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Shrink the conversation history to fit a token budget before it is sent to Bedrock.
+
+    Old tool results are replaced by short text summaries first, oldest first. Each summary keeps
+    its toolUseId, so every toolUse still has a matching toolResult and Bedrock validation passes.
+    If that is not enough, whole turns are dropped from the start of the conversation, so the
+    history still begins with a user text message. The input list is not modified.
+
+    Args:
+    messages (List[Dict[str, Any]]): The full conversation history.
+    token_budget (int): The target estimated token count. Defaults to DEFAULT_TOKEN_BUDGET.
+
+    Returns:
+    Tuple[List[Dict[str, Any]], Dict[str, int]]: The compacted history and a report with the
+    original and compacted sizes, the bytes and tokens saved, and what was removed.
+    """
+    sizes = [message_size(message) for message in messages]
+    original_bytes = sum(sizes)
+    original_tokens = -(-original_bytes // CHARS_PER_TOKEN)
+    compacted = list(messages)
+    total_tokens = original_tokens
+    truncated_results = 0
+    dropped_messages = 0
+
+    if total_tokens > token_budget:
+        for index in range(max(0, len(compacted) - KEEP_RECENT_MESSAGES)):
+            if total_tokens <= token_budget:
+                break
+            message = compacted[index]
+            if not any('toolResult' in item for item in message['content']):
+                continue
+            new_content = []
+            for item in message['content']:
+                if 'toolResult' in item and any('json' in block for block in item['toolResult'].get('content', [])):
+                    item_tokens = estimate_tokens(item)
+                    new_item = _summarize_tool_result(item['toolResult'], item_tokens)
+                    total_tokens -= item_tokens - estimate_tokens(new_item)
+                    truncated_results += 1
+                    new_content.append(new_item)
+                else:
+                    new_content.append(item)
+            compacted[index] = {"role": message['role'], "content": new_content}
+
+    if total_tokens > token_budget:
+        # Drop up to the last turn start that leaves the most recent messages in place
+        keep_from = len(compacted) - KEEP_RECENT_MESSAGES
+        last_turn_start = max((i for i, message in enumerate(compacted) if i <= keep_from and _is_turn_start(message)), default=0)
+        start = 0
+        while total_tokens > token_budget and start < last_turn_start:
+            total_tokens -= estimate_tokens(compacted[start])
+            start += 1
+            while start < last_turn_start and not _is_turn_start(compacted[start]):
+                total_tokens -= estimate_tokens(compacted[start])
+                start += 1
+        dropped_messages = start
+        compacted = compacted[start:]
+
+    compacted_bytes = sum(message_size(message) for message in compacted) if (truncated_results or dropped_messages) else original_bytes
+    compacted_tokens = -(-compacted_bytes // CHARS_PER_TOKEN)
+    report = {
+        "original_bytes": original_bytes,
+        "compacted_bytes": compacted_bytes,
+        "bytes_saved": original_bytes - compacted_bytes,
+        "original_tokens": original_tokens,
+        "compacted_tokens": compacted_tokens,
+        "tokens_saved": original_tokens - compacted_tokens,
+        "truncated_results": truncated_results,
+        "dropped_messages": dropped_messages
+    }
+    if truncated_results or dropped_messages:
+        logger.info(f"Compacted history: saved {report['bytes_saved']} bytes (~{report['tokens_saved']} tokens), "
+                    f"truncated {truncated_results} tool results, dropped {dropped_messages} messages")
+    return compacted, report
@@ -3,6 +3,9 @@ from bedrock_utils import initialize_bedrock_client
 from tools import get_all_tools
 
 
+def _print_delta(text):
+    print(text, end="", flush=True)
+
 
 def main():
     bedrock_client = initialize_bedrock_client()
@@ -16,7 +19,9 @@ def main():
         user_input = input("You: ")
         if user_input.lower() in ['exit', 'quit', 'bye']:
             break
-        chat(user_input, messages, bedrock_client, tools)
+        print("Claude: ", end="", flush=True)
+        chat(user_input, messages, bedrock_client, tools, stream=True, on_text=_print_delta)
+        print()
     
     print("\nFinal Conversation History:")
     print_conversation(messages)
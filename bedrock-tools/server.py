@@ -0,0 +1,371 @@
+# server.py
+"""
+HTTP front end that serves the AWS Network Assistant to many sessions at once.
+
+Each request runs the synchronous chat() on a ThreadingHTTPServer worker thread rather than
+achat() on an event loop. The work is dominated by blocking boto3 calls: the Bedrock converse
+call and the tool calls, which chat() already fans out over its own thread pool. achat() would
+only move those calls onto executor threads, so it saves no threads while needing an asyncio
+HTTP stack that the standard library does not provide. Concurrency is bounded explicitly instead:
+LimitedBedrockClient caps the model calls in progress, and ChatService rejects requests with
+503 once max_model_calls + max_queued are admitted, so the number of busy threads stays bounded.
+
+Run with --stub to serve without Bedrock, and load test with benchmarks/load_server.py.
+"""
+import argparse
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from chat_engine import chat
+from bedrock_utils import initialize_bedrock_client, get_usage_stats
+from tools import configure_clients, get_all_tools, get_cache_stats, get_client_stats, get_rate_limit_stats
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+# Model calls allowed at once across all sessions; further calls wait in the queue
+MAX_MODEL_CALLS = 4
+# Requests that may wait for a model slot before new ones are rejected with 503
+MAX_QUEUED_REQUESTS = 32
+# Seconds a queued model call waits for a slot before the request fails with 503
+QUEUE_TIMEOUT_SECONDS = 60.0
+# Sessions idle for longer than this are dropped
+SESSION_IDLE_SECONDS = 3600
+# Latency samples kept per session for the /metrics percentiles
+LATENCY_SAMPLES = 1000
+# Seconds suggested to clients in Retry-After when a request is rejected
+RETRY_AFTER_SECONDS = 2
+
+
+class ServerBusyError(Exception):
+    """Raised when a request cannot get a model slot in time."""
+
+
+class LimitedBedrockClient:
+    """
+    Wraps the shared Bedrock client so at most max_calls converse requests run at once.
+
+    Everything except converse and converse_stream is passed through to the wrapped client.
+    """
+
+    def __init__(self, client: Any, max_calls: int = MAX_MODEL_CALLS, timeout: float = QUEUE_TIMEOUT_SECONDS):
+        self._client = client
+        self._slots = threading.BoundedSemaphore(max_calls)
+        self._timeout = timeout
+
+    def _acquire(self) -> None:
+        if not self._slots.acquire(timeout=self._timeout):
+            raise ServerBusyError(f"No model slot became free within {self._timeout} seconds")
+
+    def converse(self, **request):
+        self._acquire()
+        try:
+            return self._client.converse(**request)
+        finally:
+            self._slots.release()
+
+    def converse_stream(self, **request):
+        # Read the whole stream while holding the slot, so the cap covers the full generation
+        self._acquire()
+        try:
+            response = self._client.converse_stream(**request)
+            events = list(response['stream'])
+        finally:
+            self._slots.release()
+        return dict(response, stream=events)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+class StubBedrockClient:
+    """
+    Offline stand-in for the Bedrock runtime client, used to load-test the server.
+
+    Every converse call sleeps for latency seconds and answers with a short text message.
+    """
+
+    def __init__(self, latency: float = 0.05, reply: str = "Stub reply."):
+        self.latency = latency
+        self.reply = reply
+
+    def converse(self, **request):
+        time.sleep(self.latency)
+        return {
+            "output": {"message": {"role": "assistant", "content": [{"text": self.reply}]}},
+            "stopReason": "end_turn",
+            "usage": {"inputTokens": 0, "outputTokens": 0, "totalTokens": 0},
+            "metrics": {"latencyMs": int(self.latency * 1000)}
+        }
+
+
+class Session:
+    """
+    One conversation: its history, a lock that serializes its turns, and its latency samples.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.messages: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.requests = 0
+        self.errors = 0
+        self.last_used = time.monotonic()
+
+    def latency_summary(self) -> Dict[str, Any]:
+        samples = sorted(self.latencies)
+        summary = {"requests": self.requests, "errors": self.errors}
+        if samples:
+            summary.update({
+                "p50_seconds": round(samples[len(samples) // 2], 3),
+                "p95_seconds": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+                "max_seconds": round(samples[-1], 3)
+            })
+        return summary
+
+
+class ChatService:
+    """
+    Multi-session chat service shared by all HTTP handler threads.
+
+    Sessions keep separate histories but share one Bedrock client, capped at max_model_calls
+    concurrent calls, and the process-wide AWS client pool and result cache. Admission is bounded:
+    once max_model_calls + max_queued requests are in progress, new requests are rejected so the
+    server sheds load instead of queuing without limit.
+    """
+
+    def __init__(self, bedrock_client: Any, tools: List[Dict[str, Any]], max_model_calls: int = MAX_MODEL_CALLS,
+                 max_queued: int = MAX_QUEUED_REQUESTS, queue_timeout: float = QUEUE_TIMEOUT_SECONDS):
+        self.bedrock_client = LimitedBedrockClient(bedrock_client, max_model_calls, queue_timeout)
+        self.tools = tools
+        self._admission = threading.BoundedSemaphore(max_model_calls + max_queued)
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Session] = {}
+        self.counters = {"in_flight": 0, "completed": 0, "rejected": 0, "errors": 0}
+
+    def create_session(self) -> Session:
+        """
+        Start a new session, dropping sessions that have been idle too long.
+
+        Returns:
+        Session: The new session.
+        """
+        session = Session(uuid.uuid4().hex)
+        now = time.monotonic()
+        with self._lock:
+            for session_id in [sid for sid, s in self._sessions.items() if now - s.last_used > SESSION_IDLE_SECONDS]:
+                del self._sessions[session_id]
+            self._sessions[session.session_id] = session
+        return session
+
+    def get_session(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def delete_session(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def send_message(self, session: Session, text: str) -> Tuple[int, Dict[str, Any]]:
+        """
+        Run one chat turn for a session.
+
+        Args:
+        session (Session): The session to continue.
+        text (str): The user's message.
+
+        Returns:
+        Tuple[int, Dict[str, Any]]: The HTTP status code and the response body.
+        """
+        if not self._admission.acquire(blocking=False):
+            with self._lock:
+                self.counters["rejected"] += 1
+            return 503, {"error": "Server is at capacity, retry later"}
+        if not session.lock.acquire(blocking=False):
+            self._admission.release()
+            return 429, {"error": "This session is still processing a previous message"}
+
+        with self._lock:
+            self.counters["in_flight"] += 1
+        start = time.perf_counter()
+        try:
+            history_length = len(session.messages)
+            try:
+                chat(text, session.messages, self.bedrock_client, self.tools)
+            except ServerBusyError as e:
+                # Roll back the partial turn so the history still alternates correctly
+                del session.messages[history_length:]
+                return 503, {"error": str(e)}
+            except Exception as e:
+                del session.messages[history_length:]
+                session.errors += 1
+                with self._lock:
+                    self.counters["errors"] += 1
+                logger.error(f"Session {session.session_id} failed: {str(e)}")
+                return 500, {"error": str(e)}
+
+            elapsed = time.perf_counter() - start
+            session.latencies.append(elapsed)
+            reply = "".join(item['text'] for item in session.messages[-1]['content'] if 'text' in item)
+            return 200, {"session_id": session.session_id, "reply": reply, "latency_seconds": round(elapsed, 3)}
+        finally:
+            session.requests += 1
+            session.last_used = time.monotonic()
+            session.lock.release()
+            self._admission.release()
+            with self._lock:
+                self.counters["in_flight"] -= 1
+                self.counters["completed"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return service counters, per-session latency percentiles and the shared client and cache stats.
+
+        Returns:
+        Dict[str, Any]: The metrics document served at /metrics.
+        """
+        with self._lock:
+            sessions = dict(self._sessions)
+            counters = dict(self.counters)
+        return {
+            "service": counters,
+            "sessions": {session_id: session.latency_summary() for session_id, session in sessions.items()},
+            "bedrock_usage": get_usage_stats(),
+            "aws_clients": get_client_stats(),
+            "result_cache": get_cache_stats(),
+            "rate_limits": get_rate_limit_stats()
+        }
+
+
+_SESSION_PATH = re.compile(r"^/sessions/([0-9a-f]+)(/messages)?$")
+
+
+class ChatRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON API:
+
+    POST   /sessions                   -> {"session_id": ...}
+    POST   /sessions/<id>/messages     {"message": "..."} -> {"reply": ..., "latency_seconds": ...}
+    GET    /sessions/<id>              -> the session's conversation history
+    DELETE /sessions/<id>
+    GET    /metrics
+    """
+
+    service: ChatService = None
+
+    def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if status in (429, 503):
+            self.send_header("Retry-After", str(RETRY_AFTER_SECONDS))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            return self._send_json(200, self.service.metrics())
+        match = _SESSION_PATH.match(self.path)
+        session = self.service.get_session(match.group(1)) if match and not match.group(2) else None
+        if not session:
+            return self._send_json(404, {"error": "Not found"})
+        self._send_json(200, {"session_id": session.session_id, "messages": session.messages})
+
+    def do_POST(self):
+        if self.path == "/sessions":
+            return self._send_json(201, {"session_id": self.service.create_session().session_id})
+        match = _SESSION_PATH.match(self.path)
+        session = self.service.get_session(match.group(1)) if match and match.group(2) else None
+        if not session:
+            return self._send_json(404, {"error": "Not found"})
+        try:
+            text = self._read_json().get("message")
+        except (ValueError, AttributeError):
+            text = None
+        if not isinstance(text, str) or not text:
+            return self._send_json(400, {"error": "Body must be a JSON object with a non-empty 'message'"})
+        self._send_json(*self.service.send_message(session, text))
+
+    def do_DELETE(self):
+        match = _SESSION_PATH.match(self.path)
+        if match and not match.group(2) and self.service.delete_session(match.group(1)):
+            return self._send_json(200, {"deleted": match.group(1)})
+        self._send_json(404, {"error": "Not found"})
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} - {format % args}")
+
+
+def create_server(service: ChatService, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+    """
+    Build the HTTP server for a chat service.
+
+    Args:
+    service (ChatService): The service that handles the requests.
+    host (str): The address to bind. Defaults to 127.0.0.1.
+    port (int): The port to bind; 0 picks a free port. Defaults to 8080.
+
+    Returns:
+    ThreadingHTTPServer: The server, not yet started.
+    """
+    handler = type("BoundChatRequestHandler", (ChatRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def _parse_rate_limit(value: str) -> Tuple[float, int]:
+    try:
+        parts = value.split(",")
+        rate = float(parts[0])
+        burst = int(parts[1]) if len(parts) > 1 else max(1, int(rate))
+    except (ValueError, IndexError):
+        raise argparse.ArgumentTypeError("Rate limit must be RATE or RATE,BURST (e.g. 5,10)")
+    if rate <= 0 or burst < 1 or len(parts) > 2:
+        raise argparse.ArgumentTypeError("Rate must be positive and burst at least 1")
+    return rate, burst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the AWS Network Assistant over HTTP to many sessions.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-model-calls", type=int, default=MAX_MODEL_CALLS)
+    parser.add_argument("--max-queued", type=int, default=MAX_QUEUED_REQUESTS)
+    parser.add_argument("--bedrock-rate", type=_parse_rate_limit, default=None, metavar="RATE[,BURST]",
+                        help="Client-side limit on Bedrock calls per second (e.g. 5,10). By default only adaptive retry "
+                             "paces Bedrock, so --max-model-calls is the effective limit.")
+    parser.add_argument("--stub", action="store_true", help="Answer with a stub Bedrock client, for load testing")
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="Seconds each stub model call takes")
+    args = parser.parse_args()
+
+    if args.bedrock_rate:
+        configure_clients(rate_limits={"bedrock-runtime": args.bedrock_rate})
+    bedrock_client = StubBedrockClient(latency=args.stub_latency) if args.stub else initialize_bedrock_client()
+    service = ChatService(bedrock_client, get_all_tools(), max_model_calls=args.max_model_calls, max_queued=args.max_queued)
+    server = create_server(service, args.host, args.port)
+    logger.info(f"Network Assistant server listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
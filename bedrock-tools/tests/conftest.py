@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+# The tools package and the chat modules are imported from bedrock-tools/, as main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# moto needs a region and credentials but never checks them
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-west-2")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+
+@pytest.fixture
+def aws():
+    """
+    Run the test inside a fresh moto account, with empty client and result caches.
+    """
+    moto = pytest.importorskip("moto")
+    from tools import invalidate_cache
+    from tools.aws_clients import clear_clients
+
+    with moto.mock_aws():
+        clear_clients()
+        invalidate_cache()
+        yield
+        invalidate_cache()
+    clear_clients()
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+import boto3
+import pytest
+
+from tools import async_tools
+from tools.async_tools import run_blocking
+from tools.network_tools import adescribe_network_acls, alist_subnets, describe_network_acls, list_subnets
+from tools.vpc_tools import alist_vpcs, aget_route_tables, get_route_tables, list_vpcs
+
+REGION = "us-west-2"
+
+
+class ConcurrencyProbe:
+    """
+    A blocking function that records how many copies of itself run at once.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.running = 0
+        self.peak = 0
+        self.finished = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.running -= 1
+            self.finished += 1
+
+
+@pytest.fixture
+def io_limit(monkeypatch):
+    # Each asyncio.run() creates a new loop, so its semaphore picks up the patched limit
+    monkeypatch.setattr(async_tools, "AWS_IO_WORKERS", 4)
+    return 4
+
+
+def test_async_variants_match_sync_tools(aws):
+    ec2 = boto3.client("ec2", region_name=REGION)
+    vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16")["Vpc"]["VpcId"]
+    ec2.create_subnet(VpcId=vpc_id, CidrBlock="10.0.1.0/24")
+
+    async def gather():
+        return await asyncio.gather(alist_vpcs(REGION), alist_subnets(vpc_id, REGION),
+                                    aget_route_tables(vpc_id, REGION), adescribe_network_acls(vpc_id, REGION))
+
+    async_results = asyncio.run(gather())
+    sync_results = [list_vpcs(REGION, bypass_cache=True), list_subnets(vpc_id, REGION, bypass_cache=True),
+                    get_route_tables(vpc_id, REGION, bypass_cache=True), describe_network_acls(vpc_id, REGION, bypass_cache=True)]
+    assert async_results == sync_results
+
+
+def test_run_blocking_respects_the_limit(io_limit):
+    probe = ConcurrencyProbe(0.05)
+
+    async def main():
+        await asyncio.gather(*(run_blocking(probe) for _ in range(12)))
+
+    asyncio.run(main())
+    assert probe.finished == 12
+    assert probe.peak == io_limit
+
+
+def test_timed_out_calls_keep_their_permit_until_the_thread_finishes(io_limit):
+    probe = ConcurrencyProbe(0.3)
+
+    async def main():
+        timeouts = await asyncio.gather(
+            *(asyncio.wait_for(run_blocking(probe), 0.05) for _ in range(io_limit)), return_exceptions=True)
+        assert all(isinstance(outcome, asyncio.TimeoutError) for outcome in timeouts)
+        # The abandoned threads are still running, so more work has to wait for them
+        await asyncio.gather(*(run_blocking(probe) for _ in range(io_limit)))
+
+    asyncio.run(main())
+    assert probe.finished == 2 * io_limit
+    assert probe.peak == io_limit
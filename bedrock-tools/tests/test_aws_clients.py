@@ -0,0 +1,89 @@
+import boto3
+import pytest
+
+from tools.aws_clients import ClientRegistry, get_client, get_client_stats, paginate
+from tools.vpc_tools import list_vpcs
+
+REGION = "us-west-2"
+
+
+@pytest.fixture
+def profiles(tmp_path, monkeypatch):
+    """
+    An AWS config file with two named profiles.
+    """
+    config = tmp_path / "config"
+    config.write_text("[profile alpha]\nregion = us-west-2\n\n[profile beta]\nregion = us-east-1\n")
+    monkeypatch.setenv("AWS_CONFIG_FILE", str(config))
+    monkeypatch.setenv("AWS_SHARED_CREDENTIALS_FILE", str(tmp_path / "credentials"))
+
+
+def test_registry_reuses_clients_per_service_region_and_profile(profiles):
+    registry = ClientRegistry()
+
+    ec2 = registry.get_client("ec2", region="us-west-2")
+    assert registry.get_client("ec2", region="us-west-2") is ec2
+    assert registry.stats() == {"hits": 1, "misses": 1, "clients": 1}
+
+    others = [
+        registry.get_client("ec2", region="us-east-1"),
+        registry.get_client("networkmanager", region="us-west-2"),
+        registry.get_client("ec2", region="us-west-2", profile="alpha"),
+        registry.get_client("ec2", region="us-west-2", profile="beta"),
+    ]
+    assert len({id(client) for client in [ec2] + others}) == 5
+    assert registry.get_client("ec2", region="us-west-2", profile="alpha") is others[2]
+    assert registry.stats() == {"hits": 2, "misses": 5, "clients": 5}
+
+
+def test_registry_applies_timeouts_and_pool_size():
+    registry = ClientRegistry(max_pool_connections=7)
+    config = registry.get_client("ec2", region=REGION).meta.config
+    assert config.max_pool_connections == 7
+    assert (config.connect_timeout, config.read_timeout) == (5, 20)
+    assert registry.get_client("bedrock-runtime", region=REGION).meta.config.read_timeout == 300
+
+
+def test_configure_drops_existing_clients():
+    registry = ClientRegistry()
+    ec2 = registry.get_client("ec2", region=REGION)
+    registry.configure(max_pool_connections=3)
+    replacement = registry.get_client("ec2", region=REGION)
+    assert replacement is not ec2
+    assert replacement.meta.config.max_pool_connections == 3
+
+
+def test_paginate_walks_every_page():
+    # moto returns EC2 describe results in one page, so the pages are stubbed
+    from botocore.stub import Stubber
+
+    ec2 = ClientRegistry().get_client("ec2", region=REGION)
+    filters = [{"Name": "vpc-id", "Values": ["vpc-1"]}]
+    with Stubber(ec2) as stubber:
+        stubber.add_response("describe_subnets", {"Subnets": [{"SubnetId": "subnet-1"}, {"SubnetId": "subnet-2"}], "NextToken": "t1"},
+                             {"Filters": filters})
+        stubber.add_response("describe_subnets", {"Subnets": [{"SubnetId": "subnet-3"}], "NextToken": "t2"},
+                             {"Filters": filters, "NextToken": "t1"})
+        stubber.add_response("describe_subnets", {"Subnets": []}, {"Filters": filters, "NextToken": "t2"})
+
+        pages = list(paginate(ec2, "describe_subnets", "Subnets", Filters=filters))
+        stubber.assert_no_pending_responses()
+
+    assert [[subnet["SubnetId"] for subnet in page] for page in pages] == [["subnet-1", "subnet-2"], ["subnet-3"], []]
+
+
+def test_list_subnets_under_moto(aws):
+    ec2 = boto3.client("ec2", region_name=REGION)
+    vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16")["Vpc"]["VpcId"]
+    created = {ec2.create_subnet(VpcId=vpc_id, CidrBlock=f"10.0.{i}.0/24")["Subnet"]["SubnetId"] for i in range(12)}
+
+    from tools.network_tools import list_subnets
+    assert {subnet["SubnetId"] for subnet in list_subnets(vpc_id, REGION)["subnets"]} == created
+
+
+def test_tools_share_the_pooled_client(aws):
+    boto3.client("ec2", region_name=REGION).create_vpc(CidrBlock="10.0.0.0/16")
+    list_vpcs(REGION)
+    list_vpcs(REGION, bypass_cache=True)
+    stats = get_client_stats()
+    assert stats["misses"] == 1 and stats["hits"] >= 1
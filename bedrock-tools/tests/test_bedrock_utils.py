@@ -0,0 +1,46 @@
+import pytest
+
+import bedrock_utils
+from bedrock_utils import CACHE_POINT, _get_request_prefix
+
+
+def _tools(*names):
+    return [{"toolSpec": {"name": name, "description": name, "inputSchema": {"json": {"type": "object"}}}}
+            for name in names]
+
+
+@pytest.fixture(autouse=True)
+def empty_prefixes(monkeypatch):
+    monkeypatch.setattr(bedrock_utils, "_request_prefixes", bedrock_utils.OrderedDict())
+
+
+def test_equal_tool_lists_share_one_prefix():
+    system, tool_config = _get_request_prefix("claude_3_haiku", _tools("a", "b"))
+    assert _get_request_prefix("claude_3_haiku", _tools("a", "b")) == (system, tool_config)
+    assert _get_request_prefix("claude_3_haiku", _tools("a", "b"))[1] is tool_config
+    assert _get_request_prefix("claude_3_haiku", _tools("a", "c"))[1] is not tool_config
+    assert len(bedrock_utils._request_prefixes) == 2
+
+
+def test_prefix_is_keyed_by_model_and_copies_the_tools():
+    tools = _tools("a")
+    plain = _get_request_prefix("claude_3_haiku", tools)[1]
+    cached = _get_request_prefix("claude_3_5_haiku", tools)
+    assert plain["tools"] == tools
+    assert cached[0][-1] == CACHE_POINT and cached[1]["tools"] == tools + [CACHE_POINT]
+
+    tools[0]["toolSpec"]["description"] = "changed"
+    assert plain["tools"][0]["toolSpec"]["description"] == "a"
+    assert _get_request_prefix("claude_3_haiku", tools)[1]["tools"][0]["toolSpec"]["description"] == "changed"
+
+
+def test_prefixes_are_bounded_least_recently_used_first(monkeypatch):
+    monkeypatch.setattr(bedrock_utils, "MAX_REQUEST_PREFIXES", 2)
+    first = _get_request_prefix("claude_3_haiku", _tools("a"))[1]
+    _get_request_prefix("claude_3_haiku", _tools("b"))
+    assert _get_request_prefix("claude_3_haiku", _tools("a"))[1] is first
+    _get_request_prefix("claude_3_haiku", _tools("c"))
+
+    assert len(bedrock_utils._request_prefixes) == 2
+    assert _get_request_prefix("claude_3_haiku", _tools("a"))[1] is first
+    assert len(bedrock_utils._request_prefixes) == 2
@@ -0,0 +1,34 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from chat_engine import collect_tool_results, run_tool_uses
+
+
+def _tool_use(name, tool_input, tool_use_id="tooluse_1"):
+    return {"toolUseId": tool_use_id, "name": name, "input": tool_input}
+
+
+def test_run_tool_uses_reports_tool_errors_as_errors():
+    tool_uses = [
+        _tool_use("perform_calculation", {"expression": "1 + 1"}, "tooluse_1"),
+        _tool_use("perform_calculation", {"expression": 42}, "tooluse_2"),
+        _tool_use("no_such_tool", {}, "tooluse_3"),
+    ]
+    results, timings = run_tool_uses(tool_uses)
+
+    assert [result["toolResult"]["toolUseId"] for result in results] == ["tooluse_1", "tooluse_2", "tooluse_3"]
+    assert [result["toolResult"]["status"] for result in results] == ["success", "error", "error"]
+    assert [timing["status"] for timing in timings] == ["success", "error", "error"]
+
+
+def test_collect_tool_results_times_out_without_waiting_for_the_tool():
+    tool_use = _tool_use("slow_tool", {})
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(time.sleep, 0.5)
+        start = time.perf_counter()
+        results, timings = collect_tool_results([tool_use], [(future, start)], timeout=0.05)
+        assert time.perf_counter() - start < 0.4
+
+    assert results[0]["toolResult"]["status"] == "error"
+    assert "timed out" in results[0]["toolResult"]["content"][0]["text"]
+    assert timings[0]["status"] == "timeout"
@@ -0,0 +1,147 @@
+import ipaddress
+import itertools
+import random
+
+import pytest
+
+from tools.cidr import CIDR_TABLE_COLUMNS, analyze_cidrs, cidr_bounds, find_containers, iter_overlaps, parse_cidr
+
+
+def _columns(cidrs):
+    versions, starts, ends = [], [], []
+    for cidr in cidrs:
+        version, start, prefixlen = parse_cidr(cidr)
+        first, last = cidr_bounds(version, start, prefixlen)
+        versions.append(version)
+        starts.append(first)
+        ends.append(last)
+    return versions, starts, ends
+
+
+def _brute_force(versions, starts, ends):
+    return {
+        (i, j) for i, j in itertools.combinations(range(len(starts)), 2)
+        if versions[i] == versions[j] and starts[i] <= ends[j] and starts[j] <= ends[i]
+    }
+
+
+def test_iter_overlaps_yields_container_then_contained():
+    cidrs = ["10.0.1.0/24", "10.0.0.0/16", "10.0.0.0/8", "10.1.0.0/16", "192.168.0.0/16"]
+    assert sorted(iter_overlaps(*_columns(cidrs))) == [(1, 0), (2, 0), (2, 1), (2, 3)]
+
+
+def test_iter_overlaps_keeps_versions_apart_and_reports_duplicates():
+    # ::/96 spans the same integers as 0.0.0.0/0 but is a different address family
+    cidrs = ["0.0.0.0/0", "::/96", "172.31.0.0/16", "172.31.0.0/16", "2001:db8::/32", "2001:db8:1::/48"]
+    assert sorted(iter_overlaps(*_columns(cidrs))) == [(0, 2), (0, 3), (2, 3), (4, 5)]
+    assert list(iter_overlaps([], [], [])) == []
+
+
+def test_iter_overlaps_matches_brute_force():
+    rng = random.Random(7)
+    cidrs = []
+    for _ in range(300):
+        prefixlen = rng.randint(8, 28)
+        start = rng.getrandbits(32) >> (32 - prefixlen) << (32 - prefixlen)
+        cidrs.append(f"{start >> 24}.{start >> 16 & 255}.{start >> 8 & 255}.{start & 255}/{prefixlen}")
+    columns = _columns(cidrs)
+
+    pairs = list(iter_overlaps(*columns))
+    assert len(pairs) == len(set(pairs))
+    assert {tuple(sorted(pair)) for pair in pairs} == _brute_force(*columns)
+    versions, starts, ends = columns
+    for container, contained in pairs:
+        assert starts[container] <= starts[contained] and ends[contained] <= ends[container]
+
+
+def test_parse_cidr():
+    assert parse_cidr("10.0.0.0/16") == (4, 10 << 24, 16)
+    assert parse_cidr(" 10.0.0.1 ") == (4, (10 << 24) + 1, 32)
+    assert parse_cidr("2001:db8::/32") == (6, 0x20010db8 << 96, 32)
+    assert parse_cidr("0.0.0.0/0") == (4, 0, 0)
+
+
+@pytest.mark.parametrize("cidr", [
+    "10.0.0.0/", "10.0.0.0/33", "10.0.0.0/-1", "10.0.0.0/+8", "10.0.0.0/²", "10.0.0.0/１６", "10.0.0.0/16/1",
+    "2001:db8::/129", "10.0.0.1/24", "10.0.0/8", "not-a-cidr",
+])
+def test_parse_cidr_rejects(cidr):
+    with pytest.raises(ValueError):
+        parse_cidr(cidr)
+
+
+def _contained_in(result):
+    column = CIDR_TABLE_COLUMNS.index("contained_in")
+    return {row[0]: row[column] for row in result["rows"]}
+
+
+def test_analyze_cidrs_picks_smallest_container():
+    result = analyze_cidrs(["10.0.0.0/8", "10.1.2.0/24", "10.1.0.0/16", "10.1.2.128/25", "192.168.0.0/16"])
+    assert _contained_in(result) == {
+        "10.0.0.0/8": None,
+        "10.1.2.0/24": "10.1.0.0/16",
+        "10.1.0.0/16": "10.0.0.0/8",
+        "10.1.2.128/25": "10.1.2.0/24",
+        "192.168.0.0/16": None,
+    }
+    assert result["errors"] == []
+
+
+def test_analyze_cidrs_duplicates_point_at_first_occurrence():
+    result = analyze_cidrs(["10.0.0.0/16", "10.0.0.0/8", "10.0.0.0/16", "10.0.0.0/16"])
+    column = CIDR_TABLE_COLUMNS.index("contained_in")
+    assert [row[column] for row in result["rows"]] == ["10.0.0.0/8", None, "10.0.0.0/16", "10.0.0.0/16"]
+    assert find_containers(*_columns(["10.0.0.0/16", "10.0.0.0/8", "10.0.0.0/16", "10.0.0.0/16"])) == [1, None, 0, 2]
+
+
+def test_analyze_cidrs_keeps_versions_apart():
+    # ::/96 covers the same integers as 0.0.0.0/0 but must not contain IPv4 prefixes
+    result = analyze_cidrs(["0.0.0.0/0", "::/96", "::/0", "10.0.0.0/8", "::a00:0/104", "2001:db8::/32"])
+    assert _contained_in(result) == {
+        "0.0.0.0/0": None,
+        "::/96": "::/0",
+        "::/0": None,
+        "10.0.0.0/8": "0.0.0.0/0",
+        "::a00:0/104": "::/96",
+        "2001:db8::/32": "::/0",
+    }
+    versions = [row[CIDR_TABLE_COLUMNS.index("version")] for row in result["rows"]]
+    assert versions == [4, 6, 6, 4, 6, 6]
+
+
+def test_analyze_cidrs_reports_invalid_input_and_keeps_going():
+    result = analyze_cidrs(["10.0.0.0/8", "10.0.0.1/24", "bogus", None, "10.1.0.0/16"])
+    assert _contained_in(result) == {"10.0.0.0/8": None, "10.1.0.0/16": "10.0.0.0/8"}
+    assert [error["cidr"] for error in result["errors"]] == ["10.0.0.1/24", "bogus", None]
+    assert all(error["error"].startswith("Invalid CIDR notation") for error in result["errors"])
+    assert analyze_cidrs([]) == {"columns": CIDR_TABLE_COLUMNS, "rows": [], "errors": []}
+
+
+def test_analyze_cidrs_matches_ipaddress():
+    rng = random.Random(11)
+    cidrs = []
+    for _ in range(200):
+        if rng.random() < 0.5:
+            cidrs.append(str(ipaddress.ip_network((rng.getrandbits(32) >> 24 << 24, rng.randint(8, 30)), strict=False)))
+        else:
+            cidrs.append(str(ipaddress.ip_network((0x20010db8 << 96 | rng.getrandbits(24) << 80, rng.randint(32, 56)), strict=False)))
+    result = analyze_cidrs(cidrs)
+    networks = [ipaddress.ip_network(cidr) for cidr in cidrs]
+    column = CIDR_TABLE_COLUMNS.index("contained_in")
+
+    for i, row in enumerate(result["rows"]):
+        assert row[:7] == [
+            cidrs[i], networks[i].version, str(networks[i].network_address), str(networks[i].broadcast_address),
+            networks[i].num_addresses, str(networks[i].netmask), networks[i].prefixlen
+        ]
+        candidates = [
+            j for j, other in enumerate(networks)
+            if j != i and other.version == networks[i].version and networks[i].subnet_of(other)
+            and (other != networks[i] or j < i)
+        ]
+        expected = max(candidates, key=lambda j: (networks[j].prefixlen, j), default=None)
+        if expected is None:
+            assert row[column] is None
+        else:
+            # Among equal containers the one reported may be any duplicate, so compare networks
+            assert ipaddress.ip_network(row[column]) == networks[expected]
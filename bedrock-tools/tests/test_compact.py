@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from tools import compact
+from tools.compact import compact_value, encode_result
+
+
+def _decode(value):
+    """
+    Invert compact_value(): tables back to lists of dictionaries, with prefixes restored.
+    """
+    if isinstance(value, dict) and set(value) in ({"columns", "rows"}, {"columns", "rows", "prefixes"}):
+        prefixes = value.get("prefixes", {})
+        return [
+            {column: _decode(prefixes.get(column, "") + cell if column in prefixes else cell)
+             for column, cell in zip(value["columns"], row) if cell is not None}
+            for row in value["rows"]
+        ]
+    if isinstance(value, dict):
+        return {key: _decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    return value
+
+
+def _without_nulls(value):
+    if isinstance(value, dict):
+        return {key: _without_nulls(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        return [_without_nulls(item) for item in value]
+    return value
+
+
+SUBNETS = {
+    "vpc_id": "vpc-0123456789abcdef0",
+    "next_token": None,
+    "subnets": [
+        {"SubnetId": "subnet-0aa11bb22cc33dd44", "CidrBlock": "10.0.1.0/24", "AvailabilityZone": "us-west-2a",
+         "Tags": [{"Key": "Name", "Value": "web"}, {"Key": "Tier", "Value": "public"}]},
+        {"SubnetId": "subnet-0ee55ff66aa77bb88", "CidrBlock": "10.0.2.0/24", "AvailabilityZone": "us-west-2b",
+         "Ipv6CidrBlock": None, "Tags": []},
+        {"SubnetId": "subnet-0cc99dd00ee11ff22", "CidrBlock": "10.0.3.0/24", "AvailabilityZone": "us-west-2c"},
+    ],
+}
+
+
+def test_tables_round_trip():
+    encoded = compact_value(SUBNETS)
+    assert "next_token" not in encoded
+    table = encoded["subnets"]
+    assert table["columns"] == ["SubnetId", "CidrBlock", "AvailabilityZone", "Tags"]
+    assert table["rows"][2] == ["0cc99dd00ee11ff22", "10.0.3.0/24", "us-west-2c", None]
+    # Nested lists of dictionaries become tables too
+    assert table["rows"][0][3] == {"columns": ["Key", "Value"], "rows": [["Name", "web"], ["Tier", "public"]]}
+    assert _decode(encoded) == _without_nulls(SUBNETS)
+
+
+def test_prefixes_are_elided_from_resource_ids_only():
+    table = compact_value(SUBNETS["subnets"])
+    assert table["prefixes"] == {"SubnetId": "subnet-"}
+    assert [row[2] for row in table["rows"]] == ["us-west-2a", "us-west-2b", "us-west-2c"]
+
+    attachments = compact_value([
+        {"AttachmentId": "tgw-attach-0123456789abcdef0", "Name": "prod-east-1"},
+        {"AttachmentId": "tgw-attach-0fedcba9876543210", "Name": "prod-east-2"},
+    ])
+    assert attachments["prefixes"] == {"AttachmentId": "tgw-attach-"}
+    assert [row[1] for row in attachments["rows"]] == ["prod-east-1", "prod-east-2"]
+
+    # One value that is not an ID keeps the whole column as is
+    mixed = compact_value([{"Target": "igw-0123456789abcdef0"}, {"Target": "igw-0fedcba9876543210"}, {"Target": "local"}])
+    assert "prefixes" not in mixed
+
+
+@pytest.fixture
+def threshold(monkeypatch):
+    monkeypatch.setattr(compact, "COMPACT_THRESHOLD_BYTES", 0)
+    monkeypatch.setattr(compact, "_size_reports", {})
+
+
+def test_encode_result_compacts_when_smaller(threshold):
+    result = {"subnets": SUBNETS["subnets"] * 10}
+    encoded = encode_result("list_subnets", result)
+    assert encoded != result and _decode(encoded) == _without_nulls(result)
+    report = compact.get_size_report()["list_subnets"]
+    assert report["raw_bytes"] == len(json.dumps(result)) and report["compact_bytes"] == len(json.dumps(encoded))
+    assert report["saved_ratio"] > 0
+
+
+def test_encode_result_keeps_raw_when_not_smaller(threshold):
+    # Rows with no keys in common: the table is all nulls and larger than the raw list
+    result = {"items": [{"a": 1}, {"b": 2}]}
+    assert encode_result("sparse", result) is result
+    assert compact.get_size_report()["sparse"]["saved_ratio"] == 0
+
+
+def test_encode_result_below_threshold(monkeypatch):
+    monkeypatch.setattr(compact, "_size_reports", {})
+    result = {"subnets": SUBNETS["subnets"][:2]}
+    assert encode_result("list_subnets", result) is result
@@ -0,0 +1,49 @@
+import pytest
+
+from tools.general_tools import perform_calculation
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("2 + 3 * 4", 14),
+    ("-2 ** 10", -1024),
+    ("(7 // 2) % 2", 1),
+    ("math.sqrt(16) + math.floor(2.5)", 6.0),
+    ("math.pi * 2", 6.283185307179586),
+])
+def test_perform_calculation(expression, expected):
+    assert perform_calculation(expression) == {"result": expected}
+
+
+@pytest.mark.parametrize("expression", [
+    "().__class__.__base__.__subclasses__()",
+    "__import__('os').system('true')",
+    "math.__dict__",
+    "math.factorial(100000)",
+    "[1, 2]",
+    "'a' * 3",
+    "True + 1",
+    "9 ** 9 ** 9",
+    "math.sqrt(x=4)",
+])
+def test_perform_calculation_rejects_non_arithmetic(expression):
+    assert "error" in perform_calculation(expression)
+
+
+@pytest.mark.parametrize("expression", [
+    "((9 ** 999) ** 999) ** 3",
+    "((9 ** 999) ** 999) ** 999",
+    "2 ** 4097",
+    "(2 ** 4000) * (2 ** 4000)",
+    "(2 ** 2000) * (2 ** 2000) * (2 ** 2000)",
+    "(-3) ** 5000",
+])
+def test_perform_calculation_bounds_integer_results(expression):
+    assert perform_calculation(expression) == {"error": "Calculation error: Result would exceed 4096 bits"}
+
+
+def test_perform_calculation_allows_large_results_within_the_bound():
+    assert perform_calculation("2 ** 2048")["result"] == 2 ** 2048
+    assert perform_calculation("(2 ** 2000) * (2 ** 2000)")["result"] == 2 ** 4000
+    assert perform_calculation("2 ** -2000")["result"] == 2 ** -2000
+    assert perform_calculation("2.0 ** 0.5")["result"] == 2.0 ** 0.5
+    assert "error" in perform_calculation("2.0 ** 5000")
@@ -0,0 +1,126 @@
+import copy
+import json
+
+from history_manager import KEEP_RECENT_MESSAGES, compact_history, estimate_tokens, message_size
+
+
+def _user(text):
+    return {"role": "user", "content": [{"text": text}]}
+
+
+def _assistant(text):
+    return {"role": "assistant", "content": [{"text": text}]}
+
+
+def _tool_use(tool_use_id):
+    return {"role": "assistant", "content": [
+        {"text": "Checking."}, {"toolUse": {"toolUseId": tool_use_id, "name": "list_vpcs", "input": {}}}]}
+
+
+def _tool_result(tool_use_id, rows=200):
+    return {"role": "user", "content": [{"toolResult": {
+        "toolUseId": tool_use_id, "status": "success",
+        "content": [{"json": {"vpcs": [{"VpcId": f"vpc-{i:017x}", "CidrBlock": "10.0.0.0/16"} for i in range(rows)]}}]}}]}
+
+
+def _turn(index, tools=1):
+    """
+    A user question, `tools` rounds of toolUse and toolResult, and the final answer.
+    """
+    messages = [_user(f"Question {index}")]
+    for tool in range(tools):
+        messages += [_tool_use(f"tooluse_{index}_{tool}"), _tool_result(f"tooluse_{index}_{tool}")]
+    return messages + [_assistant(f"Answer {index}")]
+
+
+def _history(turns):
+    """
+    `turns` turns with one tool call each, then a short exchange and the latest question, so
+    every tool result is older than the most recent messages.
+    """
+    messages = [message for index in range(turns) for message in _turn(index)]
+    return messages + [_user("Thanks"), _assistant("You're welcome."), _user("Latest question")]
+
+
+def _tokens(messages):
+    return estimate_tokens({"messages": messages})
+
+
+def _assert_valid(messages):
+    """
+    What Bedrock checks: alternating roles starting with a user text message, and every
+    toolResult answering a toolUse in the message just before it.
+    """
+    assert messages[0]["role"] == "user" and "text" in messages[0]["content"][0]
+    for previous, message in zip(messages, messages[1:]):
+        assert previous["role"] != message["role"]
+        results = {item["toolResult"]["toolUseId"] for item in message["content"] if "toolResult" in item}
+        uses = {item["toolUse"]["toolUseId"] for item in previous["content"] if "toolUse" in item}
+        assert results == uses
+
+
+def test_history_within_budget_is_untouched():
+    messages = _history(2)
+    compacted, report = compact_history(messages, token_budget=10 ** 6)
+    assert compacted == messages
+    assert (report["bytes_saved"], report["tokens_saved"], report["truncated_results"], report["dropped_messages"]) == (0, 0, 0, 0)
+
+
+def test_old_tool_results_are_summarized_before_turns_are_dropped():
+    messages = _history(3)
+    original = copy.deepcopy(messages)
+    # Enough room for everything once the tool results are summarized
+    compacted, report = compact_history(messages, token_budget=_tokens(messages) // 3)
+
+    assert messages == original
+    assert report["dropped_messages"] == 0 and report["truncated_results"] == 3
+    _assert_valid(compacted)
+    summaries = [item["toolResult"] for message in compacted for item in message["content"] if "toolResult" in item]
+    assert [summary["toolUseId"] for summary in summaries] == ["tooluse_0_0", "tooluse_1_0", "tooluse_2_0"]
+    assert all("fields: vpcs" in summary["content"][0]["text"] for summary in summaries)
+
+
+def test_oldest_results_are_summarized_first():
+    messages = _history(3)
+    one_result = message_size(messages[2]) // 4
+    compacted, report = compact_history(messages, token_budget=_tokens(messages) - one_result // 2)
+    assert report["truncated_results"] == 1
+    assert "text" in compacted[2]["content"][0]["toolResult"]["content"][0]
+    assert compacted[6] == messages[6]
+
+
+def test_dropped_turns_keep_tool_pairs_and_start_with_user_text():
+    messages = [message for index in range(6) for message in _turn(index, tools=2)] + [_user("Latest question")]
+    compacted, report = compact_history(messages, token_budget=200)
+
+    assert report["dropped_messages"] > 0
+    _assert_valid(compacted)
+    assert compacted[0]["content"][0]["text"].startswith("Question")
+    assert len(compacted) == len(messages) - report["dropped_messages"]
+
+
+def test_latest_messages_are_never_touched():
+    # The latest turn starts inside the kept window: the turn before it cannot be cut
+    messages = _history(4)
+    compacted, _ = compact_history(messages, token_budget=1)
+    assert compacted[-KEEP_RECENT_MESSAGES:] == messages[-KEEP_RECENT_MESSAGES:]
+    _assert_valid(compacted)
+
+    # A long last turn keeps its newest tool results in full
+    messages = _turn(0) + _turn(1, tools=4)
+    compacted, _ = compact_history(messages, token_budget=1)
+    assert compacted[-KEEP_RECENT_MESSAGES:] == messages[-KEEP_RECENT_MESSAGES:]
+    _assert_valid(compacted)
+
+
+def test_report_counts_bytes_and_tokens_saved():
+    messages = _history(4)
+    compacted, report = compact_history(messages, token_budget=2000)
+
+    original_bytes = sum(len(json.dumps(message)) for message in messages)
+    compacted_bytes = sum(len(json.dumps(message)) for message in compacted)
+    assert (report["original_bytes"], report["compacted_bytes"]) == (original_bytes, compacted_bytes)
+    assert report["bytes_saved"] == original_bytes - compacted_bytes > 0
+    assert report["original_tokens"] == -(-original_bytes // 4)
+    assert report["tokens_saved"] == report["original_tokens"] - report["compacted_tokens"] > 0
+    assert report["compacted_tokens"] <= 2000
@@ -0,0 +1,78 @@
+import pytest
+
+from tools.nacl import CompiledNetworkAcl, protocol_number
+from tools.route_resolver import parse_address
+
+
+def _entry(rule_number, action, egress=False, protocol="-1", cidr="0.0.0.0/0", ports=None, icmp=None):
+    entry = {"RuleNumber": rule_number, "RuleAction": action, "Egress": egress, "Protocol": protocol, "CidrBlock": cidr}
+    if ports:
+        entry["PortRange"] = {"From": ports[0], "To": ports[1]}
+    if icmp:
+        entry["IcmpTypeCode"] = {"Type": icmp[0], "Code": icmp[1]}
+    return entry
+
+
+def _acl(*entries):
+    return CompiledNetworkAcl({"NetworkAclId": "acl-1", "Entries": list(entries)})
+
+
+def _decide(acl, protocol, port, peer_ip, egress=False, icmp_code=0):
+    decision, entry = acl.evaluate(egress, protocol_number(protocol), port, *parse_address(peer_ip), icmp_code)
+    return decision, entry["RuleNumber"] if entry else None
+
+
+def test_first_matching_rule_by_number_decides():
+    acl = _acl(
+        _entry(32767, "deny"),
+        _entry(200, "allow", protocol="6", cidr="10.0.0.0/16", ports=(443, 443)),
+        _entry(100, "deny", protocol="6", cidr="10.0.1.128/25", ports=(443, 443)),
+    )
+    assert _decide(acl, "tcp", 443, "10.0.1.200") == ("deny", 100)
+    assert _decide(acl, "tcp", 443, "10.0.1.5") == ("allow", 200)
+    assert _decide(acl, "tcp", 444, "10.0.1.5") == ("deny", 32767)
+    assert _decide(acl, "udp", 443, "10.0.1.5") == ("deny", 32767)
+    # Ingress entries never decide egress traffic
+    assert _decide(acl, "tcp", 443, "10.0.1.5", egress=True) == ("deny", None)
+
+
+def test_ipv6_entries_only_match_ipv6_addresses():
+    acl = _acl(_entry(100, "allow", cidr="::/0"), _entry(200, "deny", cidr="0.0.0.0/0"))
+    assert _decide(acl, "tcp", 80, "2001:db8::1") == ("allow", 100)
+    assert _decide(acl, "tcp", 80, "192.0.2.1") == ("deny", 200)
+
+
+def test_icmp_entry_matches_its_type_and_code():
+    acl = _acl(
+        _entry(100, "allow", protocol="1", icmp=(8, -1)),
+        _entry(110, "allow", protocol="1", icmp=(3, 4)),
+        _entry(32767, "deny"),
+    )
+    assert _decide(acl, "icmp", 8, "10.0.0.1") == ("allow", 100)
+    assert _decide(acl, "icmp", 8, "10.0.0.1", icmp_code=5) == ("allow", 100)
+    assert _decide(acl, "icmp", 3, "10.0.0.1", icmp_code=4) == ("allow", 110)
+    assert _decide(acl, "icmp", 3, "10.0.0.1", icmp_code=0) == ("deny", 32767)
+    assert _decide(acl, "icmp", 0, "10.0.0.1") == ("deny", 32767)
+    # An ICMP entry says nothing about ICMPv6
+    assert _decide(acl, "icmpv6", 8, "10.0.0.1") == ("deny", 32767)
+
+
+def test_icmp_entry_without_type_code_matches_any_type():
+    acl = _acl(_entry(100, "allow", protocol="1"), _entry(32767, "deny"))
+    assert _decide(acl, "icmp", 13, "10.0.0.1") == ("allow", 100)
+
+
+def test_evaluate_many_matches_evaluate():
+    acl = _acl(_entry(100, "deny", protocol="6", ports=(22, 22)), _entry(200, "allow"))
+    flows = [(False, "6", port, *parse_address("10.0.0.1")) for port in (21, 22, 23)]
+    assert [decision for decision, _ in acl.evaluate_many(flows)] == ["allow", "deny", "allow"]
+
+
+@pytest.mark.parametrize("protocol, expected", [("tcp", "6"), ("UDP", "17"), ("all", "-1"), ("47", "47")])
+def test_protocol_number(protocol, expected):
+    assert protocol_number(protocol) == expected
+
+
+def test_protocol_number_rejects_unknown_names():
+    with pytest.raises(ValueError):
+        protocol_number("sctp")
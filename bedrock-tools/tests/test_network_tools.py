@@ -0,0 +1,52 @@
+import boto3
+
+from tools.network_tools import describe_network_acls, evaluate_network_acl_flows
+
+REGION = "us-west-2"
+
+
+def _vpc_with_custom_acl(ec2):
+    vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16")["Vpc"]["VpcId"]
+    subnet_id = ec2.create_subnet(VpcId=vpc_id, CidrBlock="10.0.1.0/24")["Subnet"]["SubnetId"]
+    nacl_id = ec2.create_network_acl(VpcId=vpc_id)["NetworkAcl"]["NetworkAclId"]
+    association_id = next(
+        association["NetworkAclAssociationId"]
+        for nacl in ec2.describe_network_acls()["NetworkAcls"]
+        for association in nacl["Associations"] if association["SubnetId"] == subnet_id
+    )
+    ec2.replace_network_acl_association(AssociationId=association_id, NetworkAclId=nacl_id)
+    ec2.create_network_acl_entry(NetworkAclId=nacl_id, RuleNumber=200, Protocol="6", RuleAction="allow",
+                                 Egress=False, CidrBlock="10.0.0.0/16", PortRange={"From": 443, "To": 443})
+    ec2.create_network_acl_entry(NetworkAclId=nacl_id, RuleNumber=100, Protocol="6", RuleAction="deny",
+                                 Egress=False, CidrBlock="10.0.1.128/25", PortRange={"From": 443, "To": 443})
+    return vpc_id, subnet_id, nacl_id
+
+
+def test_describe_network_acls_keeps_entries_in_rule_order(aws):
+    ec2 = boto3.client("ec2", region_name=REGION)
+    vpc_id, subnet_id, nacl_id = _vpc_with_custom_acl(ec2)
+
+    nacl = next(n for n in describe_network_acls(vpc_id, REGION)["network_acls"] if n["NetworkAclId"] == nacl_id)
+    assert nacl["SubnetIds"] == [subnet_id]
+    assert [entry["RuleNumber"] for entry in nacl["Entries"] if not entry["Egress"]][:2] == [100, 200]
+    assert nacl["Entries"][0]["PortRange"] == {"From": 443, "To": 443}
+
+
+def test_evaluate_network_acl_flows(aws):
+    ec2 = boto3.client("ec2", region_name=REGION)
+    vpc_id, subnet_id, nacl_id = _vpc_with_custom_acl(ec2)
+
+    def flow(peer_ip, direction="ingress", port=443):
+        return {"subnet_id": subnet_id, "direction": direction, "protocol": "tcp", "port": port, "peer_ip": peer_ip}
+
+    result = evaluate_network_acl_flows(vpc_id, [
+        flow("10.0.1.200"), flow("10.0.1.5"), flow("10.0.1.5", port=22),
+        flow("10.0.1.5", direction="ingres"), flow("not-an-ip")
+    ], REGION)
+    rows = [dict(zip(result["columns"], row)) for row in result["rows"]]
+
+    assert [(row["decision"], row["rule_number"]) for row in rows[:3]] == [("deny", 100), ("allow", 200), ("deny", None)]
+    assert all(row["network_acl_id"] == nacl_id for row in rows[:3])
+    # Invalid flows get an error row instead of a guessed decision
+    assert rows[3]["decision"] is None and "direction" in rows[3]["error"]
+    assert rows[4]["decision"] is None and "not-an-ip" in rows[4]["error"]
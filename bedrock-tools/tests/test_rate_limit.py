@@ -0,0 +1,84 @@
+import types
+
+import boto3
+import botocore.endpoint
+import pytest
+from botocore.awsrequest import AWSResponse
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from tools import rate_limit
+from tools.aws_clients import configure_clients
+from tools.rate_limit import RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    """
+    A private copy of the per-service limits, restored after the test.
+    """
+    monkeypatch.setattr(rate_limit, "SERVICE_RATE_LIMITS", dict(rate_limit.SERVICE_RATE_LIMITS))
+    return rate_limit.SERVICE_RATE_LIMITS
+
+
+def test_bedrock_runtime_has_no_client_side_limit_by_default(limits):
+    limiter = RateLimiter()
+    assert limiter._bucket("bedrock-runtime", "us-west-2", "Converse") is None
+    for _ in range(50):
+        limiter.acquire("bedrock-runtime", "us-west-2", "Converse")
+    assert limiter.stats()["calls"] == 50
+    assert limiter.stats()["throttled_seconds"] == 0
+    assert isinstance(limiter._bucket("ec2", "us-west-2", "DescribeVpcs"), TokenBucket)
+
+
+def test_configure_replaces_existing_buckets(limits):
+    limiter = RateLimiter()
+    ec2 = limiter._bucket("ec2", "us-west-2", "DescribeVpcs")
+    limiter.configure("ec2", (100.0, 200))
+    bucket = limiter._bucket("ec2", "us-west-2", "DescribeVpcs")
+    assert bucket is not ec2
+    assert (bucket.rate, bucket.capacity) == (100.0, 200)
+
+    limiter.configure("ec2", None)
+    assert limiter._bucket("ec2", "us-west-2", "DescribeVpcs") is None
+
+
+def test_configure_clients_sets_the_shared_limits(limits):
+    configure_clients(rate_limits={"bedrock-runtime": (5.0, 10)})
+    assert limits["bedrock-runtime"] == (5.0, 10)
+    assert limits["ec2"] == (20.0, 40)
+
+
+class RawBody:
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+def test_every_retry_attempt_waits_for_a_token(limits, monkeypatch):
+    # Skip botocore's backoff sleeps, so any waiting comes from the token bucket
+    monkeypatch.setattr(botocore.endpoint, "time", types.SimpleNamespace(sleep=lambda seconds: None))
+    limits["ec2"] = (5.0, 1)
+    limiter = RateLimiter()
+    client = boto3.client("ec2", region_name="us-west-2",
+                          config=Config(retries={"mode": "standard", "total_max_attempts": 3}))
+    limiter.install(client, "ec2", "us-west-2")
+    body = (b"<Response><Errors><Error><Code>RequestLimitExceeded</Code><Message>Slow down</Message>"
+            b"</Error></Errors><RequestID>1</RequestID></Response>")
+    attempts = []
+
+    def throttle(request, **kwargs):
+        attempts.append(request.url)
+        return AWSResponse(request.url, 503, {"Content-Length": str(len(body))}, RawBody(body))
+
+    client.meta.events.register("before-send", throttle)
+    with pytest.raises(ClientError):
+        client.describe_vpcs()
+
+    stats = limiter.stats()
+    assert len(attempts) == 3
+    assert (stats["calls"], stats["retries"], stats["throttle_errors"]) == (3, 2, 1)
+    # The burst of one covers the first attempt; the two retries each wait up to 1/5 s
+    assert stats["throttled_seconds"] >= 0.3
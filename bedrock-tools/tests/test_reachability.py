@@ -0,0 +1,151 @@
+import boto3
+import pytest
+
+from tools import invalidate_cache
+from tools.reachability import evaluate_reachability
+
+REGION = "us-west-2"
+AMI = "ami-12c6146b"
+
+
+@pytest.fixture
+def network(aws):
+    """
+    A VPC with two subnets and one instance in each: "web" in subnet a, "app" in subnet b.
+    """
+    ec2 = boto3.client("ec2", region_name=REGION)
+    vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16")["Vpc"]["VpcId"]
+    subnet_a = ec2.create_subnet(VpcId=vpc_id, CidrBlock="10.0.1.0/24")["Subnet"]["SubnetId"]
+    subnet_b = ec2.create_subnet(VpcId=vpc_id, CidrBlock="10.0.2.0/24")["Subnet"]["SubnetId"]
+    web_sg = ec2.create_security_group(GroupName="web", Description="web", VpcId=vpc_id)["GroupId"]
+    app_sg = ec2.create_security_group(GroupName="app", Description="app", VpcId=vpc_id)["GroupId"]
+
+    def run_instance(subnet_id, group_id):
+        return ec2.run_instances(ImageId=AMI, MinCount=1, MaxCount=1, SubnetId=subnet_id,
+                                 SecurityGroupIds=[group_id])["Instances"][0]
+
+    return {
+        "ec2": ec2, "vpc_id": vpc_id, "subnet_a": subnet_a, "subnet_b": subnet_b,
+        "web_sg": web_sg, "app_sg": app_sg,
+        "web": run_instance(subnet_a, web_sg), "app": run_instance(subnet_b, app_sg),
+        "run_instance": run_instance,
+    }
+
+
+def _hop(result, name):
+    return next(hop for hop in result["hops"] if hop["hop"] == name)
+
+
+def test_icmp_rule_with_any_code_allows_echo_request(network):
+    network["ec2"].authorize_security_group_ingress(GroupId=network["app_sg"], IpPermissions=[
+        {"IpProtocol": "icmp", "FromPort": 8, "ToPort": -1, "IpRanges": [{"CidrIp": "10.0.0.0/16"}]}
+    ])
+    result = evaluate_reachability(network["web"]["InstanceId"], network["app"]["InstanceId"], 8, protocol="icmp")
+    assert result["reachable"]
+    assert _hop(result, "destination_security_group_ingress")["rule"]["cidr"] == "10.0.0.0/16"
+
+
+def test_icmp_rule_matches_type_and_code_exactly(network):
+    # Type 3 (destination unreachable), code 4 (fragmentation needed) only
+    network["ec2"].authorize_security_group_ingress(GroupId=network["app_sg"], IpPermissions=[
+        {"IpProtocol": "icmp", "FromPort": 3, "ToPort": 4, "IpRanges": [{"CidrIp": "10.0.0.0/16"}]}
+    ])
+    web, app = network["web"]["InstanceId"], network["app"]["InstanceId"]
+    assert evaluate_reachability(web, app, 3, protocol="icmp", icmp_code=4)["reachable"]
+    for icmp_type, icmp_code in ((4, 4), (3, 0), (8, 0)):
+        result = evaluate_reachability(web, app, icmp_type, protocol="icmp", icmp_code=icmp_code)
+        assert result["blocked_at"] == ["destination_security_group_ingress"]
+
+
+def _custom_network_acl(ec2, vpc_id, subnet_id, entries):
+    """
+    Associate a new Network ACL with the given entries to a subnet.
+    """
+    nacl_id = ec2.create_network_acl(VpcId=vpc_id)["NetworkAcl"]["NetworkAclId"]
+    association_id = next(
+        association["NetworkAclAssociationId"]
+        for nacl in ec2.describe_network_acls()["NetworkAcls"]
+        for association in nacl["Associations"] if association["SubnetId"] == subnet_id
+    )
+    ec2.replace_network_acl_association(AssociationId=association_id, NetworkAclId=nacl_id)
+    for entry in entries:
+        ec2.create_network_acl_entry(NetworkAclId=nacl_id, **entry)
+    return nacl_id
+
+
+
+def _allow_from_group(ec2, group_id, peer_group_id, port=443):
+    ec2.authorize_security_group_ingress(GroupId=group_id, IpPermissions=[
+        {"IpProtocol": "tcp", "FromPort": port, "ToPort": port, "UserIdGroupPairs": [{"GroupId": peer_group_id}]}
+    ])
+
+
+def test_same_subnet_skips_network_acls(network):
+    ec2 = network["ec2"]
+    _allow_from_group(ec2, network["app_sg"], network["web_sg"])
+    neighbour = network["run_instance"](network["subnet_a"], network["app_sg"])
+    # An ACL with no entries denies everything, but traffic within a subnet never crosses it
+    _custom_network_acl(ec2, network["vpc_id"], network["subnet_a"], [])
+
+    result = evaluate_reachability(network["web"]["InstanceId"], neighbour["InstanceId"], 443)
+    assert result["reachable"]
+    assert [hop["hop"] for hop in result["hops"]] == [
+        "source_security_group_egress", "route", "destination_security_group_ingress"]
+
+
+def test_cross_subnet_security_group_reference(network):
+    ec2 = network["ec2"]
+    _allow_from_group(ec2, network["app_sg"], network["web_sg"])
+
+    result = evaluate_reachability(network["web"]["InstanceId"], network["app"]["InstanceId"], 443)
+    assert result["reachable"]
+    assert "source_network_acl_egress" in [hop["hop"] for hop in result["hops"]]
+    rule = _hop(result, "destination_security_group_ingress")["rule"]
+    assert rule["referenced_group_id"] == network["web_sg"]
+    assert rule["group_id"] == network["app_sg"]
+
+    other_sg = ec2.create_security_group(GroupName="other", Description="other", VpcId=network["vpc_id"])["GroupId"]
+    other = network["run_instance"](network["subnet_a"], other_sg)
+    result = evaluate_reachability(other["InstanceId"], network["app"]["InstanceId"], 443)
+    assert result["blocked_at"] == ["destination_security_group_ingress"]
+
+
+def test_network_acl_deny_before_allow(network):
+    ec2 = network["ec2"]
+    _allow_from_group(ec2, network["app_sg"], network["web_sg"])
+    _custom_network_acl(ec2, network["vpc_id"], network["subnet_b"], [
+        {"RuleNumber": 200, "Protocol": "6", "RuleAction": "allow", "Egress": False,
+         "CidrBlock": "10.0.0.0/16", "PortRange": {"From": 443, "To": 443}},
+        {"RuleNumber": 100, "Protocol": "6", "RuleAction": "deny", "Egress": False,
+         "CidrBlock": "10.0.1.0/24", "PortRange": {"From": 443, "To": 443}},
+        {"RuleNumber": 100, "Protocol": "-1", "RuleAction": "allow", "Egress": True, "CidrBlock": "0.0.0.0/0"},
+    ])
+
+    result = evaluate_reachability(network["web"]["InstanceId"], network["app"]["InstanceId"], 443)
+    assert result["blocked_at"] == ["destination_network_acl_ingress"]
+    hop = _hop(result, "destination_network_acl_ingress")
+    assert (hop["rule"]["RuleNumber"], hop["rule"]["RuleAction"]) == (100, "deny")
+    assert _hop(result, "destination_network_acl_egress_return")["decision"] == "allow"
+
+
+def test_external_destination_evaluates_the_source_side_only(network):
+    ec2 = network["ec2"]
+    web = network["web"]["InstanceId"]
+
+    result = evaluate_reachability(web, "203.0.113.10", 443)
+    assert result["blocked_at"] == ["route"]
+    assert _hop(result, "route")["reason"] == "Route outcome: no-route"
+
+    igw_id = ec2.create_internet_gateway()["InternetGateway"]["InternetGatewayId"]
+    ec2.attach_internet_gateway(InternetGatewayId=igw_id, VpcId=network["vpc_id"])
+    main_table = ec2.describe_route_tables(Filters=[
+        {"Name": "vpc-id", "Values": [network["vpc_id"]]}, {"Name": "association.main", "Values": ["true"]}
+    ])["RouteTables"][0]["RouteTableId"]
+    ec2.create_route(RouteTableId=main_table, DestinationCidrBlock="0.0.0.0/0", GatewayId=igw_id)
+    invalidate_cache()
+
+    result = evaluate_reachability(web, "203.0.113.10", 443)
+    assert result["reachable"]
+    assert _hop(result, "route")["rule"]["target_id"] == igw_id
+    assert "destination_security_group_ingress" not in [hop["hop"] for hop in result["hops"]]
+    assert "outside" in result["note"]
@@ -0,0 +1,99 @@
+from typing import Dict, List, Optional
+
+import pytest
+
+from tools.registry import ToolRegistry
+from tools.result_cache import cached
+
+
+@pytest.fixture
+def registry():
+    registry = ToolRegistry()
+
+    @registry.tool("Describe things", group="things", params={"limit": "Maximum number of things"})
+    def describe_things(names: List[str], limit: int, ratio: float = 1.0, verbose: bool = False,
+                        tags: Optional[Dict[str, str]] = None, region: str = "us-west-2"):
+        """
+        Describe things.
+
+        Args:
+        names (List[str]): Names of the things.
+        limit (int): Documented here but overridden by params.
+        ratio (float): Sampling ratio.
+        """
+        return {"names": names, "limit": limit, "ratio": ratio, "verbose": verbose, "tags": tags, "region": region}
+
+    @registry.tool("List cached things", group="cached")
+    @cached("test_list_cached_things")
+    def list_cached_things(vpc_id: str, region: str = "us-west-2"):
+        return {"vpc_id": vpc_id, "region": region}
+
+    @registry.tool("Fail")
+    def fail():
+        raise RuntimeError("boom")
+
+    return registry
+
+
+def _schema(registry, name):
+    return next(spec["toolSpec"] for spec in registry.specs() if spec["toolSpec"]["name"] == name)["inputSchema"]["json"]
+
+
+def test_schema_from_signature_and_docstring(registry):
+    schema = _schema(registry, "describe_things")
+    assert schema["required"] == ["names", "limit"]
+    assert schema["properties"] == {
+        "names": {"type": "array", "items": {"type": "string"}, "description": "Names of the things."},
+        "limit": {"type": "integer", "description": "Maximum number of things"},
+        "ratio": {"type": "number", "description": "Sampling ratio."},
+        "verbose": {"type": "boolean"},
+        "tags": {"type": "object"},
+        "region": {"type": "string", "description": "AWS region (e.g., us-west-2)"},
+    }
+    assert [spec["toolSpec"]["name"] for spec in registry.specs(group="things")] == ["describe_things"]
+
+
+def test_cached_tools_expose_bypass_cache_as_optional(registry):
+    schema = _schema(registry, "list_cached_things")
+    assert schema["required"] == ["vpc_id"]
+    assert schema["properties"]["bypass_cache"] == {
+        "type": "boolean", "description": "Set to true to skip cached results and fetch fresh data from AWS"}
+    assert registry.validate("list_cached_things", {"vpc_id": "vpc-1", "bypass_cache": True}) == []
+
+
+@pytest.mark.parametrize("input_data, errors", [
+    ({"names": ["a"], "limit": 1}, []),
+    ({"names": ["a"], "limit": 1, "ratio": 2, "tags": {"k": "v"}, "verbose": True}, []),
+    ({"names": ["a"]}, ["Missing required parameter: limit"]),
+    ({"names": "a", "limit": 1}, ["Parameter names must be of type array"]),
+    ({"names": ["a", 1], "limit": 1}, ["Parameter names must be of type array"]),
+    ({"names": [], "limit": True}, ["Parameter limit must be of type integer"]),
+    ({"names": [], "limit": "5"}, ["Parameter limit must be of type integer"]),
+    ({"names": [], "limit": 1, "ratio": "high", "verbose": 1}, [
+        "Parameter ratio must be of type number", "Parameter verbose must be of type boolean"]),
+    ({"names": [], "limit": 1, "color": "red"}, ["Unknown parameter: color"]),
+    (["a"], ["Tool input must be a JSON object"]),
+])
+def test_validate(registry, input_data, errors):
+    assert registry.validate("describe_things", input_data) == errors
+
+
+def _tool_result(message):
+    return message["content"][0]["toolResult"]
+
+
+def test_dispatch(registry):
+    result = _tool_result(registry.dispatch({"toolUseId": "t1", "name": "describe_things", "input": {"names": ["a"], "limit": 2}}))
+    assert result["toolUseId"] == "t1" and result["status"] == "success"
+    assert result["content"][0]["json"]["limit"] == 2
+
+    for tool_use, error in (
+        ({"toolUseId": "t2", "name": "no_such_tool", "input": {}}, "Unknown tool: no_such_tool"),
+        ({"toolUseId": "t3", "name": "describe_things", "input": {"names": ["a"]}}, "Missing required parameter: limit"),
+        ({"toolUseId": "t4", "name": "fail"}, "boom"),
+    ):
+        result = _tool_result(registry.dispatch(tool_use))
+        assert (result["toolUseId"], result["status"]) == (tool_use["toolUseId"], "error")
+        assert result["content"][0]["json"] == {"error": error}
+
+    assert "fail" in registry and "no_such_tool" not in registry
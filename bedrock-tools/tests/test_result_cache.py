@@ -0,0 +1,123 @@
+import inspect
+import json
+
+import pytest
+
+from tools import result_cache
+from tools.result_cache import ResultCache, cached
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def shared_cache(monkeypatch, clock):
+    """
+    Replace the cache behind @cached with an empty one on the fake clock.
+    """
+    cache = ResultCache(clock=clock)
+    monkeypatch.setattr(result_cache, "_cache", cache)
+    return cache
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = ResultCache(clock=clock)
+    cache.put(("a",), {"value": 1}, ttl=60)
+    clock.now += 59.9
+    assert cache.get(("a",)) == (True, {"value": 1})
+    clock.now += 0.1
+    assert cache.get(("a",)) == (False, None)
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 0, "bytes": 0}
+
+
+def test_least_recently_used_entries_are_evicted_by_size(clock):
+    value = {"data": "x" * 100}
+    size = len(json.dumps(value))
+    cache = ResultCache(max_bytes=size * 2, clock=clock)
+    cache.put(("a",), value, ttl=60)
+    cache.put(("b",), value, ttl=60)
+    assert cache.get(("a",))[0]
+    cache.put(("c",), value, ttl=60)
+
+    assert [cache.get((key,))[0] for key in "abc"] == [True, False, True]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == size * 2
+
+    cache.put(("huge",), {"data": "x" * size * 3}, ttl=60)
+    assert cache.get(("huge",)) == (False, None)
+    assert cache.stats()["entries"] == 2
+
+
+def test_entry_count_bound(clock):
+    cache = ResultCache(max_entries=2, clock=clock)
+    for key in "abc":
+        cache.put((key,), key, ttl=60)
+    assert [cache.get((key,))[0] for key in "abc"] == [False, True, True]
+
+
+def test_invalidate_by_region_and_vpc(clock):
+    cache = ResultCache(clock=clock)
+    cache.put(("vpcs", "west"), [], ttl=60, region="us-west-2")
+    cache.put(("subnets", "west", "vpc-1"), [], ttl=60, region="us-west-2", vpc_id="vpc-1")
+    cache.put(("subnets", "west", "vpc-2"), [], ttl=60, region="us-west-2", vpc_id="vpc-2")
+    cache.put(("subnets", "east", "vpc-3"), [], ttl=60, region="us-east-1", vpc_id="vpc-3")
+
+    # Region-wide listings include the VPC, so they go too
+    assert cache.invalidate(region="us-west-2", vpc_id="vpc-1") == 2
+    assert cache.get(("subnets", "west", "vpc-2"))[0]
+    assert cache.invalidate(region="us-east-1") == 1
+    assert cache.invalidate() == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_cached_results_are_copies(clock):
+    cache = ResultCache(clock=clock)
+    original = {"subnets": [{"SubnetId": "subnet-1"}]}
+    cache.put(("a",), original, ttl=60)
+    original["subnets"].append({"SubnetId": "subnet-2"})
+
+    hit = cache.get(("a",))[1]
+    assert hit == {"subnets": [{"SubnetId": "subnet-1"}]}
+    hit["subnets"].clear()
+    assert cache.get(("a",))[1] == {"subnets": [{"SubnetId": "subnet-1"}]}
+
+
+def test_cached_decorator(shared_cache, clock):
+    calls = []
+
+    @cached("list_things")
+    def list_things(vpc_ids, region="us-west-2"):
+        calls.append((tuple(vpc_ids), region))
+        return {"things": list(vpc_ids), "region": region}
+
+    assert list_things(["vpc-1"]) == {"things": ["vpc-1"], "region": "us-west-2"}
+    # Positional and keyword calls, and the region default, share one key
+    list_things(vpc_ids=["vpc-1"], region="us-west-2")["things"].append("mutated")
+    assert list_things(["vpc-1"]) == {"things": ["vpc-1"], "region": "us-west-2"}
+    assert len(calls) == 1
+
+    list_things(["vpc-1"], bypass_cache=True)
+    assert len(calls) == 2
+    list_things(["vpc-1"], region="us-east-1")
+    assert len(calls) == 3
+
+    clock.now += result_cache.DEFAULT_TTL_SECONDS
+    list_things(["vpc-1"])
+    assert len(calls) == 4
+
+    assert result_cache.invalidate_cache(region="us-east-1") == 1
+    list_things(["vpc-1"], region="us-east-1")
+    assert len(calls) == 5
+
+    parameter = inspect.signature(list_things).parameters["bypass_cache"]
+    assert (parameter.kind, parameter.default) == (inspect.Parameter.KEYWORD_ONLY, False)
@@ -0,0 +1,92 @@
+import pytest
+
+from tools.route_resolver import CompiledRouteTable, parse_address, resolve, route_target
+
+SUBNET = "subnet-1"
+
+
+def _table(routes, route_table_id="rtb-1", subnet_ids=(), is_main=True):
+    return {"RouteTableId": route_table_id, "Routes": routes, "SubnetIds": list(subnet_ids), "IsMain": is_main}
+
+
+def _route(cidr, target, origin="CreateRoute", **fields):
+    field = "DestinationIpv6CidrBlock" if ":" in cidr else "DestinationCidrBlock"
+    target_field = "NatGatewayId" if target.startswith("nat-") else "GatewayId"
+    return dict({field: cidr, target_field: target, "Origin": origin, "State": "active"}, **fields)
+
+
+def _lookup(routes, destination_ip, prefix_lists=None):
+    compiled = CompiledRouteTable(_table(routes), prefix_lists or {})
+    route = compiled.lookup(*parse_address(destination_ip))
+    return route and route_target(route)[1]
+
+
+LOCAL = _route("10.0.0.0/16", "local", origin="CreateRouteTable")
+
+
+def test_longest_prefix_wins():
+    routes = [
+        LOCAL,
+        _route("0.0.0.0/0", "igw-1"),
+        _route("10.1.0.0/16", "vgw-1"),
+        _route("10.1.2.0/24", "nat-1"),
+        _route("::/0", "igw-1"),
+        _route("2001:db8::/32", "vgw-1"),
+    ]
+    assert _lookup(routes, "10.0.5.5") == "local"
+    assert _lookup(routes, "10.1.2.3") == "nat-1"
+    assert _lookup(routes, "10.1.3.3") == "vgw-1"
+    assert _lookup(routes, "8.8.8.8") == "igw-1"
+    assert _lookup(routes, "2001:db8::1") == "vgw-1"
+    assert _lookup(routes, "2600::1") == "igw-1"
+    assert _lookup([LOCAL], "192.168.0.1") is None
+
+
+def test_static_route_beats_propagated_route_for_the_same_prefix():
+    static = _route("10.1.0.0/16", "nat-1")
+    propagated = _route("10.1.0.0/16", "vgw-1", origin="EnableVgwRoutePropagation")
+    assert _lookup([propagated, static], "10.1.0.1") == "nat-1"
+    assert _lookup([static, propagated], "10.1.0.1") == "nat-1"
+    # A more specific propagated route still wins over a shorter static one
+    assert _lookup([static, _route("10.1.2.0/24", "vgw-1", origin="EnableVgwRoutePropagation")], "10.1.2.1") == "vgw-1"
+
+
+def test_prefix_list_routes():
+    prefix_lists = {"pl-1": ["52.94.0.0/22", "54.231.0.0/16"]}
+    prefix_list_route = {"DestinationPrefixListId": "pl-1", "GatewayId": "vpce-1", "Origin": "CreateRoute", "State": "active"}
+    routes = [LOCAL, _route("0.0.0.0/0", "igw-1"), prefix_list_route]
+    assert _lookup(routes, "54.231.10.1", prefix_lists) == "vpce-1"
+    assert _lookup(routes, "52.94.3.255", prefix_lists) == "vpce-1"
+    assert _lookup(routes, "52.94.4.0", prefix_lists) == "igw-1"
+    # A CIDR route for the same prefix beats the prefix-list entry
+    assert _lookup(routes + [_route("54.231.0.0/16", "nat-1")], "54.231.10.1", prefix_lists) == "nat-1"
+
+
+def test_resolve_reports_association_outcome_and_prefix_list_warnings():
+    loads = []
+
+    def loader(prefix_list_id):
+        loads.append(prefix_list_id)
+        return None
+
+    main = _table([LOCAL, _route("0.0.0.0/0", "igw-1")], route_table_id="rtb-main")
+    explicit = _table([
+        LOCAL,
+        _route("0.0.0.0/0", "nat-1", State="blackhole"),
+        {"DestinationPrefixListId": "pl-missing", "GatewayId": "vpce-1", "Origin": "CreateRoute"},
+    ], route_table_id="rtb-explicit", subnet_ids=[SUBNET], is_main=False)
+
+    result = resolve([main, explicit], SUBNET, "8.8.8.8", loader)
+    assert (result["route_table_id"], result["association"], result["outcome"]) == ("rtb-explicit", "explicit", "blackhole")
+    assert result["route"]["target_type"] == "nat-gateway"
+    assert result["warnings"] == ["Entries for prefix list pl-missing are unavailable"]
+    assert loads == ["pl-missing"]
+
+    result = resolve([main, explicit], "subnet-2", "8.8.8.8", loader)
+    assert (result["route_table_id"], result["association"], result["outcome"]) == ("rtb-main", "main", "routed")
+    assert result["route"]["target_type"] == "internet-gateway"
+
+    assert resolve([main], SUBNET, "2001:db8::1", loader)["outcome"] == "no-route"
+    assert "error" in resolve([], SUBNET, "8.8.8.8", loader)
+    with pytest.raises(ValueError):
+        resolve([main], SUBNET, "not-an-ip", loader)
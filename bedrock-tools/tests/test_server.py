@@ -0,0 +1,162 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from server import ChatService, StubBedrockClient, create_server
+
+
+class BlockingBedrockClient(StubBedrockClient):
+    """
+    Stub client whose converse calls wait until release is set, so requests stay in flight.
+    """
+
+    def __init__(self):
+        super().__init__(latency=0)
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def converse(self, **request):
+        self.entered.set()
+        assert self.release.wait(timeout=10)
+        return super().converse(**request)
+
+
+class FailingBedrockClient(StubBedrockClient):
+    def converse(self, **request):
+        raise RuntimeError("model unavailable")
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(bedrock_client, **limits):
+        service = ChatService(bedrock_client, [], **limits)
+        server = create_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return service, f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _request(method, url, body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    request = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, dict(response.headers), json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), json.loads(e.read())
+
+
+def _new_session(base_url):
+    return _request("POST", f"{base_url}/sessions")[2]["session_id"]
+
+
+def test_concurrent_requests_beyond_capacity_are_rejected(serve):
+    client = BlockingBedrockClient()
+    _, base_url = serve(client, max_model_calls=1, max_queued=1)
+    session_ids = [_new_session(base_url) for _ in range(5)]
+    responses = []
+    rejected = threading.Semaphore(0)
+
+    def send(session_id):
+        response = _request("POST", f"{base_url}/sessions/{session_id}/messages", {"message": "Hi"})
+        responses.append(response)
+        if response[0] == 503:
+            rejected.release()
+
+    threads = [threading.Thread(target=send, args=(session_id,)) for session_id in session_ids]
+    for thread in threads:
+        thread.start()
+    # One request holds the model slot and one waits for it; the other three are shed at once
+    for _ in range(3):
+        assert rejected.acquire(timeout=10)
+    client.release.set()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert sorted(status for status, _, _ in responses) == [200, 200, 503, 503, 503]
+    assert all(headers["Retry-After"] == "2" for status, headers, _ in responses if status == 503)
+    metrics = _request("GET", f"{base_url}/metrics")[2]
+    assert metrics["service"] == {"in_flight": 0, "completed": 2, "rejected": 3, "errors": 0}
+
+
+def test_busy_session_returns_429(serve):
+    client = BlockingBedrockClient()
+    _, base_url = serve(client)
+    session_id = _new_session(base_url)
+    first = threading.Thread(target=_request, args=("POST", f"{base_url}/sessions/{session_id}/messages", {"message": "Hi"}))
+    first.start()
+    assert client.entered.wait(timeout=10)
+
+    status, headers, body = _request("POST", f"{base_url}/sessions/{session_id}/messages", {"message": "Again"})
+    client.release.set()
+    first.join(timeout=10)
+
+    assert status == 429 and headers["Retry-After"] == "2"
+    assert "still processing" in body["error"]
+    messages = _request("GET", f"{base_url}/sessions/{session_id}")[2]["messages"]
+    assert [message["content"][0]["text"] for message in messages] == ["Hi", "Stub reply."]
+
+
+def test_failed_turn_rolls_back_history(serve):
+    service, base_url = serve(FailingBedrockClient())
+    session_id = _new_session(base_url)
+    status, _, body = _request("POST", f"{base_url}/sessions/{session_id}/messages", {"message": "Hi"})
+    assert (status, body) == (500, {"error": "model unavailable"})
+    assert _request("GET", f"{base_url}/sessions/{session_id}")[2]["messages"] == []
+
+    # The session keeps working once the model answers again
+    service.bedrock_client._client = StubBedrockClient(latency=0)
+    status, _, body = _request("POST", f"{base_url}/sessions/{session_id}/messages", {"message": "Hi"})
+    assert (status, body["reply"]) == (200, "Stub reply.")
+    messages = _request("GET", f"{base_url}/sessions/{session_id}")[2]["messages"]
+    assert [message["role"] for message in messages] == ["user", "assistant"]
+
+
+def test_queue_timeout_rolls_back_history(serve):
+    client = BlockingBedrockClient()
+    service, base_url = serve(client, max_model_calls=1, queue_timeout=0.05)
+    first_id, second_id = _new_session(base_url), _new_session(base_url)
+    first = threading.Thread(target=_request, args=("POST", f"{base_url}/sessions/{first_id}/messages", {"message": "Hi"}))
+    first.start()
+    assert client.entered.wait(timeout=10)
+
+    status, _, body = _request("POST", f"{base_url}/sessions/{second_id}/messages", {"message": "Hi"})
+    client.release.set()
+    first.join(timeout=10)
+
+    assert status == 503 and "No model slot" in body["error"]
+    assert service.get_session(second_id).messages == []
+
+
+def test_metrics(serve):
+    _, base_url = serve(StubBedrockClient(latency=0))
+    session_id = _new_session(base_url)
+    for _ in range(2):
+        assert _request("POST", f"{base_url}/sessions/{session_id}/messages", {"message": "Hi"})[0] == 200
+
+    status, _, metrics = _request("GET", f"{base_url}/metrics")
+    assert status == 200
+    assert metrics["service"] == {"in_flight": 0, "completed": 2, "rejected": 0, "errors": 0}
+    summary = metrics["sessions"][session_id]
+    assert (summary["requests"], summary["errors"]) == (2, 0)
+    assert summary["p50_seconds"] <= summary["p95_seconds"] <= summary["max_seconds"]
+    assert {"bedrock_usage", "aws_clients", "result_cache", "rate_limits"} <= set(metrics)
+
+
+def test_unknown_session_and_bad_body(serve):
+    _, base_url = serve(StubBedrockClient(latency=0))
+    assert _request("POST", f"{base_url}/sessions/abc123/messages", {"message": "Hi"})[0] == 404
+    session_id = _new_session(base_url)
+    assert _request("POST", f"{base_url}/sessions/{session_id}/messages", {"text": "Hi"})[0] == 400
+    assert _request("DELETE", f"{base_url}/sessions/{session_id}")[0] == 200
+    assert _request("GET", f"{base_url}/sessions/{session_id}")[0] == 404
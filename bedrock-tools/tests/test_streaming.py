@@ -0,0 +1,143 @@
+import json
+
+import pytest
+
+import chat_engine
+from bedrock_utils import converse_stream_with_claude, iter_stream_events
+from tools import tracing
+
+TOOL_INPUT = {"vpc_id": "vpc-123", "region": "us-west-2"}
+
+
+def _tool_input_fragments():
+    raw = json.dumps(TOOL_INPUT)
+    return [raw[:7], raw[7:19], raw[19:]]
+
+
+def _stream_events():
+    """
+    A ConverseStream event list: a text block, then a toolUse block whose input JSON is split
+    across three contentBlockDelta events, then the stop and metadata events.
+    """
+    events = [
+        {"messageStart": {"role": "assistant"}},
+        {"contentBlockDelta": {"contentBlockIndex": 0, "delta": {"text": "Checking "}}},
+        {"contentBlockDelta": {"contentBlockIndex": 0, "delta": {"text": "the subnets."}}},
+        {"contentBlockStop": {"contentBlockIndex": 0}},
+        {"contentBlockStart": {"contentBlockIndex": 1,
+                               "start": {"toolUse": {"toolUseId": "tooluse_1", "name": "list_subnets"}}}},
+    ]
+    events += [{"contentBlockDelta": {"contentBlockIndex": 1, "delta": {"toolUse": {"input": fragment}}}}
+               for fragment in _tool_input_fragments()]
+    events += [
+        {"contentBlockStop": {"contentBlockIndex": 1}},
+        {"messageStop": {"stopReason": "tool_use"}},
+        {"metadata": {"usage": {"inputTokens": 10, "outputTokens": 5, "totalTokens": 15}, "metrics": {"latencyMs": 1}}},
+    ]
+    return events
+
+
+EXPECTED_MESSAGE = {
+    "role": "assistant",
+    "content": [
+        {"text": "Checking the subnets."},
+        {"toolUse": {"toolUseId": "tooluse_1", "name": "list_subnets", "input": TOOL_INPUT}},
+    ],
+    "stopReason": "tool_use",
+}
+
+
+def test_iter_stream_events_reassembles_split_tool_input():
+    events = list(iter_stream_events(_stream_events()))
+
+    assert [event_type for event_type, _ in events] == ["text", "text", "tool_use", "metadata", "message"]
+    assert events[2][1] == EXPECTED_MESSAGE["content"][1]["toolUse"]
+    assert events[-1][1] == EXPECTED_MESSAGE
+
+
+class StubStreamClient:
+    """
+    Bedrock client stub whose converse_stream replays events and records each one it emits.
+    """
+
+    def __init__(self, events, log):
+        self.events = events
+        self.log = log
+
+    def converse_stream(self, **request):
+        def stream():
+            for event in self.events:
+                self.log.append(("event", next(iter(event))))
+                yield event
+        return {"stream": stream()}
+
+
+def test_stream_assistant_turn_submits_tools_mid_stream(monkeypatch):
+    log = []
+
+    def fake_submit(tool_use):
+        log.append(("submit", tool_use["name"]))
+        return object(), 0.0
+
+    monkeypatch.setattr(chat_engine, "submit_tool_use", fake_submit)
+    texts = []
+    client = StubStreamClient(_stream_events(), log)
+
+    response, tool_uses, dispatched = chat_engine._stream_assistant_turn(client, {"messages": []}, texts.append)
+
+    assert response == EXPECTED_MESSAGE
+    assert tool_uses == [EXPECTED_MESSAGE["content"][1]["toolUse"]]
+    assert len(dispatched) == 1
+    assert "".join(texts) == "Checking the subnets."
+    # The tool starts as soon as its block stops, before the message itself has ended
+    submitted_at = log.index(("submit", "list_subnets"))
+    assert log.index(("event", "contentBlockStop"), 4) < submitted_at < log.index(("event", "messageStop"))
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.started = []
+        self.ended = []
+
+    def on_start(self, span):
+        self.started.append(span)
+
+    def on_end(self, span):
+        self.ended.append(span)
+
+
+@pytest.fixture
+def exporter():
+    exporter = RecordingExporter()
+    tracing.add_exporter(exporter)
+    yield exporter
+    tracing._exporters.remove(exporter)
+
+
+def test_converse_stream_span_ends_with_the_message_and_does_not_parent_tools(monkeypatch, exporter):
+    submitted = []
+
+    def fake_submit(tool_use):
+        submitted.append(tracing._current_span.get())
+        return object(), 0.0
+
+    monkeypatch.setattr(chat_engine, "submit_tool_use", fake_submit)
+    client = StubStreamClient(_stream_events(), [])
+
+    with tracing.span("chat.turn") as turn_span:
+        chat_engine._stream_assistant_turn(client, {"messages": []}, lambda text: None)
+        converse_span = next(span for span in exporter.ended if span.name == "bedrock.converse_stream")
+
+    # Tools started mid-stream nest under the turn, not under the still-streaming converse call
+    assert submitted == [turn_span]
+    assert converse_span.parent is turn_span
+    assert converse_span.attributes["stop_reason"] == "tool_use"
+    assert exporter.ended.count(converse_span) == 1
+
+
+def test_converse_stream_span_ends_when_the_consumer_stops_early(exporter):
+    stream = converse_stream_with_claude(StubStreamClient(_stream_events(), []), {"messages": []})
+    assert next(stream)[0] == "text"
+    assert not [span for span in exporter.ended if span.name == "bedrock.converse_stream"]
+    stream.close()
+    assert [span.name for span in exporter.ended] == ["bedrock.converse_stream"]
@@ -0,0 +1,84 @@
+import sys
+
+import boto3
+
+from tools.network_tools import _format_subnet
+from tools.topology_tools import find_cidr_overlaps
+
+REGIONS = ["us-west-2", "us-east-1"]
+
+
+def _vpc(region, cidr, subnet_cidrs=()):
+    ec2 = boto3.client("ec2", region_name=region)
+    vpc_id = ec2.create_vpc(CidrBlock=cidr)["Vpc"]["VpcId"]
+    for subnet_cidr in subnet_cidrs:
+        ec2.create_subnet(VpcId=vpc_id, CidrBlock=subnet_cidr)
+    return vpc_id
+
+
+def _rows(result):
+    columns = result["conflicts"]["columns"]
+    return [dict(zip(columns, row)) for row in result["conflicts"]["rows"]]
+
+
+def _own_vpcs(result, vpc_ids):
+    return [row for row in _rows(result) if row["vpc_id"] in vpc_ids and row["overlaps_vpc"] in vpc_ids]
+
+
+def test_overlapping_vpcs_and_subnets_are_listed_once(aws):
+    west = _vpc("us-west-2", "10.50.0.0/16", ["10.50.1.0/24"])
+    east = _vpc("us-east-1", "10.50.0.0/16", ["10.50.1.0/24", "10.50.2.0/24"])
+    _vpc("us-east-1", "10.60.0.0/16")
+
+    result = find_cidr_overlaps(REGIONS)
+    rows = _own_vpcs(result, {west, east})
+    assert sorted((row["kind"], row["cidr"]) for row in rows) == [("subnet", "10.50.1.0/24"), ("vpc", "10.50.0.0/16")]
+    assert {row["region"] for row in rows} | {row["overlaps_region"] for row in rows} == set(REGIONS)
+    assert result["conflicts_per_vpc"]["us-west-2"][west] == 2
+    assert result["conflicts_per_vpc"]["us-east-1"][east] == 2
+
+    without_subnets = find_cidr_overlaps(REGIONS, include_subnets=False)
+    assert [row["kind"] for row in _own_vpcs(without_subnets, {west, east})] == ["vpc"]
+
+
+def test_conflict_list_is_capped(aws):
+    for region in REGIONS:
+        _vpc(region, "10.70.0.0/16", ["10.70.1.0/24", "10.70.2.0/24", "10.70.3.0/24"])
+
+    result = find_cidr_overlaps(REGIONS, max_conflicts=2)
+    assert len(result["conflicts"]["rows"]) == 2
+    assert result["truncated"]
+    assert result["conflict_count"] >= 4
+    assert sum(result["conflicts_per_vpc"]["us-west-2"].values()) == result["conflict_count"]
+
+
+def test_ipv6_subnet_cidrs():
+    ipv6_only = {
+        "SubnetId": "subnet-1", "AvailabilityZone": "us-west-2a",
+        "Ipv6CidrBlockAssociationSet": [
+            {"Ipv6CidrBlock": "2600:1f14::/64", "Ipv6CidrBlockState": {"State": "associated"}},
+            {"Ipv6CidrBlock": "2600:1f14:0:1::/64", "Ipv6CidrBlockState": {"State": "disassociated"}},
+        ],
+    }
+    assert _format_subnet(ipv6_only) == {
+        "SubnetId": "subnet-1", "CidrBlock": None, "Ipv6CidrBlocks": ["2600:1f14::/64"], "AvailabilityZone": "us-west-2a"}
+
+
+def test_overlapping_ipv6_subnets(monkeypatch):
+    def vpc(vpc_id, subnets):
+        return {"VpcId": vpc_id, "CidrBlock": "10.0.0.0/16", "CidrBlocks": [], "Ipv6CidrBlocks": [], "subnets": subnets}
+
+    def subnet(subnet_id, ipv6_cidr):
+        return {"SubnetId": subnet_id, "CidrBlock": None, "Ipv6CidrBlocks": [ipv6_cidr], "AvailabilityZone": "a"}
+
+    topologies = {
+        "us-west-2": {"vpcs": [vpc("vpc-west", [subnet("subnet-west", "2600:1f14::/64")])]},
+        "us-east-1": {"vpcs": [vpc("vpc-east", [subnet("subnet-east", "2600:1f14::/64")])]},
+    }
+    # tools.topology_tools is shadowed by the tool spec list that tools/__init__.py re-exports
+    monkeypatch.setattr(sys.modules["tools.topology_tools"], "describe_region_network", lambda region: topologies[region])
+
+    result = find_cidr_overlaps(REGIONS)
+    assert result["cidrs_checked"] == 4
+    assert sorted((row["kind"], row["cidr"]) for row in _rows(result)) == [
+        ("subnet", "2600:1f14::/64"), ("vpc", "10.0.0.0/16")]
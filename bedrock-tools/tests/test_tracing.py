@@ -0,0 +1,117 @@
+import threading
+
+import boto3
+import pytest
+from botocore.config import Config
+from botocore.exceptions import EndpointConnectionError
+from botocore.awsrequest import AWSResponse
+
+from tools import tracing
+from tools.tracing import OpenTelemetryExporter, install_client_tracing
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.ended = []
+
+    def on_start(self, span):
+        pass
+
+    def on_end(self, span):
+        self.ended.append(span)
+
+
+class FakeOtelSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def set_status(self, status):
+        pass
+
+    def end(self, end_time=None):
+        pass
+
+
+class FakeOtelTrace:
+    """
+    Just enough of opentelemetry.trace for OpenTelemetryExporter.
+    """
+
+    class Status:
+        def __init__(self, code, description=None):
+            pass
+
+    class StatusCode:
+        ERROR = "error"
+
+    def set_span_in_context(self, span):
+        return None
+
+    def start_span(self, name, context=None, start_time=None):
+        return FakeOtelSpan()
+
+
+class RawBody:
+    def __init__(self, body):
+        self.body = body
+
+    def stream(self, **kwargs):
+        yield self.body
+
+
+def _otel_exporter():
+    exporter = OpenTelemetryExporter.__new__(OpenTelemetryExporter)
+    exporter._trace = exporter._tracer = FakeOtelTrace()
+    exporter._lock = threading.Lock()
+    exporter._spans = {}
+    return exporter
+
+
+@pytest.fixture
+def exporters():
+    recording, otel = RecordingExporter(), _otel_exporter()
+    tracing.add_exporter(recording)
+    tracing.add_exporter(otel)
+    yield recording, otel
+    tracing._exporters.remove(recording)
+    tracing._exporters.remove(otel)
+
+
+def _client():
+    client = boto3.client("ec2", region_name="us-west-2", config=Config(retries={"total_max_attempts": 1}))
+    install_client_tracing(client, "ec2", "us-west-2")
+    return client
+
+
+def test_aws_span_records_a_successful_call(exporters):
+    recording, otel = exporters
+    client = _client()
+    body = b'<DescribeVpcsResponse xmlns="http://ec2.amazonaws.com/doc/2016-11-15/"><vpcSet/></DescribeVpcsResponse>'
+    # Answered in before-send rather than by a Stubber, which would skip the before-call hook
+    client.meta.events.register("before-send", lambda request, **kwargs: AWSResponse(
+        request.url, 200, {"Content-Length": str(len(body))}, RawBody(body)))
+    assert client.describe_vpcs()["Vpcs"] == []
+
+    [span] = recording.ended
+    assert (span.name, span.status) == ("aws.DescribeVpcs", "ok")
+    assert span.attributes["aws.service"] == "ec2"
+    assert (span.attributes["http.status_code"], span.attributes["response_bytes"]) == (200, len(body))
+    assert otel._spans == {}
+
+
+def test_aws_span_ends_when_the_call_raises(exporters):
+    recording, otel = exporters
+    client = _client()
+
+    def refuse(request, **kwargs):
+        raise EndpointConnectionError(endpoint_url=request.url)
+
+    client.meta.events.register("before-send", refuse)
+    with pytest.raises(EndpointConnectionError):
+        client.describe_vpcs()
+
+    [span] = recording.ended
+    assert (span.name, span.status) == ("aws.DescribeVpcs", "error")
+    assert "Could not connect" in span.attributes["error"]
+    # The OpenTelemetry span was ended too, not left behind
+    assert otel._spans == {}
@@ -1,16 +1,24 @@
-from .vpc_tools import vpc_tools, handle_vpc_tool
-from .network_tools import network_tools, handle_network_tool
+from .aws_clients import get_client, configure_clients, get_client_stats
+from .result_cache import invalidate_cache, get_cache_stats
+from .compact import get_size_report
+from .rate_limit import get_rate_limit_stats
+from .tracing import add_exporter, disable_tracing, JsonLinesExporter, OpenTelemetryExporter
+from .async_tools import run_blocking, make_async
+from .registry import registry, tool
+from .vpc_tools import vpc_tools
+from .network_tools import network_tools
+from .topology_tools import topology_tools
+from .reachability import reachability_tools
+from .general_tools import general_tools
 
 
 def get_all_tools():
-    return vpc_tools + network_tools 
+    return registry.specs()
 
 
 def handle_tool(tool_use):
-    tool_name = tool_use['name']
-    if tool_name in [tool['toolSpec']['name'] for tool in vpc_tools]:
-        return handle_vpc_tool(tool_use)
-    elif tool_name in [tool['toolSpec']['name'] for tool in network_tools]:
-        return handle_network_tool(tool_use)
-    else:
-        return {"error": f"Unknown tool: {tool_name}"}
+    return registry.dispatch(tool_use)
+
+
+async def ahandle_tool(tool_use):
+    return await registry.adispatch(tool_use)
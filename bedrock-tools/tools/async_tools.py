@@ -0,0 +1,90 @@
+# tools/async_tools.py
+import contextvars
+import functools
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+# asyncio is imported on first use, so the sync CLI and Lambda paths never pay for it
+if TYPE_CHECKING:
+    import asyncio
+
+# Threads that run blocking boto3 calls for every event loop in the process. The pooled clients
+# are thread-safe, so this bounds the number of threads no matter how many sessions are active.
+AWS_IO_WORKERS = int(os.environ.get("AWS_IO_WORKERS", "32"))
+
+_io_executor = ThreadPoolExecutor(max_workers=AWS_IO_WORKERS, thread_name_prefix="aws-io")
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _loop_semaphore() -> "asyncio.Semaphore":
+    import asyncio
+
+    # asyncio primitives belong to one loop, so keep one semaphore per running loop
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(AWS_IO_WORKERS)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """
+    Run a blocking function on the shared AWS I/O pool without blocking the event loop.
+
+    Callers beyond the pool size wait on a semaphore instead of queuing inside the executor. A
+    thread cannot be interrupted, so when the awaiting coroutine is cancelled or times out, the
+    permit is held until the thread finishes; the number of running calls never exceeds the cap.
+
+    Args:
+    func (Callable): The blocking function.
+    *args: Positional arguments for func.
+    **kwargs: Keyword arguments for func.
+
+    Returns:
+    Any: The function's result.
+    """
+    import asyncio
+
+    semaphore = _loop_semaphore()
+    await semaphore.acquire()
+    loop = asyncio.get_running_loop()
+
+    def release(_future):
+        try:
+            loop.call_soon_threadsafe(semaphore.release)
+        except RuntimeError:
+            # The loop has closed, and its semaphore with it
+            pass
+
+    # Run in a copy of the caller's context so tracing spans keep their parent
+    context = contextvars.copy_context()
+    try:
+        future = _io_executor.submit(context.run, func, *args, **kwargs)
+    except BaseException:
+        semaphore.release()
+        raise
+    future.add_done_callback(release)
+    # Cancelling the wrapper cancels the call only if it has not started yet
+    return await asyncio.wrap_future(future)
+
+
+def make_async(func: Callable) -> Callable[..., Awaitable[Any]]:
+    """
+    Build the asyncio variant of a synchronous tool.
+
+    The coroutine runs the sync tool itself, so caching, validation and results are identical on
+    both paths.
+
+    Args:
+    func (Callable): The synchronous tool function.
+
+    Returns:
+    Callable[..., Awaitable[Any]]: A coroutine function with the same signature and docstring.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(func, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,191 @@
+# tools/aws_clients.py
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+from .rate_limit import RETRY_CONFIG, configure_rate_limits, rate_limiter
+from .tracing import install_client_tracing
+
+if TYPE_CHECKING:
+    import boto3
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+
+# (connect, read) timeouts in seconds per service. They bound how long one attempt can hold a
+# thread, since a tool that runs past the chat engine's timeout cannot be cancelled. Converse
+# responses can take minutes to generate, so bedrock-runtime gets a longer read timeout.
+CLIENT_TIMEOUTS = {
+    "bedrock-runtime": (10, 300),
+}
+DEFAULT_CLIENT_TIMEOUTS = (5, 20)
+
+
+class ClientRegistry:
+    """
+    Thread-safe registry of boto3 sessions and clients.
+
+    Clients are keyed by (service, region, profile) and created once, so every tool call
+    for the same key reuses the same service model, credential chain and HTTP connection pool.
+    Each client uses botocore's adaptive retry mode and is hooked into the shared rate limiter.
+    boto3 clients are safe to share between threads once created; sessions are not, which is
+    why creation happens under a lock. boto3 itself is imported on the first client request,
+    so importing the tools package stays cheap.
+    """
+
+    def __init__(self, max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS):
+        self._lock = threading.Lock()
+        self._sessions: Dict[Optional[str], "boto3.session.Session"] = {}
+        self._clients: Dict[Tuple[str, Optional[str], Optional[str]], Any] = {}
+        self.max_pool_connections = max_pool_connections
+        self.hits = 0
+        self.misses = 0
+
+    def _get_session(self, profile: Optional[str]) -> "boto3.session.Session":
+        session = self._sessions.get(profile)
+        if session is None:
+            import boto3
+
+            session = boto3.session.Session(profile_name=profile)
+            self._sessions[profile] = session
+        return session
+
+    def get_client(self, service: str, region: Optional[str] = None, profile: Optional[str] = None) -> Any:
+        """
+        Return the shared client for a service, region and profile, creating it on first use.
+
+        Args:
+        service (str): The AWS service name (e.g., "ec2").
+        region (str, optional): The AWS region. Defaults to the session's configured region.
+        profile (str, optional): The AWS named profile. Defaults to the default credential chain.
+
+        Returns:
+        Any: A boto3 client for the requested service.
+        """
+        key = (service, region, profile)
+        client = self._clients.get(key)
+        if client is not None:
+            with self._lock:
+                self.hits += 1
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self.hits += 1
+                return client
+            from botocore.config import Config
+
+            connect_timeout, read_timeout = CLIENT_TIMEOUTS.get(service, DEFAULT_CLIENT_TIMEOUTS)
+            config = Config(max_pool_connections=self.max_pool_connections, retries=dict(RETRY_CONFIG),
+                            connect_timeout=connect_timeout, read_timeout=read_timeout)
+            client = self._get_session(profile).client(service, region_name=region, config=config)
+            rate_limiter.install(client, service, region)
+            install_client_tracing(client, service, region)
+            self._clients[key] = client
+            self.misses += 1
+            logger.debug(f"Created {service} client for region={region} profile={profile}")
+            return client
+
+    def configure(self, max_pool_connections: int) -> None:
+        """
+        Change the connection pool size used for clients created from now on.
+
+        Existing clients are dropped so the new pool size takes effect on the next call.
+
+        Args:
+        max_pool_connections (int): Maximum number of pooled HTTP connections per client.
+        """
+        with self._lock:
+            self.max_pool_connections = max_pool_connections
+            self._clients.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hit/miss counters and the number of cached clients.
+
+        Returns:
+        Dict[str, int]: A dictionary with 'hits', 'misses' and 'clients' counts.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "clients": len(self._clients)}
+
+    def clear(self) -> None:
+        """
+        Drop all cached sessions and clients and reset the counters.
+        """
+        with self._lock:
+            self._sessions.clear()
+            self._clients.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_registry = ClientRegistry()
+
+
+def get_client(service: str, region: Optional[str] = None, profile: Optional[str] = None) -> Any:
+    """
+    Return a pooled boto3 client from the shared registry.
+
+    Args:
+    service (str): The AWS service name (e.g., "ec2").
+    region (str, optional): The AWS region.
+    profile (str, optional): The AWS named profile.
+
+    Returns:
+    Any: A boto3 client for the requested service.
+    """
+    return _registry.get_client(service, region=region, profile=profile)
+
+
+def configure_clients(max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS,
+                      rate_limits: Optional[Dict[str, Optional[Tuple[float, int]]]] = None) -> None:
+    """
+    Configure the shared registry's connection pool size and, optionally, the client-side rate limits.
+
+    Args:
+    max_pool_connections (int): Maximum number of pooled HTTP connections per client.
+    rate_limits (Dict[str, Optional[Tuple[float, int]]], optional): Per service, (requests per second,
+    burst size), or None for no client-side limit. Services not listed keep their limits.
+    """
+    _registry.configure(max_pool_connections)
+    if rate_limits:
+        configure_rate_limits(rate_limits)
+
+
+def get_client_stats() -> Dict[str, int]:
+    """
+    Return hit/miss counters for the shared registry.
+
+    Returns:
+    Dict[str, int]: A dictionary with 'hits', 'misses' and 'clients' counts.
+    """
+    return _registry.stats()
+
+
+def clear_clients() -> None:
+    """
+    Reset the shared registry.
+    """
+    _registry.clear()
+
+
+def paginate(client: Any, operation_name: str, result_key: str, **kwargs) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Walk every page of a describe/list operation, yielding the items of one page at a time.
+
+    Args:
+    client (Any): The boto3 client to call.
+    operation_name (str): The paginated operation (e.g., "describe_vpcs").
+    result_key (str): The response key holding the page items (e.g., "Vpcs").
+    **kwargs: Parameters passed through to the operation.
+
+    Yields:
+    List[Dict[str, Any]]: The items returned in each page.
+    """
+    paginator = client.get_paginator(operation_name)
+    for page in paginator.paginate(**kwargs):
+        yield page.get(result_key, [])
@@ -0,0 +1,180 @@
+# tools/cidr.py
+import socket
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Columns returned by analyze_cidrs(), in row order
+CIDR_TABLE_COLUMNS = ["cidr", "version", "network_address", "broadcast_address", "num_addresses", "netmask", "prefixlen", "contained_in"]
+
+_IPV4_ALL = (1 << 32) - 1
+_IPV6_ALL = (1 << 128) - 1
+
+# Netmask strings for every (version, prefix length), so analysis never formats them per row
+_NETMASKS = {
+    (version, prefixlen): socket.inet_ntop(
+        family, (all_ones ^ (all_ones >> prefixlen)).to_bytes(bits // 8, "big"))
+    for version, family, bits, all_ones in ((4, socket.AF_INET, 32, _IPV4_ALL), (6, socket.AF_INET6, 128, _IPV6_ALL))
+    for prefixlen in range(bits + 1)
+}
+
+
+def parse_cidr(cidr: str) -> Tuple[int, int, int]:
+    """
+    Parse a CIDR into integers.
+
+    Addresses are parsed with inet_pton, which is several times faster than ipaddress and just
+    as strict. As with ip_network(), host bits must be zero.
+
+    Args:
+    cidr (str): An IPv4 or IPv6 CIDR (e.g., "10.0.0.0/16" or "2001:db8::/32").
+
+    Returns:
+    Tuple[int, int, int]: The IP version, the network address as an integer and the prefix length.
+
+    Raises:
+    ValueError: If the CIDR is invalid or has host bits set.
+    """
+    address, slash, length = cidr.strip().partition("/")
+    version, family, bits = (6, socket.AF_INET6, 128) if ":" in address else (4, socket.AF_INET, 32)
+    try:
+        start = int.from_bytes(socket.inet_pton(family, address), "big")
+    except OSError:
+        raise ValueError(f"{cidr!r} does not appear to be an IPv4 or IPv6 network")
+    # isdigit() alone accepts non-ASCII digits such as "²" that int() rejects
+    if slash and not (length.isascii() and length.isdigit() and int(length) <= bits):
+        raise ValueError(f"Invalid prefix length in {cidr!r}")
+    prefixlen = int(length) if slash else bits
+    if start & ((1 << (bits - prefixlen)) - 1):
+        raise ValueError(f"{cidr} has host bits set")
+    return version, start, prefixlen
+
+
+def cidr_bounds(version: int, start: int, prefixlen: int) -> Tuple[int, int]:
+    """
+    Return the first and last address of a parsed CIDR as integers.
+    """
+    host_bits = (32 if version == 4 else 128) - prefixlen
+    return start, start | ((1 << host_bits) - 1)
+
+
+def format_address(version: int, value: int) -> str:
+    """
+    Format an integer address as dotted-quad IPv4 or compressed IPv6.
+    """
+    if version == 4:
+        return socket.inet_ntoa(value.to_bytes(4, "big"))
+    return socket.inet_ntop(socket.AF_INET6, value.to_bytes(16, "big"))
+
+
+def parse_cidrs(cidrs: List[str]) -> Tuple[Dict[str, List[int]], List[Dict[str, Any]]]:
+    """
+    Parse many CIDRs into integer columns.
+
+    Args:
+    cidrs (List[str]): The CIDRs to parse.
+
+    Returns:
+    Tuple[Dict[str, List[int]], List[Dict[str, Any]]]: Columns 'index' (position in cidrs),
+    'version', 'start', 'end' and 'prefixlen' for the valid CIDRs, and an error entry for each
+    invalid one.
+    """
+    columns = {"index": [], "version": [], "start": [], "end": [], "prefixlen": []}
+    errors = []
+    for index, cidr in enumerate(cidrs):
+        try:
+            version, start, prefixlen = parse_cidr(cidr)
+        except (ValueError, AttributeError) as e:
+            errors.append({"cidr": cidr, "error": f"Invalid CIDR notation: {str(e)}"})
+            continue
+        columns["index"].append(index)
+        columns["version"].append(version)
+        columns["start"].append(start)
+        columns["end"].append(start | ((1 << ((32 if version == 4 else 128) - prefixlen)) - 1))
+        columns["prefixlen"].append(prefixlen)
+    return columns, errors
+
+
+def find_containers(versions: List[int], starts: List[int], ends: List[int]) -> List[Optional[int]]:
+    """
+    For each prefix, find the smallest other prefix that contains it.
+
+    Prefixes are sorted by (version, start, widest first) and swept with a stack of open
+    prefixes, so the whole pass is O(n log n). Duplicates contain each other; the first
+    occurrence is reported as the container of later ones.
+
+    Args:
+    versions (List[int]): IP version per prefix.
+    starts (List[int]): First address per prefix.
+    ends (List[int]): Last address per prefix.
+
+    Returns:
+    List[Optional[int]]: Per prefix, the position of its smallest container, or None.
+    """
+    order = sorted(range(len(starts)), key=lambda i: (versions[i], starts[i], -ends[i], i))
+    containers: List[Optional[int]] = [None] * len(starts)
+    stack: List[int] = []
+    for i in order:
+        while stack and (versions[stack[-1]] != versions[i] or ends[stack[-1]] < starts[i]):
+            stack.pop()
+        if stack:
+            containers[i] = stack[-1]
+        stack.append(i)
+    return containers
+
+
+def analyze_cidrs(cidrs: List[str]) -> Dict[str, Any]:
+    """
+    Compute network, broadcast, size, netmask and containment for many CIDRs in one pass.
+
+    Args:
+    cidrs (List[str]): IPv4 and/or IPv6 CIDRs.
+
+    Returns:
+    Dict[str, Any]: A table with CIDR_TABLE_COLUMNS and one row per valid CIDR in input order,
+    where contained_in is the smallest other listed CIDR that contains it, plus any errors.
+    """
+    columns, errors = parse_cidrs(cidrs)
+    versions, starts, ends, prefixlens = columns["version"], columns["start"], columns["end"], columns["prefixlen"]
+    containers = find_containers(versions, starts, ends)
+
+    rows = []
+    for position, index in enumerate(columns["index"]):
+        version = versions[position]
+        container = containers[position]
+        rows.append([
+            cidrs[index].strip(),
+            version,
+            format_address(version, starts[position]),
+            format_address(version, ends[position]),
+            ends[position] - starts[position] + 1,
+            _NETMASKS[version, prefixlens[position]],
+            prefixlens[position],
+            cidrs[columns["index"][container]].strip() if container is not None else None
+        ])
+    return {"columns": CIDR_TABLE_COLUMNS, "rows": rows, "errors": errors}
+
+
+def iter_overlaps(versions: List[int], starts: List[int], ends: List[int]) -> Iterator[Tuple[int, int]]:
+    """
+    Yield every pair of overlapping prefixes with one sorted sweep.
+
+    CIDR blocks either nest or are disjoint, so the prefixes still open at any point form a
+    chain of containers. After sorting by (version, start, widest first), each prefix overlaps
+    exactly the open prefixes left on the stack. That makes the pass O(n log n + k) for k
+    overlapping pairs, instead of comparing all n^2 pairs.
+
+    Args:
+    versions (List[int]): IP version per prefix.
+    starts (List[int]): First address per prefix.
+    ends (List[int]): Last address per prefix.
+
+    Yields:
+    Tuple[int, int]: (container position, contained position) for each overlapping pair.
+    """
+    order = sorted(range(len(starts)), key=lambda i: (versions[i], starts[i], -ends[i], i))
+    stack: List[int] = []
+    for i in order:
+        while stack and (versions[stack[-1]] != versions[i] or ends[stack[-1]] < starts[i]):
+            stack.pop()
+        for container in stack:
+            yield container, i
+        stack.append(i)
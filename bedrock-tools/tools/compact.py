@@ -0,0 +1,142 @@
+# tools/compact.py
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+# Compact encoding is used for results whose raw JSON is at least this many bytes
+COMPACT_THRESHOLD_BYTES = int(os.environ.get("COMPACT_THRESHOLD_BYTES", "1024"))
+COMPACT_RESULTS_ENABLED = os.environ.get("COMPACT_RESULTS", "true").lower() in ("1", "true", "yes")
+
+# Shortest common prefix worth eliding from an ID column (e.g. "rtb-")
+MIN_PREFIX_LENGTH = 4
+
+# AWS resource IDs (e.g. "subnet-0a1b2c3d", "tgw-attach-0123456789abcdef0"); only columns where
+# every value looks like one have their prefix elided, so names and zones stay whole
+RESOURCE_ID_PATTERN = re.compile(r"[a-z]+(?:-[a-z]+)*-[0-9a-f]{8,}")
+
+_size_lock = threading.Lock()
+_size_reports: Dict[str, Dict[str, int]] = {}
+
+
+def _common_prefix(values: List[str]) -> str:
+    prefix = min(values)
+    last = max(values)
+    length = 0
+    while length < len(prefix) and prefix[length] == last[length]:
+        length += 1
+    prefix = prefix[:length]
+    # Only elide up to the last separator so IDs keep a readable suffix
+    cut = prefix.rfind("-") + 1
+    return prefix[:cut] if cut >= MIN_PREFIX_LENGTH else ""
+
+
+def _table(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    columns = []
+    for row in rows:
+        for key, value in row.items():
+            if value is not None and key not in columns:
+                columns.append(key)
+
+    table_rows = [[compact_value(row.get(column)) for column in columns] for row in rows]
+    prefixes = {}
+    for index, column in enumerate(columns):
+        values = [row[index] for row in table_rows if row[index] is not None]
+        if len(values) > 1 and all(isinstance(value, str) and RESOURCE_ID_PATTERN.fullmatch(value) for value in values):
+            prefix = _common_prefix(values)
+            if prefix:
+                prefixes[column] = prefix
+                for row in table_rows:
+                    if row[index] is not None:
+                        row[index] = row[index][len(prefix):]
+
+    table = {"columns": columns, "rows": table_rows}
+    if prefixes:
+        table["prefixes"] = prefixes
+    return table
+
+
+def compact_value(value: Any) -> Any:
+    """
+    Encode a tool result value compactly.
+
+    Lists of two or more dictionaries become a table of column headers plus row arrays, with a
+    common resource ID prefix per column (e.g. "subnet-") stored once under "prefixes". None values are
+    dropped from dictionaries and empty columns are omitted from tables.
+
+    Args:
+    value (Any): A JSON-serializable tool result value.
+
+    Returns:
+    Any: The compact encoding of the value.
+    """
+    if isinstance(value, dict):
+        return {key: compact_value(item) for key, item in value.items() if item is not None}
+    if isinstance(value, list):
+        if len(value) > 1 and all(isinstance(item, dict) for item in value):
+            return _table(value)
+        return [compact_value(item) for item in value]
+    return value
+
+
+def record_size(tool_name: str, raw_bytes: int, compact_bytes: int) -> None:
+    """
+    Add one result's raw and compact sizes to the per-tool size report.
+
+    Args:
+    tool_name (str): The tool that produced the result.
+    raw_bytes (int): Size of the raw JSON result.
+    compact_bytes (int): Size of the JSON actually sent to the model.
+    """
+    with _size_lock:
+        report = _size_reports.setdefault(tool_name, {"calls": 0, "raw_bytes": 0, "compact_bytes": 0})
+        report["calls"] += 1
+        report["raw_bytes"] += raw_bytes
+        report["compact_bytes"] += compact_bytes
+
+
+def get_size_report() -> Dict[str, Dict[str, Any]]:
+    """
+    Return the raw and compact bytes per tool, with the share of bytes saved.
+
+    Returns:
+    Dict[str, Dict[str, Any]]: Tool name mapped to its calls, raw_bytes, compact_bytes and saved_ratio.
+    """
+    with _size_lock:
+        report = {}
+        for tool_name, sizes in _size_reports.items():
+            saved = 1 - sizes["compact_bytes"] / sizes["raw_bytes"] if sizes["raw_bytes"] else 0.0
+            report[tool_name] = dict(sizes, saved_ratio=round(saved, 3))
+        return report
+
+
+def encode_result(tool_name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the result to send to the model, compacting it when it is large enough to matter.
+
+    Args:
+    tool_name (str): The tool that produced the result.
+    result (Dict[str, Any]): The raw tool result.
+
+    Returns:
+    Dict[str, Any]: The compact result if compaction is enabled and the raw result is at least
+                    COMPACT_THRESHOLD_BYTES, otherwise the raw result.
+    """
+    raw_bytes = len(json.dumps(result, default=str))
+    if not COMPACT_RESULTS_ENABLED or raw_bytes < COMPACT_THRESHOLD_BYTES:
+        record_size(tool_name, raw_bytes, raw_bytes)
+        return result
+
+    compact = compact_value(result)
+    compact_bytes = len(json.dumps(compact, default=str))
+    if compact_bytes >= raw_bytes:
+        record_size(tool_name, raw_bytes, raw_bytes)
+        return result
+    record_size(tool_name, raw_bytes, compact_bytes)
+    logger.debug(f"Compacted {tool_name} result from {raw_bytes} to {compact_bytes} bytes")
+    return compact
@@ -1,10 +1,15 @@
 # tools/general_tools.py
+import ast
 from datetime import datetime
-import pytz
 import math
-from typing import Dict, Any, Union
+import operator
+from typing import Dict, Any, List, Union
 
+from .cidr import analyze_cidrs
+from .registry import registry, tool
 
+
+@tool("Get the current date and time in a specified timezone", group="general")
 def get_current_datetime(timezone_str: str = "UTC") -> Dict[str, str]:
     """
     Get the current date and time in the specified timezone.
@@ -22,6 +27,9 @@ def get_current_datetime(timezone_str: str = "UTC") -> Dict[str, str]:
     Raises:
     pytz.exceptions.UnknownTimeZoneError: If an invalid timezone is provided.
     """
+    # pytz is only needed by this tool, so it is imported on first use
+    import pytz
+
     try:
         tz = pytz.timezone(timezone_str)
         current_time = datetime.now(tz)
@@ -33,12 +41,75 @@ def get_current_datetime(timezone_str: str = "UTC") -> Dict[str, str]:
         return {"error": f"Unknown timezone: {timezone_str}"}
 
 
+# Operators and math members perform_calculation() may use; anything else in an expression is rejected
+CALCULATION_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+CALCULATION_FUNCTIONS = {
+    name: getattr(math, name) for name in (
+        "sqrt", "exp", "log", "log2", "log10", "sin", "cos", "tan", "asin", "acos", "atan", "atan2",
+        "sinh", "cosh", "tanh", "degrees", "radians", "ceil", "floor", "fabs", "trunc", "hypot", "gcd"
+    )
+}
+CALCULATION_CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+# Integer results are kept under this many bits (about 1200 digits). Larger products and powers
+# can take minutes to compute, and ints over 4300 digits cannot be converted to str for JSON.
+MAX_INTEGER_BITS = 4096
+
+
+def _check_integer_size(op, left, right):
+    # Estimate the size of an integer product or power from its operands before computing it
+    if type(left) is not int or type(right) is not int:
+        return
+    if isinstance(op, ast.Pow) and right > 0:
+        bits = left.bit_length() * right
+    elif isinstance(op, ast.Mult):
+        bits = left.bit_length() + right.bit_length()
+    else:
+        return
+    if bits > MAX_INTEGER_BITS:
+        raise ValueError(f"Result would exceed {MAX_INTEGER_BITS} bits")
+
+
+def _evaluate_node(node):
+    if isinstance(node, ast.Expression):
+        return _evaluate_node(node.body)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in CALCULATION_OPERATORS:
+        left, right = _evaluate_node(node.left), _evaluate_node(node.right)
+        _check_integer_size(node.op, left, right)
+        return CALCULATION_OPERATORS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in CALCULATION_OPERATORS:
+        return CALCULATION_OPERATORS[type(node.op)](_evaluate_node(node.operand))
+    # Only math.<name> is allowed, e.g. math.pi or math.sqrt(2)
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "math":
+        if node.attr in CALCULATION_CONSTANTS:
+            return CALCULATION_CONSTANTS[node.attr]
+    if (isinstance(node, ast.Call) and not node.keywords and isinstance(node.func, ast.Attribute)
+            and isinstance(node.func.value, ast.Name) and node.func.value.id == "math"
+            and node.func.attr in CALCULATION_FUNCTIONS):
+        return CALCULATION_FUNCTIONS[node.func.attr](*(_evaluate_node(arg) for arg in node.args))
+    raise ValueError(f"Unsupported expression element: {type(node).__name__}")
+
+
+@tool("Perform a simple mathematical calculation", group="general")
 def perform_calculation(expression: str) -> Dict[str, Union[float, str]]:
     """
     Perform a simple mathematical calculation.
 
     This function evaluates a given mathematical expression and returns the result.
-    It uses a restricted environment to prevent execution of arbitrary code.
+    The expression is parsed, never executed: only numbers, arithmetic operators and
+    whitelisted math functions and constants (e.g. math.sqrt, math.pi) are allowed.
 
     Args:
     expression (str): The mathematical expression to evaluate.
@@ -51,12 +122,13 @@ def perform_calculation(expression: str) -> Dict[str, Union[float, str]]:
     Exception: If there's an error in evaluating the expression.
     """
     try:
-        result = eval(expression, {"__builtins__": None}, {"math": math})
+        result = _evaluate_node(ast.parse(expression, mode="eval"))
         return {"result": result}
     except Exception as e:
         return {"error": f"Calculation error: {str(e)}"}
 
 
+@tool("Convert between common units of measurement", group="general")
 def convert_units(value: float, from_unit: str, to_unit: str) -> Dict[str, Union[float, str]]:
     """
     Convert between common units of measurement.
@@ -86,6 +158,7 @@ def convert_units(value: float, from_unit: str, to_unit: str) -> Dict[str, Union
     return {"error": f"Unsupported conversion: {from_unit} to {to_unit}"}
 
 
+@tool("Get information about an AWS region", group="general")
 def get_aws_region_info(region_code: str) -> Dict[str, Any]:
     """
     Provide information about AWS regions.
@@ -107,6 +180,7 @@ def get_aws_region_info(region_code: str) -> Dict[str, Any]:
     }
     return regions.get(region_code, {"error": f"Unknown region code: {region_code}"})
 
+@tool("Calculate the range of IP addresses for a given CIDR notation", group="general")
 def calculate_cidr_range(cidr: str) -> Dict[str, Any]:
     """
     Calculate the range of IP addresses for a given CIDR notation.
@@ -137,79 +211,23 @@ def calculate_cidr_range(cidr: str) -> Dict[str, Any]:
         return {"error": f"Invalid CIDR notation: {str(e)}"}
 
 
-general_tools = [
-    {
-        "toolSpec": {
-            "name": "get_current_datetime",
-            "description": "Get the current date and time in a specified timezone"
-        }
-    },
-    {
-        "toolSpec": {
-            "name": "perform_calculation",
-            "description": "Perform a simple mathematical calculation"
-        }
-    },
-    {
-        "toolSpec": {
-            "name": "convert_units",
-            "description": "Convert between common units of measurement"
-        }
-    },
-    {
-        "toolSpec": {
-            "name": "get_aws_region_info",
-            "description": "Get information about an AWS region"
-        }
-    },
-    {
-        "toolSpec": {
-            "name": "calculate_cidr_range",
-            "description": "Calculate the range of IP addresses for a given CIDR notation"
-        }
-    }
-]
-
-
-def handle_general_tool(tool_use: Dict[str, Any]) -> Dict[str, Any]:
+@tool("Analyze many IPv4/IPv6 CIDRs at once: network and broadcast address, size, netmask, and which other listed CIDR contains each one. Use this instead of calling calculate_cidr_range repeatedly.", group="general")
+def calculate_cidr_ranges(cidrs: List[str]) -> Dict[str, Any]:
     """
-    Handle general tool use requests.
+    Calculate the ranges of many CIDRs in one call.
+
+    The CIDRs are parsed into integer columns and analyzed together, so containment between
+    them is found with one sort instead of comparing every pair.
 
     Args:
-    tool_use (Dict[str, Any]): A dictionary containing the tool use request details.
+    cidrs (List[str]): The CIDR notations (e.g., ["10.0.0.0/16", "10.0.1.0/24", "2001:db8::/32"]).
 
     Returns:
-    Dict[str, Any]: The result of the tool operation or an error message.
+    Dict[str, Any]: A table with 'columns' and one row per valid CIDR in input order, where
+                    'contained_in' is the smallest other listed CIDR containing it, and 'errors'
+                    for the CIDRs that could not be parsed.
     """
-    tool_name = tool_use['name']
-    input_data = tool_use['input']
+    return analyze_cidrs(cidrs)
 
-    try:
-        if tool_name == "get_current_datetime":
-            result = get_current_datetime(input_data.get('timezone', 'UTC'))
-        elif tool_name == "perform_calculation":
-            result = perform_calculation(input_data['expression'])
-        elif tool_name == "convert_units":
-            result = convert_units(input_data['value'], input_data['from_unit'], input_data['to_unit'])
-        elif tool_name == "get_aws_region_info":
-            result = get_aws_region_info(input_data['region_code'])
-        elif tool_name == "calculate_cidr_range":
-            result = calculate_cidr_range(input_data['cidr'])
-        else:
-            return {"error": f"Unknown general tool: {tool_name}"}
 
-        return {
-            "toolResult": {
-                "toolUseId": tool_use['toolUseId'],
-                "content": [{"json": result}],
-                "status": "success"
-            }
-        }
-    except Exception as e:
-        return {
-            "toolResult": {
-                "toolUseId": tool_use['toolUseId'],
-                "content": [{"json": {"error": str(e)}}],
-                "status": "error"
-            }
-        }
\ No newline at end of file
+general_tools = registry.specs(group="general")
@@ -0,0 +1,175 @@
+# tools/nacl.py
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .cidr import cidr_bounds, parse_cidr
+
+# Compiled Network ACLs kept in memory
+MAX_COMPILED_ACLS = 512
+
+# IANA protocol numbers for protocol names; Network ACL entries store the number as a string
+PROTOCOL_NUMBERS = {'tcp': '6', 'udp': '17', 'icmp': '1', 'icmpv6': '58', 'all': '-1'}
+
+# Only TCP and UDP entries carry a port range
+PORT_PROTOCOLS = ('6', '17')
+
+# ICMP and ICMPv6 are matched by type and code instead of ports
+ICMP_PROTOCOLS = ('1', '58')
+
+_ALL_PORTS = (0, 65535)
+
+
+def protocol_number(protocol: str) -> str:
+    """
+    Normalize a protocol name or number to the string number used by Network ACL entries.
+
+    Raises:
+    ValueError: If the protocol is unknown.
+    """
+    protocol = str(protocol).lower()
+    if protocol in PROTOCOL_NUMBERS:
+        return PROTOCOL_NUMBERS[protocol]
+    if protocol.isdigit():
+        return protocol
+    raise ValueError(f"Unknown protocol {protocol!r}; use tcp, udp, icmp, icmpv6, all or a protocol number")
+
+
+class CompiledNetworkAcl:
+    """
+    A Network ACL compiled into one ordered rule list per direction.
+
+    Each rule is a tuple of (rule number, allow, protocol, IP version, first address, last
+    address, first port, last port, ICMP type, ICMP code, entry), with CIDR and port bounds
+    precomputed as integers and -1 for any ICMP type or code, so matching a flow is integer
+    comparisons only. The first rule that matches decides.
+    """
+
+    def __init__(self, nacl: Dict[str, Any]):
+        self.network_acl_id = nacl['NetworkAclId']
+        self.rules: Dict[bool, List[Tuple]] = {True: [], False: []}
+        for entry in sorted(nacl['Entries'], key=lambda entry: entry['RuleNumber']):
+            try:
+                version, start, prefixlen = parse_cidr(entry['CidrBlock'])
+            except (ValueError, AttributeError):
+                continue
+            first, last = cidr_bounds(version, start, prefixlen)
+            port_range = entry.get('PortRange')
+            if entry['Protocol'] in PORT_PROTOCOLS and port_range:
+                ports = (port_range['From'], port_range['To'])
+            else:
+                ports = _ALL_PORTS
+            icmp_type_code = entry.get('IcmpTypeCode') or {}
+            if entry['Protocol'] in ICMP_PROTOCOLS:
+                icmp = (icmp_type_code.get('Type', -1), icmp_type_code.get('Code', -1))
+            else:
+                icmp = (-1, -1)
+            self.rules[entry['Egress']].append((
+                entry['RuleNumber'], entry['RuleAction'] == 'allow', entry['Protocol'],
+                version, first, last, ports[0], ports[1], icmp[0], icmp[1], entry
+            ))
+
+    def evaluate(self, egress: bool, protocol: str, port: int, version: int, address: int,
+                 icmp_code: int = 0) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Decide one flow.
+
+        Args:
+        egress (bool): True for outbound traffic, False for inbound.
+        protocol (str): The protocol number as a string (see protocol_number()).
+        port (int): The destination port of the packet, or the ICMP type for ICMP and ICMPv6.
+        version (int): The IP version of the peer address.
+        address (int): The peer address (destination for egress, source for ingress) as an integer.
+        icmp_code (int): The ICMP code; ignored for other protocols.
+
+        Returns:
+        Tuple[str, Optional[Dict[str, Any]]]: 'allow' or 'deny', and the deciding entry (None if
+        no entry matched, which is an implicit deny).
+        """
+        icmp_type = -1
+        if protocol in ICMP_PROTOCOLS:
+            icmp_type, port = port, 0
+        elif protocol not in PORT_PROTOCOLS:
+            port = 0
+        for (_, allow, rule_protocol, rule_version, first, last, from_port, to_port,
+             rule_type, rule_code, entry) in self.rules[egress]:
+            if (rule_version == version and first <= address <= last and from_port <= port <= to_port
+                    and (rule_protocol == '-1' or rule_protocol == protocol)
+                    and rule_type in (-1, icmp_type) and rule_code in (-1, icmp_code)):
+                return ('allow' if allow else 'deny'), entry
+        return 'deny', None
+
+    def evaluate_many(self, flows: Iterable[Tuple]) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Decide many flows against this ACL.
+
+        Args:
+        flows (Iterable[Tuple]): (egress, protocol, port, IP version, peer address, ICMP code)
+        per flow, as for evaluate(); the ICMP code may be left out.
+
+        Returns:
+        List[Tuple[str, Optional[Dict[str, Any]]]]: The decision and deciding entry per flow.
+        """
+        evaluate = self.evaluate
+        return [evaluate(*flow) for flow in flows]
+
+
+class NetworkAclCompiler:
+    """
+    Thread-safe LRU of compiled Network ACLs, keyed by ACL ID and recompiled only when the
+    ACL's entries change.
+    """
+
+    def __init__(self, max_acls: int = MAX_COMPILED_ACLS):
+        self._lock = threading.Lock()
+        self._acls: "OrderedDict[str, Tuple[str, CompiledNetworkAcl]]" = OrderedDict()
+        self.max_acls = max_acls
+        self.compiles = 0
+        self.reuses = 0
+
+    def get(self, nacl: Dict[str, Any]) -> CompiledNetworkAcl:
+        """
+        Return the compiled form of a Network ACL from describe_network_acls.
+
+        Args:
+        nacl (Dict[str, Any]): The Network ACL, with its Entries.
+
+        Returns:
+        CompiledNetworkAcl: The compiled ACL.
+        """
+        network_acl_id = nacl['NetworkAclId']
+        fingerprint = hashlib.sha1(json.dumps(nacl['Entries'], sort_keys=True).encode()).hexdigest()
+        with self._lock:
+            entry = self._acls.get(network_acl_id)
+            if entry is not None and entry[0] == fingerprint:
+                self._acls.move_to_end(network_acl_id)
+                self.reuses += 1
+                return entry[1]
+
+        compiled = CompiledNetworkAcl(nacl)
+        with self._lock:
+            self._acls[network_acl_id] = (fingerprint, compiled)
+            self._acls.move_to_end(network_acl_id)
+            self.compiles += 1
+            while len(self._acls) > self.max_acls:
+                self._acls.popitem(last=False)
+        return compiled
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"acls": len(self._acls), "compiles": self.compiles, "reuses": self.reuses}
+
+
+nacl_compiler = NetworkAclCompiler()
+
+
+def subnet_network_acl(nacls: List[Dict[str, Any]], subnet_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the Network ACL associated with a subnet, falling back to the VPC's default ACL.
+    """
+    for nacl in nacls:
+        if subnet_id in nacl['SubnetIds']:
+            return nacl
+    return next((nacl for nacl in nacls if nacl['IsDefault']), None)
@@ -1,10 +1,58 @@
-import boto3
+from typing import Any, Dict, List
 
+from .aws_clients import get_client, paginate
+from .result_cache import cached
+from .registry import registry, tool
+from .async_tools import make_async
+from .nacl import nacl_compiler, protocol_number, subnet_network_acl
+from .route_resolver import parse_address
 
-def list_subnets(vpc_id, region="us-west-2"):
-    ec2 = boto3.client('ec2', region_name=region)
-    response = ec2.describe_subnets(Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}])
-    subnets = [{'SubnetId': subnet['SubnetId'], 'CidrBlock': subnet['CidrBlock'], 'AvailabilityZone': subnet['AvailabilityZone']} for subnet in response['Subnets']]
+
+def _format_subnet(subnet):
+    # IPv6-only subnets have no CidrBlock
+    return {
+        'SubnetId': subnet['SubnetId'],
+        'CidrBlock': subnet.get('CidrBlock'),
+        'Ipv6CidrBlocks': [
+            assoc['Ipv6CidrBlock'] for assoc in subnet.get('Ipv6CidrBlockAssociationSet', [])
+            if assoc.get('Ipv6CidrBlockState', {}).get('State') == 'associated'
+        ],
+        'AvailabilityZone': subnet['AvailabilityZone']
+    }
+
+
+def _format_network_acl_entry(entry):
+    entry_data = {
+        'RuleNumber': entry['RuleNumber'],
+        'Egress': entry['Egress'],
+        'Protocol': entry['Protocol'],
+        'RuleAction': entry['RuleAction'],
+        'CidrBlock': entry.get('CidrBlock') or entry.get('Ipv6CidrBlock'),
+        'PortRange': entry.get('PortRange'),
+        'IcmpTypeCode': entry.get('IcmpTypeCode')
+    }
+    return {k: v for k, v in entry_data.items() if v is not None}
+
+
+def _format_network_acl(nacl):
+    return {
+        'NetworkAclId': nacl['NetworkAclId'],
+        'IsDefault': nacl['IsDefault'],
+        'SubnetIds': [assoc['SubnetId'] for assoc in nacl.get('Associations', [])],
+        'Entries': [_format_network_acl_entry(entry) for entry in sorted(nacl.get('Entries', []), key=lambda entry: entry['RuleNumber'])]
+    }
+
+
+def iter_subnets(vpc_id, region="us-west-2"):
+    ec2 = get_client('ec2', region=region)
+    for page in paginate(ec2, 'describe_subnets', 'Subnets', Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}]):
+        yield [_format_subnet(subnet) for subnet in page]
+
+
+@tool("List subnets in a specified VPC", group="network")
+@cached("list_subnets")
+def list_subnets(vpc_id: str, region: str = "us-west-2"):
+    subnets = [subnet for page in iter_subnets(vpc_id, region) for subnet in page]
     return {
         'vpc_id': vpc_id,
         'subnets': subnets,
@@ -12,10 +60,16 @@ def list_subnets(vpc_id, region="us-west-2"):
     }
 
 
-def describe_network_acls(vpc_id, region="us-west-2"):
-    ec2 = boto3.client('ec2', region_name=region)
-    response = ec2.describe_network_acls(Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}])
-    nacls = [{'NetworkAclId': nacl['NetworkAclId'], 'IsDefault': nacl['IsDefault']} for nacl in response['NetworkAcls']]
+def iter_network_acls(vpc_id, region="us-west-2"):
+    ec2 = get_client('ec2', region=region)
+    for page in paginate(ec2, 'describe_network_acls', 'NetworkAcls', Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}]):
+        yield [_format_network_acl(nacl) for nacl in page]
+
+
+@tool("Describe Network ACLs for a specified VPC", group="network")
+@cached("describe_network_acls")
+def describe_network_acls(vpc_id: str, region: str = "us-west-2"):
+    nacls = [nacl for page in iter_network_acls(vpc_id, region) for nacl in page]
     return {
         'vpc_id': vpc_id,
         'network_acls': nacls,
@@ -23,62 +77,53 @@ def describe_network_acls(vpc_id, region="us-west-2"):
     }
 
 
-network_tools = [
-    {
-        "toolSpec": {
-            "name": "list_subnets",
-            "description": "List subnets in a specified VPC",
-            "inputSchema": {
-                "json": {
-                    "type": "object",
-                    "properties": {
-                        "vpc_id": {"type": "string", "description": "VPC ID"},
-                        "region": {"type": "string", "description": "AWS region (e.g., us-west-2)"}
-                    },
-                    "required": ["vpc_id"]
-                }
-            }
-        }
-    },
-    {
-        "toolSpec": {
-            "name": "describe_network_acls",
-            "description": "Describe Network ACLs for a specified VPC",
-            "inputSchema": {
-                "json": {
-                    "type": "object",
-                    "properties": {
-                        "vpc_id": {"type": "string", "description": "VPC ID"},
-                        "region": {"type": "string", "description": "AWS region (e.g., us-west-2)"}
-                    },
-                    "required": ["vpc_id"]
-                }
-            }
-        }
+@tool(
+    "Check many flows against the Network ACLs of a VPC in one call. Each flow names a subnet, a direction and the packet, and gets back allow or deny with the deciding rule number.",
+    group="network",
+    params={
+        "flows": "Flows to check, each an object with subnet_id, direction ('ingress' or 'egress'), protocol (tcp, udp, icmp, icmpv6, all or a number), port (the ICMP type for icmp and icmpv6, with an optional icmp_code) and peer_ip (the source address for ingress, the destination for egress)."
     }
-]
-
+)
+def evaluate_network_acl_flows(vpc_id: str, flows: List[Dict[str, Any]], region: str = "us-west-2"):
+    nacls = describe_network_acls(vpc_id, region)['network_acls']
+    rows = [None] * len(flows)
+    # Parse every flow first, then decide them in one pass per ACL
+    by_acl = {}
+    for position, flow in enumerate(flows):
+        try:
+            nacl = subnet_network_acl(nacls, flow['subnet_id'])
+            if nacl is None:
+                raise ValueError(f"No Network ACL applies to {flow['subnet_id']}")
+            direction = flow['direction'].lower()
+            if direction not in ('ingress', 'egress'):
+                raise ValueError(f"direction must be 'ingress' or 'egress', not {flow['direction']!r}")
+            version, address = parse_address(flow['peer_ip'])
+            parsed = (direction == 'egress', protocol_number(flow.get('protocol', 'tcp')),
+                      int(flow.get('port', 0)), version, address, int(flow.get('icmp_code', 0)))
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            rows[position] = [flow.get('subnet_id') if isinstance(flow, dict) else None, None, None, None, None,
+                              f"Invalid flow: {str(e)}"]
+            continue
+        by_acl.setdefault(nacl['NetworkAclId'], (nacl, []))[1].append((position, parsed))
 
-def handle_network_tool(tool_use):
-    tool_name = tool_use['name']
-    input_data = tool_use['input']
-    
-    if tool_name == "list_subnets":
-        result = list_subnets(input_data['vpc_id'], region=input_data.get('region', 'us-west-2'))
-    elif tool_name == "describe_network_acls":
-        result = describe_network_acls(input_data['vpc_id'], region=input_data.get('region', 'us-west-2'))
-    else:
-        result = {"error": f"Unknown network tool: {tool_name}"}
+    for network_acl_id, (nacl, acl_flows) in by_acl.items():
+        decisions = nacl_compiler.get(nacl).evaluate_many(parsed for _, parsed in acl_flows)
+        for (position, _), (decision, entry) in zip(acl_flows, decisions):
+            flow = flows[position]
+            rows[position] = [flow['subnet_id'], flow['direction'].lower(), network_acl_id, decision,
+                              entry['RuleNumber'] if entry else None, None]
 
     return {
-        "role": "user",
-        "content": [
-            {
-                "toolResult": {
-                    "toolUseId": tool_use['toolUseId'],
-                    "content": [{"json": result}],
-                    "status": "success"
-                }
-            }
-        ]
-    }
\ No newline at end of file
+        'vpc_id': vpc_id,
+        'columns': ['subnet_id', 'direction', 'network_acl_id', 'decision', 'rule_number', 'error'],
+        'rows': rows
+    }
+
+
+# asyncio variants for servers that run many sessions on one event loop
+alist_subnets = make_async(list_subnets)
+adescribe_network_acls = make_async(describe_network_acls)
+aevaluate_network_acl_flows = make_async(evaluate_network_acl_flows)
+
+
+network_tools = registry.specs(group="network")
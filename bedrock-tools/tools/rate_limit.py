@@ -0,0 +1,222 @@
+# tools/rate_limit.py
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+# Sustained requests per second and burst size per service; operations share their service's settings.
+# None means no client-side limit. Bedrock quotas depend on the model and the account, so
+# bedrock-runtime is left to adaptive retry unless configure_rate_limits() sets a bucket for it.
+SERVICE_RATE_LIMITS: Dict[str, Optional[Tuple[float, int]]] = {
+    "ec2": (20.0, 40),
+    "networkmanager": (5.0, 10),
+    "bedrock-runtime": None,
+}
+DEFAULT_RATE_LIMIT = (10.0, 20)
+
+# botocore retry settings applied to every pooled client
+RETRY_CONFIG = {"mode": "adaptive", "max_attempts": 8}
+
+THROTTLING_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "RequestThrottled",
+    "SlowDown",
+}
+
+BASE_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 20.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, waiting if the bucket is empty.
+
+        Returns:
+        float: Seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter with one token bucket per (service, region, operation).
+
+    It hooks into botocore's before-send event, which fires for every HTTP attempt, so botocore's own
+    retries of throttled or failed calls wait for a token too and cannot exceed the configured rate.
+    It also counts requests sent (retry attempts included), botocore retries, throttling errors and
+    the time spent waiting on buckets or backing off.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, str, str], Optional[TokenBucket]] = {}
+        self.counters = {"calls": 0, "retries": 0, "throttle_errors": 0, "throttled_seconds": 0.0}
+
+    def _bucket(self, service: str, region: str, operation: str) -> Optional[TokenBucket]:
+        key = (service, region, operation)
+        with self._lock:
+            if key not in self._buckets:
+                limit = SERVICE_RATE_LIMITS.get(service, DEFAULT_RATE_LIMIT)
+                self._buckets[key] = TokenBucket(*limit) if limit else None
+            return self._buckets[key]
+
+    def configure(self, service: str, limit: Optional[Tuple[float, int]]) -> None:
+        """
+        Set the rate limit of a service. Its existing buckets are dropped, so the new limit
+        applies from the next call.
+
+        Args:
+        service (str): The AWS service name (e.g., "bedrock-runtime").
+        limit (Optional[Tuple[float, int]]): Requests per second and burst size, or None for no
+        client-side limit.
+        """
+        with self._lock:
+            SERVICE_RATE_LIMITS[service] = limit
+            for key in [key for key in self._buckets if key[0] == service]:
+                del self._buckets[key]
+
+    def acquire(self, service: str, region: str, operation: str) -> None:
+        """
+        Wait for the token bucket of an operation.
+
+        Args:
+        service (str): The AWS service name.
+        region (str): The AWS region.
+        operation (str): The API operation name (e.g., "DescribeVpcs").
+        """
+        bucket = self._bucket(service, region, operation)
+        waited = bucket.acquire() if bucket is not None else 0.0
+        with self._lock:
+            self.counters["calls"] += 1
+            self.counters["throttled_seconds"] += waited
+
+    def record_retries(self, retries: int, throttled: bool = False, backoff_seconds: float = 0.0) -> None:
+        """
+        Add retry and throttling counts observed outside the bucket.
+
+        Args:
+        retries (int): Number of retries made.
+        throttled (bool): Whether the call ended in a throttling error.
+        backoff_seconds (float): Seconds spent sleeping between retries.
+        """
+        with self._lock:
+            self.counters["retries"] += retries
+            self.counters["throttle_errors"] += int(throttled)
+            self.counters["throttled_seconds"] += backoff_seconds
+
+    def install(self, client: Any, service: str, region: str) -> None:
+        """
+        Rate-limit every HTTP attempt made by a boto3 client and count its retries.
+
+        Args:
+        client (Any): The boto3 client.
+        service (str): The AWS service name.
+        region (str): The client's region.
+        """
+        region = region or client.meta.region_name
+
+        def before_send(event_name, **kwargs):
+            # before-send.<service>.<Operation> is emitted once per attempt, retries included
+            self.acquire(service, region, event_name.rsplit(".", 1)[-1])
+
+        def after_call(parsed, **kwargs):
+            metadata = parsed.get("ResponseMetadata", {})
+            error_code = parsed.get("Error", {}).get("Code")
+            self.record_retries(metadata.get("RetryAttempts", 0), throttled=error_code in THROTTLING_ERROR_CODES)
+
+        client.meta.events.register("before-send", before_send)
+        client.meta.events.register("after-call", after_call)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the request, retry and throttling counters.
+
+        Returns:
+        Dict[str, Any]: The counters, with throttled_seconds rounded to milliseconds.
+        """
+        with self._lock:
+            stats = dict(self.counters)
+        stats["throttled_seconds"] = round(stats["throttled_seconds"], 3)
+        return stats
+
+
+rate_limiter = RateLimiter()
+
+
+def configure_rate_limits(limits: Dict[str, Optional[Tuple[float, int]]]) -> None:
+    """
+    Change the client-side rate limits of the shared rate limiter.
+
+    Args:
+    limits (Dict[str, Optional[Tuple[float, int]]]): Per service, (requests per second, burst
+    size), or None to rely on adaptive retry alone.
+    """
+    for service, limit in limits.items():
+        rate_limiter.configure(service, limit)
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Full-jitter exponential backoff delay for a retry attempt.
+
+    Args:
+    attempt (int): The retry attempt, starting at 0.
+
+    Returns:
+    float: Seconds to sleep before retrying.
+    """
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * (2 ** attempt)))
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """
+    Check whether an exception is an AWS throttling error.
+
+    Args:
+    error (Exception): The exception raised by a boto3 call.
+
+    Returns:
+    bool: True if the error code is a known throttling code.
+    """
+    response = getattr(error, "response", None) or {}
+    return response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    """
+    Return the shared rate limiter's counters.
+
+    Returns:
+    Dict[str, Any]: Calls, retries, throttling errors and seconds spent throttled.
+    """
+    return rate_limiter.stats()
@@ -0,0 +1,279 @@
+# tools/reachability.py
+from typing import Any, Dict, Optional, Tuple
+
+from .aws_clients import get_client, paginate
+from .cidr import cidr_bounds, parse_cidr
+from .result_cache import cached
+from .registry import registry, tool
+from .nacl import ICMP_PROTOCOLS, PORT_PROTOCOLS, nacl_compiler, protocol_number, subnet_network_acl
+from .network_tools import describe_network_acls
+from .route_resolver import parse_address, resolve
+from .vpc_tools import get_prefix_list_cidrs, get_route_tables
+
+# Source port assumed for the return path through the (stateless) Network ACLs
+DEFAULT_EPHEMERAL_PORT = 49152
+
+# ICMP queries whose reply must also pass the Network ACLs, as (protocol, request type): reply type
+ICMP_REPLY_TYPES = {('1', 8): 0, ('1', 13): 14, ('58', 128): 129}
+
+# Route targets that deliver traffic to another VPC, where the destination side is evaluated too
+INTER_VPC_TARGETS = {'local', 'vpc-peering-connection', 'transit-gateway', 'core-network'}
+
+
+def _cidr_contains(cidr: str, version: int, address: int) -> bool:
+    try:
+        cidr_version, start, prefixlen = parse_cidr(cidr)
+    except ValueError:
+        return False
+    if cidr_version != version:
+        return False
+    first, last = cidr_bounds(cidr_version, start, prefixlen)
+    return first <= address <= last
+
+
+def _port_in_range(port: int, from_port: Optional[int], to_port: Optional[int]) -> bool:
+    # Security groups use -1 (and NACLs omit the range) for "all ports"
+    if from_port is None or from_port == -1:
+        return True
+    return from_port <= port <= to_port
+
+
+def _icmp_matches(icmp_type: int, icmp_code: int, rule_type: Optional[int], rule_code: Optional[int]) -> bool:
+    # For ICMP, a security group rule's FromPort is the type and ToPort the code, with -1 for any
+    return rule_type in (None, -1, icmp_type) and rule_code in (None, -1, icmp_code)
+
+
+def _format_interface(eni):
+    return {
+        'NetworkInterfaceId': eni['NetworkInterfaceId'],
+        'SubnetId': eni['SubnetId'],
+        'VpcId': eni['VpcId'],
+        'InstanceId': eni.get('Attachment', {}).get('InstanceId'),
+        'DeviceIndex': eni.get('Attachment', {}).get('DeviceIndex'),
+        'PrivateIpAddress': eni.get('PrivateIpAddress'),
+        'Ipv6Addresses': [address['Ipv6Address'] for address in eni.get('Ipv6Addresses', [])],
+        'GroupIds': [group['GroupId'] for group in eni.get('Groups', [])]
+    }
+
+
+@cached("network_interfaces")
+def find_network_interfaces(endpoint, region="us-west-2"):
+    """
+    Find the network interfaces of an instance ID, network interface ID or private IP address.
+    """
+    if endpoint.startswith('i-'):
+        filters = [{'Name': 'attachment.instance-id', 'Values': [endpoint]}]
+    elif endpoint.startswith('eni-'):
+        filters = [{'Name': 'network-interface-id', 'Values': [endpoint]}]
+    elif ':' in endpoint:
+        filters = [{'Name': 'ipv6-addresses.ipv6-address', 'Values': [endpoint]}]
+    else:
+        filters = [{'Name': 'addresses.private-ip-address', 'Values': [endpoint]}]
+    ec2 = get_client('ec2', region=region)
+    pages = paginate(ec2, 'describe_network_interfaces', 'NetworkInterfaces', Filters=filters)
+    return [_format_interface(eni) for page in pages for eni in page]
+
+
+def _format_sg_rule(permission):
+    return {
+        'IpProtocol': permission['IpProtocol'],
+        'FromPort': permission.get('FromPort'),
+        'ToPort': permission.get('ToPort'),
+        'CidrBlocks': [r['CidrIp'] for r in permission.get('IpRanges', [])]
+                      + [r['CidrIpv6'] for r in permission.get('Ipv6Ranges', [])],
+        'PrefixListIds': [r['PrefixListId'] for r in permission.get('PrefixListIds', [])],
+        'GroupIds': [pair['GroupId'] for pair in permission.get('UserIdGroupPairs', []) if pair.get('GroupId')]
+    }
+
+
+@cached("security_groups")
+def describe_security_groups(group_ids, region="us-west-2"):
+    """
+    Describe security groups, keeping their ingress and egress rules.
+    """
+    ec2 = get_client('ec2', region=region)
+    pages = paginate(ec2, 'describe_security_groups', 'SecurityGroups', GroupIds=list(group_ids))
+    return [
+        {
+            'GroupId': group['GroupId'],
+            'GroupName': group.get('GroupName'),
+            'Ingress': [_format_sg_rule(permission) for permission in group.get('IpPermissions', [])],
+            'Egress': [_format_sg_rule(permission) for permission in group.get('IpPermissionsEgress', [])]
+        }
+        for page in pages for group in page
+    ]
+
+
+def _hop(name, resource, decision, rule=None, reason=None):
+    hop = {'hop': name, 'resource': resource, 'decision': decision}
+    if rule is not None:
+        hop['rule'] = rule
+    if reason is not None:
+        hop['reason'] = reason
+    return hop
+
+
+def _sg_rule_matches(rule, protocol, port, icmp_code, version, address, peer_group_ids, region):
+    if rule['IpProtocol'] != '-1':
+        if protocol_number(rule['IpProtocol']) != protocol:
+            return None
+        if protocol in ICMP_PROTOCOLS and not _icmp_matches(port, icmp_code, rule['FromPort'], rule['ToPort']):
+            return None
+        if protocol in PORT_PROTOCOLS and not _port_in_range(port, rule['FromPort'], rule['ToPort']):
+            return None
+    for cidr in rule['CidrBlocks']:
+        if _cidr_contains(cidr, version, address):
+            return {'cidr': cidr}
+    for group_id in rule['GroupIds']:
+        if group_id in peer_group_ids:
+            return {'referenced_group_id': group_id}
+    for prefix_list_id in rule['PrefixListIds']:
+        if any(_cidr_contains(cidr, version, address) for cidr in get_prefix_list_cidrs(prefix_list_id, region)):
+            return {'prefix_list_id': prefix_list_id}
+    return None
+
+
+def evaluate_security_groups(groups, direction, protocol, port, icmp_code, peer_ip, peer_group_ids, region):
+    """
+    Check whether any rule of any security group allows the flow. Security groups are stateful
+    and allow-only, so the first allowing rule decides and no match means an implicit deny.
+
+    Args:
+    groups (List[Dict[str, Any]]): Security groups from describe_security_groups().
+    direction (str): 'Ingress' or 'Egress'.
+    protocol (str): The protocol number.
+    port (int): The destination port, or the ICMP type for ICMP and ICMPv6.
+    icmp_code (int): The ICMP code; ignored for other protocols.
+    peer_ip (str): The address on the other side of the flow.
+    peer_group_ids (List[str]): Security groups of the peer, for SG-to-SG references.
+    region (str): The region of the groups.
+
+    Returns:
+    Tuple[str, Optional[Dict[str, Any]]]: 'allow' or 'deny', and the deciding rule.
+    """
+    version, address = parse_address(peer_ip)
+    for group in groups:
+        for rule in group[direction]:
+            matched = _sg_rule_matches(rule, protocol, port, icmp_code, version, address, peer_group_ids, region)
+            if matched is not None:
+                return 'allow', dict(matched, group_id=group['GroupId'], protocol=rule['IpProtocol'],
+                                     from_port=rule['FromPort'], to_port=rule['ToPort'])
+    return 'deny', None
+
+
+def _network_acl_hop(name, nacl, egress, protocol, port, peer_ip, icmp_code=0):
+    version, address = parse_address(peer_ip)
+    decision, entry = nacl_compiler.get(nacl).evaluate(egress, protocol, port, version, address, icmp_code)
+    return _hop(name, nacl['NetworkAclId'], decision, entry, None if entry else 'No entry matched (implicit deny)')
+
+
+def _resolve_endpoint(endpoint, region) -> Tuple[Optional[Dict[str, Any]], str]:
+    # Returns (network interface or None for an address outside the account, IP address)
+    # An instance's primary interface (device index 0) carries its primary address
+    interfaces = sorted(find_network_interfaces(endpoint, region), key=lambda eni: eni['DeviceIndex'] or 0)
+    if not interfaces:
+        try:
+            parse_address(endpoint)
+        except ValueError:
+            raise ValueError(f"No network interface found for {endpoint}")
+        return None, endpoint
+    interface = interfaces[0]
+    try:
+        parse_address(endpoint)
+        address = endpoint
+    except ValueError:
+        address = interface['PrivateIpAddress']
+    return interface, address
+
+
+@tool(
+    "Evaluate whether traffic from a source to a destination is allowed, in one call. Checks the source security groups (egress), source subnet Network ACL, the route from the source subnet, the destination subnet Network ACL and destination security groups (ingress), including the stateless return path through the Network ACLs, and reports the deciding rule at each hop. Prefer this over combining the route table, ACL and security group tools yourself.",
+    group="reachability",
+    params={
+        "source": "Source instance ID, network interface ID or private IP address",
+        "destination": "Destination instance ID, network interface ID, private IP address or external IP address",
+        "port": "Destination port, or the ICMP type for icmp and icmpv6 (e.g., 8 for echo request)",
+        "icmp_code": "ICMP code for icmp and icmpv6 flows. Defaults to 0.",
+        "protocol": "tcp, udp, icmp, icmpv6, all or an IP protocol number. Defaults to tcp.",
+        "source_port": "Source port of the flow, used for the return path through the Network ACLs. Defaults to 49152."
+    }
+)
+def evaluate_reachability(source: str, destination: str, port: int, protocol: str = "tcp",
+                          source_port: int = DEFAULT_EPHEMERAL_PORT, icmp_code: int = 0, region: str = "us-west-2"):
+    ip_protocol = protocol_number(protocol)
+    source_eni, source_ip = _resolve_endpoint(source, region)
+    if source_eni is None:
+        raise ValueError(f"Source {source} must be a network interface in {region}")
+    destination_eni, destination_ip = _resolve_endpoint(destination, region)
+
+    group_ids = set(source_eni['GroupIds']) | set(destination_eni['GroupIds'] if destination_eni else [])
+    groups = {group['GroupId']: group for group in describe_security_groups(sorted(group_ids), region)} if group_ids else {}
+    source_groups = [groups[group_id] for group_id in source_eni['GroupIds'] if group_id in groups]
+    destination_groups = [groups[group_id] for group_id in destination_eni['GroupIds'] if group_id in groups] if destination_eni else []
+
+    hops = []
+
+    decision, rule = evaluate_security_groups(source_groups, 'Egress', ip_protocol, port, icmp_code, destination_ip,
+                                              destination_eni['GroupIds'] if destination_eni else [], region)
+    hops.append(_hop('source_security_group_egress', source_eni['GroupIds'], decision, rule,
+                     None if rule else 'No egress rule in the source security groups allows this flow'))
+
+    same_subnet = destination_eni is not None and destination_eni['SubnetId'] == source_eni['SubnetId']
+    source_nacl = None if same_subnet else subnet_network_acl(
+        describe_network_acls(source_eni['VpcId'], region)['network_acls'], source_eni['SubnetId'])
+    if source_nacl is not None:
+        hops.append(_network_acl_hop('source_network_acl_egress', source_nacl, True, ip_protocol, port, destination_ip, icmp_code))
+
+    route = resolve(get_route_tables(source_eni['VpcId'], region)['routeTables'], source_eni['SubnetId'], destination_ip,
+                    lambda prefix_list_id: get_prefix_list_cidrs(prefix_list_id, region))
+    route_allowed = route['outcome'] == 'routed'
+    hops.append(_hop('route', route.get('route_table_id'), 'allow' if route_allowed else 'deny', route.get('route'),
+                     None if route_allowed else f"Route outcome: {route['outcome']}"))
+
+    target_type = (route.get('route') or {}).get('target_type')
+    evaluate_destination = destination_eni is not None and (
+        destination_eni['VpcId'] == source_eni['VpcId'] or target_type in INTER_VPC_TARGETS)
+
+    destination_nacl = None
+    if evaluate_destination and not same_subnet:
+        destination_nacl = subnet_network_acl(
+            describe_network_acls(destination_eni['VpcId'], region)['network_acls'], destination_eni['SubnetId'])
+    if destination_nacl is not None:
+        hops.append(_network_acl_hop('destination_network_acl_ingress', destination_nacl, False, ip_protocol, port, source_ip, icmp_code))
+
+    if evaluate_destination:
+        decision, rule = evaluate_security_groups(destination_groups, 'Ingress', ip_protocol, port, icmp_code, source_ip,
+                                                  source_eni['GroupIds'], region)
+        hops.append(_hop('destination_security_group_ingress', destination_eni['GroupIds'], decision, rule,
+                         None if rule else 'No ingress rule in the destination security groups allows this flow'))
+
+    # Replies go back to the source port (for ICMP, as the matching reply type), and must pass
+    # both NACLs again in the other direction
+    return_port = ICMP_REPLY_TYPES.get((ip_protocol, port)) if ip_protocol in ICMP_PROTOCOLS else source_port
+    if destination_nacl is not None and return_port is not None:
+        hops.append(_network_acl_hop('destination_network_acl_egress_return', destination_nacl, True, ip_protocol, return_port, source_ip))
+    if source_nacl is not None and return_port is not None:
+        hops.append(_network_acl_hop('source_network_acl_ingress_return', source_nacl, False, ip_protocol, return_port, destination_ip))
+
+    blocked = [hop['hop'] for hop in hops if hop['decision'] != 'allow']
+    flow = {
+        'source': source, 'source_ip': source_ip, 'destination': destination, 'destination_ip': destination_ip,
+        'protocol': protocol, 'port': port, 'source_port': source_port
+    }
+    if ip_protocol in ICMP_PROTOCOLS:
+        flow.update(icmp_type=flow.pop('port'), icmp_code=icmp_code)
+        del flow['source_port']
+    result = {
+        'flow': flow,
+        'reachable': not blocked,
+        'blocked_at': blocked,
+        'hops': hops
+    }
+    if destination_eni is None:
+        result['note'] = 'The destination is outside this region\'s network interfaces; only the source side and route were evaluated'
+    elif not evaluate_destination:
+        result['note'] = f"Traffic leaves through {target_type}; the destination side was not evaluated"
+    return result
+
+
+reachability_tools = registry.specs(group="reachability")
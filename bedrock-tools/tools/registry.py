@@ -0,0 +1,271 @@
+# tools/registry.py
+import inspect
+import json
+import logging
+import re
+import typing
+from typing import Any, Callable, Dict, List, Optional
+
+from .async_tools import run_blocking
+from .compact import encode_result
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+# Descriptions for parameters shared by many tools, used when a tool does not document them itself.
+# bypass_cache is added to every cached tool by @cached and is deliberately part of the schema,
+# so the model can ask for fresh data after a change.
+COMMON_PARAM_DESCRIPTIONS = {
+    "region": "AWS region (e.g., us-west-2)",
+    "vpc_id": "VPC ID",
+    "bypass_cache": "Set to true to skip cached results and fetch fresh data from AWS",
+}
+
+_JSON_TYPES = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    dict: "object",
+    list: "array",
+}
+
+_ARG_LINE = re.compile(r"^\s*(\w+)\s*\([^)]*\):\s*(.+)$")
+
+
+def _json_schema_for(annotation: Any) -> Dict[str, Any]:
+    if annotation is inspect.Parameter.empty:
+        return {"type": "string"}
+    origin = typing.get_origin(annotation)
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    if origin is typing.Union and len(args) == 1:
+        return _json_schema_for(args[0])
+    if origin in (list, List):
+        schema = {"type": "array"}
+        if args:
+            schema["items"] = _json_schema_for(args[0])
+        return schema
+    if origin in (dict, Dict):
+        return {"type": "object"}
+    return {"type": _JSON_TYPES.get(annotation, "string")}
+
+
+def _docstring_params(func: Callable) -> Dict[str, str]:
+    # Parse "name (type): description" lines from an Args: section
+    descriptions = {}
+    in_args = False
+    for line in (inspect.getdoc(func) or "").splitlines():
+        stripped = line.strip()
+        if stripped == "Args:":
+            in_args = True
+        elif in_args and stripped in ("Returns:", "Raises:", "Yields:"):
+            break
+        elif in_args:
+            match = _ARG_LINE.match(line)
+            if match:
+                descriptions[match.group(1)] = match.group(2).strip()
+    return descriptions
+
+
+def _matches_type(value: Any, schema: Dict[str, Any]) -> bool:
+    expected = schema.get("type")
+    if expected == "string":
+        return isinstance(value, str)
+    if expected == "integer":
+        return isinstance(value, int) and not isinstance(value, bool)
+    if expected == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if expected == "boolean":
+        return isinstance(value, bool)
+    if expected == "object":
+        return isinstance(value, dict)
+    if expected == "array":
+        return isinstance(value, list) and all(_matches_type(item, schema.get("items", {})) for item in value)
+    return True
+
+
+class ToolRegistry:
+    """
+    Registry of tool functions, their Bedrock toolSpecs and a dict-based dispatcher.
+
+    Each tool is registered once with the @tool decorator. Its input schema is derived from the
+    function signature (types from annotations, required parameters from the ones without
+    defaults, descriptions from the docstring's Args section), and every toolUse is validated
+    against that schema before the function runs.
+    """
+
+    def __init__(self):
+        self._tools: Dict[str, Dict[str, Any]] = {}
+
+    def register(self, func: Callable, description: str, name: Optional[str] = None, group: str = "general",
+                 params: Optional[Dict[str, str]] = None) -> Callable:
+        """
+        Register a function as a tool.
+
+        Args:
+        func (Callable): The tool implementation.
+        description (str): The tool description shown to the model.
+        name (str, optional): The tool name. Defaults to the function name.
+        group (str): The tool group, used to list related tools together. Defaults to "general".
+        params (Dict[str, str], optional): Parameter descriptions that override the docstring.
+
+        Returns:
+        Callable: The function, unchanged.
+        """
+        name = name or func.__name__
+        descriptions = dict(COMMON_PARAM_DESCRIPTIONS)
+        descriptions.update(_docstring_params(func))
+        descriptions.update(params or {})
+
+        properties = {}
+        required = []
+        for param in inspect.signature(func).parameters.values():
+            if param.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+                continue
+            schema = _json_schema_for(param.annotation)
+            if param.name in descriptions:
+                schema["description"] = descriptions[param.name]
+            properties[param.name] = schema
+            if param.default is inspect.Parameter.empty:
+                required.append(param.name)
+
+        input_schema = {"type": "object", "properties": properties}
+        if required:
+            input_schema["required"] = required
+
+        self._tools[name] = {
+            "func": func,
+            "group": group,
+            "schema": input_schema,
+            "spec": {
+                "toolSpec": {
+                    "name": name,
+                    "description": description,
+                    "inputSchema": {"json": input_schema}
+                }
+            }
+        }
+        return func
+
+    def tool(self, description: str, name: Optional[str] = None, group: str = "general",
+             params: Optional[Dict[str, str]] = None) -> Callable:
+        """
+        Decorator form of register().
+        """
+        def decorator(func: Callable) -> Callable:
+            return self.register(func, description, name=name, group=group, params=params)
+        return decorator
+
+    def specs(self, group: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return the Bedrock toolSpecs of the registered tools.
+
+        Args:
+        group (str, optional): Only return tools from this group.
+
+        Returns:
+        List[Dict[str, Any]]: The toolSpec entries, in registration order.
+        """
+        return [entry["spec"] for entry in self._tools.values() if group is None or entry["group"] == group]
+
+    def validate(self, name: str, input_data: Dict[str, Any]) -> List[str]:
+        """
+        Check tool input against the tool's schema.
+
+        Args:
+        name (str): The tool name.
+        input_data (Dict[str, Any]): The toolUse input.
+
+        Returns:
+        List[str]: The validation errors; empty if the input is valid.
+        """
+        if name not in self._tools:
+            return [f"Unknown tool: {name}"]
+        if not isinstance(input_data, dict):
+            return ["Tool input must be a JSON object"]
+        schema = self._tools[name]["schema"]
+        errors = [f"Missing required parameter: {param}" for param in schema.get("required", []) if param not in input_data]
+        for param, value in input_data.items():
+            if param not in schema["properties"]:
+                errors.append(f"Unknown parameter: {param}")
+            elif not _matches_type(value, schema["properties"][param]):
+                errors.append(f"Parameter {param} must be of type {schema['properties'][param]['type']}")
+        return errors
+
+    def call(self, name: str, input_data: Dict[str, Any]) -> Any:
+        """
+        Validate the input and run a tool.
+
+        Args:
+        name (str): The tool name.
+        input_data (Dict[str, Any]): The toolUse input.
+
+        Returns:
+        Any: The tool's result.
+
+        Raises:
+        ValueError: If the tool is unknown or the input does not match its schema.
+        """
+        errors = self.validate(name, input_data)
+        if errors:
+            raise ValueError("; ".join(errors))
+        return self._tools[name]["func"](**input_data)
+
+    def dispatch(self, tool_use: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run a toolUse request and wrap the outcome as a toolResult message.
+
+        Invalid input and tool failures produce an error toolResult instead of raising, so the
+        model can correct itself.
+
+        Args:
+        tool_use (Dict[str, Any]): The toolUse block from Claude.
+
+        Returns:
+        Dict[str, Any]: A user message holding the toolResult.
+        """
+        tool_name = tool_use['name']
+        with span("tool.dispatch", **{"tool.name": tool_name}) as tool_span:
+            try:
+                result = encode_result(tool_name, self.call(tool_name, tool_use.get('input', {})))
+                status = "success"
+            except Exception as e:
+                logger.error(f"Tool {tool_name} failed: {str(e)}")
+                result = {"error": str(e)}
+                status = "error"
+                tool_span.set_error(e)
+            if tool_span.recording:
+                tool_span.set_attribute("result_bytes", len(json.dumps(result, default=str)))
+
+        return {
+            "role": "user",
+            "content": [
+                {
+                    "toolResult": {
+                        "toolUseId": tool_use['toolUseId'],
+                        "content": [{"json": result}],
+                        "status": status
+                    }
+                }
+            ]
+        }
+
+    async def adispatch(self, tool_use: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        asyncio variant of dispatch(); the tool runs on the shared AWS I/O pool.
+
+        Args:
+        tool_use (Dict[str, Any]): The toolUse block from Claude.
+
+        Returns:
+        Dict[str, Any]: A user message holding the toolResult.
+        """
+        return await run_blocking(self.dispatch, tool_use)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+
+registry = ToolRegistry()
+tool = registry.tool
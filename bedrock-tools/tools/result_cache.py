@@ -0,0 +1,228 @@
+# tools/result_cache.py
+import copy
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Per-tool time-to-live in seconds; tools not listed use DEFAULT_TTL_SECONDS
+TOOL_TTLS = {
+    "list_vpcs": 300,
+    "list_subnets": 300,
+    "describe_network_acls": 120,
+    "get_route_tables": 60,
+    "check_internet_gateway": 120,
+    "check_nat_gateway": 60,
+    "describe_region_network": 60,
+    "prefix_list_cidrs": 300,
+    "subnet_vpc": 3600,
+    "network_interfaces": 60,
+    "security_groups": 60,
+}
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache with per-entry TTL for read-only describe results.
+
+    Entries are bounded both by count and by their approximate JSON size, and remember the region
+    and VPC they were fetched for so they can be invalidated when those resources change.
+    Values are copied on the way in and out, so callers may modify the results they get.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 clock: Callable[[], float] = time.monotonic):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        """
+        Look up a key, dropping it if it has expired.
+
+        Args:
+        key (Tuple): The cache key.
+
+        Returns:
+        Tuple[bool, Any]: (True, value) on a hit, (False, None) on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["expires_at"] <= self._clock():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry["value"]
+        # Copied outside the lock; the stored value itself is never modified
+        return True, copy.deepcopy(value)
+
+    def put(self, key: Tuple, value: Any, ttl: float, region: Optional[str] = None, vpc_id: Optional[str] = None) -> None:
+        """
+        Store a value, evicting the least recently used entries to stay within the bounds.
+
+        Args:
+        key (Tuple): The cache key.
+        value (Any): The result to cache.
+        ttl (float): Seconds until the entry expires.
+        region (str, optional): The region the result belongs to.
+        vpc_id (str, optional): The VPC the result belongs to.
+        """
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {
+                "value": value,
+                "expires_at": self._clock() + ttl,
+                "size": size,
+                "region": region,
+                "vpc_id": vpc_id,
+            }
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, region: Optional[str] = None, vpc_id: Optional[str] = None) -> int:
+        """
+        Drop cached entries for a region and/or VPC. With no arguments, drop everything.
+
+        Args:
+        region (str, optional): Only drop entries fetched for this region.
+        vpc_id (str, optional): Only drop entries fetched for this VPC. Region-wide listings
+                                for the entry's region are dropped too, since they include the VPC.
+
+        Returns:
+        int: The number of entries removed.
+        """
+        with self._lock:
+            stale = []
+            for key, entry in self._entries.items():
+                if region is not None and entry["region"] != region:
+                    continue
+                if vpc_id is not None and entry["vpc_id"] not in (vpc_id, None):
+                    continue
+                stale.append(key)
+            for key in stale:
+                self._remove(key)
+            return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return hit/miss/eviction counters and the current size of the cache.
+
+        Returns:
+        Dict[str, int]: A dictionary of cache metrics.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+            }
+
+    def _remove(self, key: Tuple) -> None:
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry["size"]
+
+
+_cache = ResultCache()
+
+
+def _freeze(value: Any) -> Any:
+    # Make list arguments (e.g. a list of VPC IDs) usable as part of a cache key
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def cached(tool_name: str) -> Callable:
+    """
+    Decorator that serves a tool function from the shared result cache.
+
+    The wrapped function accepts an extra ``bypass_cache`` keyword argument; when it is True the
+    tool always goes to AWS and the fresh result replaces any cached one.
+
+    Args:
+    tool_name (str): The tool name, used for the cache key and the TTL lookup in TOOL_TTLS.
+
+    Returns:
+    Callable: The decorator.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, bypass_cache: bool = False, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (tool_name,) + tuple(sorted((name, _freeze(value)) for name, value in bound.arguments.items()))
+            if not bypass_cache:
+                hit, value = _cache.get(key)
+                if hit:
+                    logger.debug(f"Cache hit for {tool_name}")
+                    return value
+            result = func(*args, **kwargs)
+            _cache.put(
+                key,
+                result,
+                TOOL_TTLS.get(tool_name, DEFAULT_TTL_SECONDS),
+                region=bound.arguments.get("region"),
+                vpc_id=bound.arguments.get("vpc_id"),
+            )
+            return result
+
+        bypass_param = inspect.Parameter("bypass_cache", inspect.Parameter.KEYWORD_ONLY, default=False, annotation=bool)
+        wrapper.__signature__ = signature.replace(parameters=list(signature.parameters.values()) + [bypass_param])
+        return wrapper
+    return decorator
+
+
+def invalidate_cache(region: Optional[str] = None, vpc_id: Optional[str] = None) -> int:
+    """
+    Drop cached tool results for a region and/or VPC. With no arguments, drop everything.
+
+    Args:
+    region (str, optional): The region to invalidate.
+    vpc_id (str, optional): The VPC to invalidate.
+
+    Returns:
+    int: The number of entries removed.
+    """
+    return _cache.invalidate(region=region, vpc_id=vpc_id)
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """
+    Return hit/miss metrics for the shared result cache.
+
+    Returns:
+    Dict[str, int]: A dictionary of cache metrics.
+    """
+    return _cache.stats()
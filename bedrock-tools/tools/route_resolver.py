@@ -0,0 +1,283 @@
+# tools/route_resolver.py
+import hashlib
+import json
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cidr import format_address, parse_cidr
+
+# Compiled route tables kept in memory; each is small, so this mostly bounds long-running servers
+MAX_COMPILED_TABLES = 256
+
+# Route fields that name the target, in the order they are checked
+ROUTE_TARGET_FIELDS = [
+    ('NatGatewayId', 'nat-gateway'),
+    ('TransitGatewayId', 'transit-gateway'),
+    ('VpcPeeringConnectionId', 'vpc-peering-connection'),
+    ('EgressOnlyInternetGatewayId', 'egress-only-internet-gateway'),
+    ('InstanceId', 'instance'),
+    ('NetworkInterfaceId', 'network-interface'),
+    ('CoreNetworkArn', 'core-network'),
+    ('GatewayId', None),
+]
+
+# GatewayId covers several kinds of target, told apart by their ID prefix
+GATEWAY_TYPES = {'igw-': 'internet-gateway', 'vgw-': 'virtual-private-gateway', 'vpce-': 'vpc-endpoint'}
+
+# Among routes with the same destination prefix: a CIDR route wins over a prefix-list route,
+# and a static route over a propagated one
+_ROUTE_PRIORITY = {('cidr', False): 0, ('prefix-list', False): 1, ('cidr', True): 2, ('prefix-list', True): 3}
+
+_MASKS = {
+    version: [all_ones ^ (all_ones >> prefixlen) for prefixlen in range(bits + 1)]
+    for version, bits, all_ones in ((4, 32, (1 << 32) - 1), (6, 128, (1 << 128) - 1))
+}
+
+
+def route_target(route: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Return the (target type, target id) of a formatted route.
+    """
+    for field, target_type in ROUTE_TARGET_FIELDS:
+        target_id = route.get(field)
+        if target_id:
+            if target_type is None:
+                target_type = 'local' if target_id == 'local' else next(
+                    (name for prefix, name in GATEWAY_TYPES.items() if target_id.startswith(prefix)), 'gateway')
+            return target_type, target_id
+    return None, None
+
+
+class CompiledRouteTable:
+    """
+    A route table compiled for longest-prefix-match lookups.
+
+    Routes are stored in one hash table per (IP version, prefix length), and a lookup masks the
+    address for each prefix length present, longest first. In pure Python this beats walking a
+    bitwise trie node by node: a VPC route table rarely uses more than a handful of distinct
+    prefix lengths, so a lookup is a few integer ANDs and dict probes.
+    """
+
+    def __init__(self, route_table: Dict[str, Any], prefix_lists: Dict[str, List[str]]):
+        self.route_table_id = route_table['RouteTableId']
+        self._tables: Dict[int, Dict[int, Dict[int, Tuple[int, Dict[str, Any]]]]] = {4: {}, 6: {}}
+        self.errors = []
+        for route in route_table['Routes']:
+            propagated = route.get('Origin') == 'EnableVgwRoutePropagation'
+            if route.get('DestinationPrefixListId'):
+                prefix_list_id = route['DestinationPrefixListId']
+                if prefix_list_id not in prefix_lists:
+                    self.errors.append(f"Entries for prefix list {prefix_list_id} are unavailable")
+                for cidr in prefix_lists.get(prefix_list_id, []):
+                    self._add(cidr, _ROUTE_PRIORITY['prefix-list', propagated], route)
+            else:
+                cidr = route.get('DestinationCidrBlock') or route.get('DestinationIpv6CidrBlock')
+                if cidr:
+                    self._add(cidr, _ROUTE_PRIORITY['cidr', propagated], route)
+        # Longest prefix lengths first, so the first hit is the most specific route
+        self._lengths = {version: sorted(tables, reverse=True) for version, tables in self._tables.items()}
+
+    def _add(self, cidr: str, priority: int, route: Dict[str, Any]) -> None:
+        try:
+            version, start, prefixlen = parse_cidr(cidr)
+        except ValueError as e:
+            self.errors.append(str(e))
+            return
+        table = self._tables[version].setdefault(prefixlen, {})
+        current = table.get(start)
+        if current is None or priority < current[0]:
+            table[start] = (priority, dict(route, MatchedCidr=cidr))
+
+    def lookup(self, version: int, address: int) -> Optional[Dict[str, Any]]:
+        """
+        Return the most specific route for an address, or None if no route matches.
+
+        Args:
+        version (int): The IP version of the address.
+        address (int): The address as an integer.
+
+        Returns:
+        Optional[Dict[str, Any]]: The matching route, with MatchedCidr set to the destination
+        CIDR that matched (for prefix-list routes, the prefix list entry).
+        """
+        masks = _MASKS[version]
+        tables = self._tables[version]
+        for prefixlen in self._lengths[version]:
+            entry = tables[prefixlen].get(address & masks[prefixlen])
+            if entry is not None:
+                return entry[1]
+        return None
+
+
+def route_table_fingerprint(route_table: Dict[str, Any], prefix_lists: Dict[str, List[str]]) -> str:
+    """
+    Hash the routes, associations and referenced prefix list entries of a formatted route table.
+    """
+    referenced = sorted({route['DestinationPrefixListId'] for route in route_table['Routes'] if route.get('DestinationPrefixListId')})
+    payload = json.dumps(
+        [route_table['Routes'], route_table.get('SubnetIds', []), [[pl, prefix_lists.get(pl)] for pl in referenced]],
+        sort_keys=True, default=str
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class RouteTableCompiler:
+    """
+    Thread-safe LRU of compiled route tables, keyed by route table ID.
+
+    A table is recompiled only when its fingerprint changes, i.e. when a route, an association
+    or a referenced prefix list changed since it was last compiled.
+    """
+
+    def __init__(self, max_tables: int = MAX_COMPILED_TABLES):
+        self._lock = threading.Lock()
+        self._tables: "OrderedDict[str, Tuple[str, CompiledRouteTable]]" = OrderedDict()
+        self.max_tables = max_tables
+        self.compiles = 0
+        self.reuses = 0
+
+    def get(self, route_table: Dict[str, Any], prefix_lists: Dict[str, List[str]]) -> CompiledRouteTable:
+        """
+        Return the compiled form of a formatted route table, compiling it if it changed.
+
+        Args:
+        route_table (Dict[str, Any]): A route table as returned by get_route_tables.
+        prefix_lists (Dict[str, List[str]]): CIDRs of each prefix list the table references.
+
+        Returns:
+        CompiledRouteTable: The compiled table.
+        """
+        route_table_id = route_table['RouteTableId']
+        fingerprint = route_table_fingerprint(route_table, prefix_lists)
+        with self._lock:
+            entry = self._tables.get(route_table_id)
+            if entry is not None and entry[0] == fingerprint:
+                self._tables.move_to_end(route_table_id)
+                self.reuses += 1
+                return entry[1]
+
+        compiled = CompiledRouteTable(route_table, prefix_lists)
+        with self._lock:
+            self._tables[route_table_id] = (fingerprint, compiled)
+            self._tables.move_to_end(route_table_id)
+            self.compiles += 1
+            while len(self._tables) > self.max_tables:
+                self._tables.popitem(last=False)
+        return compiled
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"tables": len(self._tables), "compiles": self.compiles, "reuses": self.reuses}
+
+
+route_compiler = RouteTableCompiler()
+
+
+def parse_address(address: str) -> Tuple[int, int]:
+    """
+    Parse an IPv4 or IPv6 address into (version, integer).
+
+    Raises:
+    ValueError: If the address is invalid.
+    """
+    address = address.strip()
+    version, family = (6, socket.AF_INET6) if ":" in address else (4, socket.AF_INET)
+    try:
+        return version, int.from_bytes(socket.inet_pton(family, address), "big")
+    except OSError:
+        raise ValueError(f"{address!r} does not appear to be an IPv4 or IPv6 address")
+
+
+def select_route_table(route_tables: List[Dict[str, Any]], subnet_id: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Pick the route table that applies to a subnet: its explicit association, or else the main
+    route table of the VPC.
+
+    Returns:
+    Tuple[Optional[Dict[str, Any]], str]: The route table (None if the VPC has none) and
+    'explicit' or 'main'.
+    """
+    main = None
+    for route_table in route_tables:
+        if subnet_id in route_table.get('SubnetIds', []):
+            return route_table, 'explicit'
+        if route_table.get('IsMain'):
+            main = route_table
+    return main, 'main'
+
+
+def describe_match(route: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Summarize a matched route for the tool result.
+    """
+    if route is None:
+        return None
+    target_type, target_id = route_target(route)
+    match = {
+        'destination': route.get('DestinationCidrBlock') or route.get('DestinationIpv6CidrBlock') or route.get('DestinationPrefixListId'),
+        'matched_cidr': route['MatchedCidr'],
+        'target_type': target_type,
+        'target_id': target_id,
+        'state': route.get('State', 'active'),
+        'origin': route.get('Origin')
+    }
+    if route.get('DestinationPrefixListId'):
+        match['prefix_list_id'] = route['DestinationPrefixListId']
+    return {k: v for k, v in match.items() if v is not None}
+
+
+def resolve(route_tables: List[Dict[str, Any]], subnet_id: str, destination_ip: str,
+            prefix_list_loader: Callable[[str], Optional[List[str]]]) -> Dict[str, Any]:
+    """
+    Resolve where a packet from a subnet to a destination IP is routed.
+
+    Args:
+    route_tables (List[Dict[str, Any]]): The VPC's route tables, as returned by get_route_tables.
+    subnet_id (str): The source subnet.
+    destination_ip (str): The destination IPv4 or IPv6 address.
+    prefix_list_loader (Callable[[str], Optional[List[str]]]): Returns the CIDRs of a prefix list,
+    or None if they cannot be read.
+
+    Returns:
+    Dict[str, Any]: The route table used, how it is associated and the matching route.
+    """
+    version, address = parse_address(destination_ip)
+    route_table, association = select_route_table(route_tables, subnet_id)
+    if route_table is None:
+        return {'subnet_id': subnet_id, 'destination_ip': destination_ip, 'error': 'No route table applies to this subnet'}
+
+    prefix_lists = {}
+    for route in route_table['Routes']:
+        prefix_list_id = route.get('DestinationPrefixListId')
+        if prefix_list_id and prefix_list_id not in prefix_lists:
+            cidrs = prefix_list_loader(prefix_list_id)
+            if cidrs is not None:
+                prefix_lists[prefix_list_id] = cidrs
+
+    compiled = route_compiler.get(route_table, prefix_lists)
+    start = time.perf_counter()
+    route = compiled.lookup(version, address)
+    lookup_seconds = time.perf_counter() - start
+    match = describe_match(route)
+
+    if match is None:
+        outcome = 'no-route'
+    elif match['state'] == 'blackhole':
+        outcome = 'blackhole'
+    else:
+        outcome = 'routed'
+    result = {
+        'subnet_id': subnet_id,
+        'destination_ip': format_address(version, address),
+        'route_table_id': route_table['RouteTableId'],
+        'association': association,
+        'outcome': outcome,
+        'route': match,
+        'lookup_microseconds': round(lookup_seconds * 1e6, 2)
+    }
+    if compiled.errors:
+        result['warnings'] = compiled.errors
+    return result
@@ -0,0 +1,183 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from .aws_clients import get_client, paginate
+from .cidr import iter_overlaps, parse_cidr
+from .result_cache import cached
+from .registry import registry, tool
+from .vpc_tools import _format_vpc, _format_internet_gateway, _format_nat_gateway, _format_route_table
+from .network_tools import _format_subnet, _format_network_acl
+
+
+# EC2 accepts at most 200 values per filter
+FILTER_VALUE_LIMIT = 200
+
+# Regions described at once by find_cidr_overlaps
+OVERLAP_REGION_WORKERS = 8
+
+# Conflicting pairs listed by find_cidr_overlaps by default; the per-VPC counts always cover all of them.
+# Default VPCs (172.31.0.0/16) conflict in every region, so the full list grows quadratically.
+DEFAULT_MAX_CONFLICTS = 100
+
+# Columns of the conflicts table returned by find_cidr_overlaps
+CONFLICT_COLUMNS = ['kind', 'region', 'vpc_id', 'resource', 'cidr', 'overlaps_region', 'overlaps_vpc', 'overlaps_resource', 'overlaps_cidr']
+
+# (operation, result key, filter parameter name, filter name)
+REGION_NETWORK_CALLS = {
+    'vpcs': ('describe_vpcs', 'Vpcs', 'Filters', 'vpc-id'),
+    'subnets': ('describe_subnets', 'Subnets', 'Filters', 'vpc-id'),
+    'route_tables': ('describe_route_tables', 'RouteTables', 'Filters', 'vpc-id'),
+    'internet_gateways': ('describe_internet_gateways', 'InternetGateways', 'Filters', 'attachment.vpc-id'),
+    'nat_gateways': ('describe_nat_gateways', 'NatGateways', 'Filter', 'vpc-id'),
+    'network_acls': ('describe_network_acls', 'NetworkAcls', 'Filters', 'vpc-id'),
+}
+
+
+def _fetch_all(region, call, vpc_ids):
+    operation, result_key, filter_param, filter_name = REGION_NETWORK_CALLS[call]
+    ec2 = get_client('ec2', region=region)
+    if not vpc_ids:
+        return [item for page in paginate(ec2, operation, result_key) for item in page]
+
+    items = []
+    for start in range(0, len(vpc_ids), FILTER_VALUE_LIMIT):
+        chunk = vpc_ids[start:start + FILTER_VALUE_LIMIT]
+        filters = [{'Name': filter_name, 'Values': chunk}]
+        for page in paginate(ec2, operation, result_key, **{filter_param: filters}):
+            items.extend(page)
+    return items
+
+
+@tool(
+    "Describe the full network topology of a region in one call: VPCs with their subnets, route tables, Internet Gateways, NAT Gateways and Network ACLs. Prefer this over calling the per-VPC tools one by one.",
+    group="topology",
+    params={"vpc_ids": "Only describe these VPC IDs. Omit to describe every VPC in the region."}
+)
+@cached("describe_region_network")
+def describe_region_network(region: str = "us-west-2", vpc_ids: Optional[List[str]] = None):
+    with ThreadPoolExecutor(max_workers=len(REGION_NETWORK_CALLS)) as executor:
+        futures = {call: executor.submit(_fetch_all, region, call, vpc_ids) for call in REGION_NETWORK_CALLS}
+        raw = {call: future.result() for call, future in futures.items()}
+
+    topology = {}
+    for vpc in raw['vpcs']:
+        vpc_data = _format_vpc(vpc)
+        vpc_data['CidrBlocks'] = [
+            assoc['CidrBlock'] for assoc in vpc.get('CidrBlockAssociationSet', [])
+            if assoc.get('CidrBlockState', {}).get('State') == 'associated'
+        ]
+        vpc_data['Ipv6CidrBlocks'] = [
+            assoc['Ipv6CidrBlock'] for assoc in vpc.get('Ipv6CidrBlockAssociationSet', [])
+            if assoc.get('Ipv6CidrBlockState', {}).get('State') == 'associated'
+        ]
+        vpc_data.update({
+            'subnets': [],
+            'routeTables': [],
+            'internetGateways': [],
+            'NatGateways': [],
+            'network_acls': []
+        })
+        topology[vpc['VpcId']] = vpc_data
+
+    for subnet in raw['subnets']:
+        if subnet['VpcId'] in topology:
+            topology[subnet['VpcId']]['subnets'].append(_format_subnet(subnet))
+    for rt in raw['route_tables']:
+        if rt['VpcId'] in topology:
+            topology[rt['VpcId']]['routeTables'].append(_format_route_table(rt))
+    for ig in raw['internet_gateways']:
+        for attachment in ig['Attachments']:
+            if attachment['VpcId'] in topology:
+                topology[attachment['VpcId']]['internetGateways'].append(_format_internet_gateway(ig, attachment['VpcId']))
+    for natgw in raw['nat_gateways']:
+        if natgw['VpcId'] in topology:
+            topology[natgw['VpcId']]['NatGateways'].append(_format_nat_gateway(natgw))
+    for nacl in raw['network_acls']:
+        if nacl['VpcId'] in topology:
+            topology[nacl['VpcId']]['network_acls'].append(_format_network_acl(nacl))
+
+    return {
+        'region': region,
+        'vpcs': list(topology.values())
+    }
+
+
+def _enabled_regions():
+    ec2 = get_client('ec2')
+    return sorted(region['RegionName'] for region in ec2.describe_regions()['Regions'])
+
+
+@tool(
+    "Find overlapping CIDRs between different VPCs across regions, e.g. before VPC peering or attaching VPCs to Cloud WAN. Checks every VPC CIDR (primary, secondary and IPv6) and optionally every subnet CIDR (IPv4 and IPv6). Returns the number of conflicts per region and VPC, and a table listing each conflicting pair once, up to max_conflicts rows.",
+    group="topology",
+    params={
+        "regions": "Regions to check. Omit to check every region enabled for the account.",
+        "include_subnets": "Also report overlapping subnets between VPCs. Defaults to true.",
+        "max_conflicts": "Maximum number of conflicting pairs to list. Defaults to 100; the counts per VPC always cover every conflict."
+    }
+)
+def find_cidr_overlaps(regions: Optional[List[str]] = None, include_subnets: bool = True,
+                       max_conflicts: int = DEFAULT_MAX_CONFLICTS):
+    regions = regions or _enabled_regions()
+    with ThreadPoolExecutor(max_workers=min(OVERLAP_REGION_WORKERS, len(regions))) as executor:
+        futures = {region: executor.submit(describe_region_network, region=region) for region in regions}
+
+    # One entry per CIDR: (region, vpc_id, kind, resource id, cidr) plus its integer bounds
+    entries = []
+    versions, starts, ends = [], [], []
+    errors = {}
+
+    def add(entry, cidr):
+        try:
+            version, start, prefixlen = parse_cidr(cidr)
+        except (ValueError, AttributeError):
+            return
+        entries.append(entry)
+        versions.append(version)
+        starts.append(start)
+        ends.append(start | ((1 << ((32 if version == 4 else 128) - prefixlen)) - 1))
+
+    for region, future in futures.items():
+        try:
+            topology = future.result()
+        except Exception as e:
+            errors[region] = str(e)
+            continue
+        for vpc in topology['vpcs']:
+            for cidr in (vpc['CidrBlocks'] or [vpc['CidrBlock']]) + vpc.get('Ipv6CidrBlocks', []):
+                add((region, vpc['VpcId'], 'vpc', vpc['VpcId'], cidr), cidr)
+            if include_subnets:
+                for subnet in vpc['subnets']:
+                    for cidr in ([subnet['CidrBlock']] if subnet.get('CidrBlock') else []) + subnet.get('Ipv6CidrBlocks', []):
+                        add((region, vpc['VpcId'], 'subnet', subnet['SubnetId'], cidr), cidr)
+
+    rows = []
+    vpc_counts = {}
+    conflict_count = 0
+    for first, second in iter_overlaps(versions, starts, ends):
+        a, b = entries[first], entries[second]
+        # Overlaps inside one VPC (its subnets within its CIDRs) are expected; only compare like with like
+        if (a[0], a[1]) == (b[0], b[1]) or a[2] != b[2]:
+            continue
+        conflict_count += 1
+        for own in (a, b):
+            counts = vpc_counts.setdefault(own[0], {})
+            counts[own[1]] = counts.get(own[1], 0) + 1
+        if len(rows) < max_conflicts:
+            rows.append([a[2], a[0], a[1], a[3], a[4], b[0], b[1], b[3], b[4]])
+
+    result = {
+        'regions': regions,
+        'cidrs_checked': len(entries),
+        'conflict_count': conflict_count,
+        'conflicts_per_vpc': vpc_counts,
+        'conflicts': {'columns': CONFLICT_COLUMNS, 'rows': rows}
+    }
+    if conflict_count > len(rows):
+        result['truncated'] = True
+    if errors:
+        result['errors'] = errors
+    return result
+
+
+topology_tools = registry.specs(group="topology")
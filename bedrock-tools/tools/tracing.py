@@ -0,0 +1,336 @@
+# tools/tracing.py
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Set TRACE_FILE to write spans as JSON lines, or TRACE_OTEL=true to send them to OpenTelemetry
+TRACE_FILE = os.environ.get("TRACE_FILE")
+TRACE_OTEL = os.environ.get("TRACE_OTEL", "false").lower() in ("1", "true", "yes")
+
+_exporters: List[Any] = []
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    A timed operation with attributes. Spans nest through a context variable, so a span started
+    while another is active (in the same thread, or in a task or thread started with a copied
+    context) becomes its child.
+    """
+
+    recording = True
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None, parent: Optional["Span"] = None):
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self._start_perf = time.perf_counter()
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def set_error(self, error: BaseException) -> None:
+        self.status = "error"
+        self.attributes["error"] = str(error)
+
+    def start(self) -> "Span":
+        for exporter in _exporters:
+            exporter.on_start(self)
+        return self
+
+    def end(self) -> None:
+        self.end_ns = self.start_ns + int((time.perf_counter() - self._start_perf) * 1e9)
+        for exporter in _exporters:
+            try:
+                exporter.on_end(self)
+            except Exception as e:
+                logger.error(f"Span exporter failed: {str(e)}")
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc is not None:
+            self.set_error(exc)
+        _current_span.reset(self._token)
+        self.end()
+        return False
+
+
+class _NoopSpan:
+    # Shared stand-in returned while tracing is disabled, so the hot path allocates nothing
+    recording = False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, attributes):
+        pass
+
+    def set_error(self, error):
+        pass
+
+    def end(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonLinesExporter:
+    """
+    Appends each finished span to a file as one JSON object per line.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span) -> None:
+        pass
+
+    def on_end(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+
+class OpenTelemetryExporter:
+    """
+    Mirrors spans into OpenTelemetry, keeping the parent/child structure.
+
+    Requires the opentelemetry-api package; the SDK, processors and OTLP exporter are configured
+    by the application as usual.
+    """
+
+    def __init__(self, tracer_name: str = "network-assistant"):
+        from opentelemetry import trace
+
+        self._trace = trace
+        self._tracer = trace.get_tracer(tracer_name)
+        self._lock = threading.Lock()
+        self._spans: Dict[str, Any] = {}
+
+    def on_start(self, span: Span) -> None:
+        context = None
+        if span.parent is not None:
+            with self._lock:
+                parent = self._spans.get(span.parent.span_id)
+            if parent is not None:
+                context = self._trace.set_span_in_context(parent)
+        otel_span = self._tracer.start_span(span.name, context=context, start_time=span.start_ns)
+        with self._lock:
+            self._spans[span.span_id] = otel_span
+
+    def on_end(self, span: Span) -> None:
+        with self._lock:
+            otel_span = self._spans.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            otel_span.set_attribute(key, value if isinstance(value, (str, bool, int, float)) else str(value))
+        if span.status == "error":
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, span.attributes.get("error")))
+        otel_span.end(end_time=span.end_ns)
+
+
+def tracing_enabled() -> bool:
+    return bool(_exporters)
+
+
+def add_exporter(exporter: Any) -> None:
+    """
+    Enable tracing with an additional span exporter.
+
+    Args:
+    exporter (Any): An object with on_start(span) and on_end(span) methods.
+    """
+    _exporters.append(exporter)
+
+
+def disable_tracing() -> None:
+    """
+    Remove every exporter; span() then returns the shared no-op span.
+    """
+    _exporters.clear()
+
+
+def span(name: str, **attributes) -> Any:
+    """
+    Start a span as a context manager, nested under the current span.
+
+    Args:
+    name (str): The span name (e.g., "bedrock.converse").
+    **attributes: Initial span attributes.
+
+    Returns:
+    Any: The span, or NOOP_SPAN when tracing is disabled.
+    """
+    if not _exporters:
+        return NOOP_SPAN
+    return Span(name, attributes, _current_span.get())
+
+
+def start_span(name: str, **attributes) -> Any:
+    """
+    Start a span that does not become the current span; the caller must call end() on it.
+    Used for spans that begin and end in different callbacks, such as botocore events.
+
+    Args:
+    name (str): The span name.
+    **attributes: Initial span attributes.
+
+    Returns:
+    Any: The started span, or NOOP_SPAN when tracing is disabled.
+    """
+    if not _exporters:
+        return NOOP_SPAN
+    return Span(name, attributes, _current_span.get()).start()
+
+
+@contextmanager
+def use_span(active_span: Any) -> Iterator[Any]:
+    """
+    Make a span from start_span() the current span for a block, without ending it.
+    Used to parent the spans of one step, such as a request, to a span that outlives the block.
+
+    Args:
+    active_span (Any): The span, or NOOP_SPAN.
+
+    Yields:
+    Any: The span.
+    """
+    if active_span is NOOP_SPAN:
+        yield active_span
+        return
+    token = _current_span.set(active_span)
+    try:
+        yield active_span
+    finally:
+        _current_span.reset(token)
+
+
+def traced(name: str) -> Callable:
+    """
+    Decorator that runs the function, or coroutine function, inside a span.
+
+    Args:
+    name (str): The span name.
+
+    Returns:
+    Callable: The decorator.
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not _exporters:
+                    return await func(*args, **kwargs)
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _exporters:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def install_client_tracing(client: Any, service: str, region: str) -> None:
+    """
+    Record a span for every API operation made by a boto3 client, with its retry count, HTTP
+    status and response size.
+
+    Args:
+    client (Any): The boto3 client.
+    service (str): The AWS service name.
+    region (str): The client's region.
+    """
+    def before_call(model, context, **kwargs):
+        if _exporters:
+            context["trace_span"] = start_span("aws." + model.name, **{"aws.service": service, "aws.region": region})
+
+    def after_call(http_response, parsed, context, **kwargs):
+        aws_span = context.pop("trace_span", None)
+        if aws_span is None:
+            return
+        metadata = parsed.get("ResponseMetadata", {})
+        aws_span.set_attributes({
+            "aws.retries": metadata.get("RetryAttempts", 0),
+            "http.status_code": metadata.get("HTTPStatusCode"),
+            # Content-Length rather than the body, which may be an unread event stream
+            "response_bytes": int(http_response.headers.get("Content-Length") or 0) if http_response is not None else 0
+        })
+        if "Error" in parsed:
+            aws_span.set_error(parsed["Error"].get("Code"))
+        aws_span.end()
+
+    def after_call_error(exception, context, **kwargs):
+        # Raised before a response was parsed (connection errors, timeouts, exhausted retries);
+        # after-call never fires, so the span must be ended here or it is never exported
+        aws_span = context.pop("trace_span", None)
+        if aws_span is None:
+            return
+        aws_span.set_error(exception)
+        aws_span.end()
+
+    client.meta.events.register("before-call", before_call)
+    client.meta.events.register("after-call", after_call)
+    client.meta.events.register("after-call-error", after_call_error)
+
+
+if TRACE_FILE:
+    add_exporter(JsonLinesExporter(TRACE_FILE))
+if TRACE_OTEL:
+    try:
+        add_exporter(OpenTelemetryExporter())
+    except ImportError:
+        logger.warning("TRACE_OTEL is set but opentelemetry-api is not installed; OpenTelemetry export is off")
@@ -1,19 +1,48 @@
-import boto3
+from .aws_clients import get_client, paginate
+from .result_cache import cached
+from .registry import registry, tool
+from .async_tools import make_async
+from .route_resolver import resolve
 
 
 
-def list_vpcs(region="us-west-2"):
-    ec2 = boto3.client('ec2', region_name=region)
-    response = ec2.describe_vpcs()
-    vpcs = [{'VpcId': vpc['VpcId'], 'CidrBlock': vpc['CidrBlock'], 'IsDefault': vpc['IsDefault']} for vpc in response['Vpcs']]
+def _format_vpc(vpc):
+    return {'VpcId': vpc['VpcId'], 'CidrBlock': vpc['CidrBlock'], 'IsDefault': vpc['IsDefault']}
+
+def _format_internet_gateway(ig, vpc_id):
+    return {
+        'InternetGatewayId': ig['InternetGatewayId'],
+        'AttachedToVpc': vpc_id in [att['VpcId'] for att in ig['Attachments']]
+    }
+
+def _format_nat_gateway(natgw):
+    return {
+        'NatGatewayId': natgw['NatGatewayId'],
+        'SubnetId': natgw['SubnetId'],
+        'State': natgw['State'],
+        'PublicIp': natgw['NatGatewayAddresses'][0]['PublicIp'] if natgw['NatGatewayAddresses'] else None
+    }
+
+def iter_vpcs(region="us-west-2"):
+    ec2 = get_client('ec2', region=region)
+    for page in paginate(ec2, 'describe_vpcs', 'Vpcs'):
+        yield [_format_vpc(vpc) for vpc in page]
+
+@tool("List VPCs in a specified AWS region", group="vpc")
+@cached("list_vpcs")
+def list_vpcs(region: str = "us-west-2"):
+    vpcs = [vpc for page in iter_vpcs(region) for vpc in page]
     return {
         'vpcs': vpcs,
         "region": region
     }
 
-def check_internet_gateway(vpc_id, region="us-west-2"):
-    ec2 = boto3.client('ec2', region_name=region)
-    response = ec2.describe_internet_gateways(
+def iter_internet_gateways(vpc_id, region="us-west-2"):
+    ec2 = get_client('ec2', region=region)
+    pages = paginate(
+        ec2,
+        'describe_internet_gateways',
+        'InternetGateways',
         Filters=[
             {
                 'Name': 'attachment.vpc-id',
@@ -21,20 +50,24 @@ def check_internet_gateway(vpc_id, region="us-west-2"):
             }
         ]
     )
-    internet_gateways = [
-        {
-            'InternetGatewayId': ig['InternetGatewayId'],
-            'AttachedToVpc': vpc_id in [att['VpcId'] for att in ig['Attachments']]
-        } for ig in response['InternetGateways']
-    ]
+    for page in pages:
+        yield [_format_internet_gateway(ig, vpc_id) for ig in page]
+
+@tool("Check Internet Gateway for a specified VPC", group="vpc")
+@cached("check_internet_gateway")
+def check_internet_gateway(vpc_id: str, region: str = "us-west-2"):
+    internet_gateways = [ig for page in iter_internet_gateways(vpc_id, region) for ig in page]
     return {
         'vpc_id': vpc_id,
         'internetGateways': internet_gateways
     }
 
-def check_nat_gateway(vpc_id, region="us-west-2"):
-    ec2 = boto3.client('ec2', region_name=region)
-    response = ec2.describe_nat_gateways(
+def iter_nat_gateways(vpc_id, region="us-west-2"):
+    ec2 = get_client('ec2', region=region)
+    pages = paginate(
+        ec2,
+        'describe_nat_gateways',
+        'NatGateways',
         Filters=[
             {
                 'Name': 'vpc-id',
@@ -42,22 +75,51 @@ def check_nat_gateway(vpc_id, region="us-west-2"):
             }
         ]
     )
-    nat_gateways = [
-        {
-            'NatGatewayId': natgw['NatGatewayId'],
-            'SubnetId': natgw['SubnetId'],
-            'State': natgw['State'],
-            'PublicIp': natgw['NatGatewayAddresses'][0]['PublicIp'] if natgw['NatGatewayAddresses'] else None
-        } for natgw in response['NatGateways']
-    ]
+    for page in pages:
+        yield [_format_nat_gateway(natgw) for natgw in page]
+
+@tool("Check NAT Gateway for a specified VPC", group="vpc")
+@cached("check_nat_gateway")
+def check_nat_gateway(vpc_id: str, region: str = "us-west-2"):
+    nat_gateways = [natgw for page in iter_nat_gateways(vpc_id, region) for natgw in page]
     return {
         'vpc_id': vpc_id,
         'NatGateways': nat_gateways
     }
 
-def get_route_tables(vpc_id, region="us-west-2"):
-    ec2 = boto3.client('ec2', region_name=region)
-    response = ec2.describe_route_tables(
+def _format_route_table(rt):
+    routes = []
+    for route in rt['Routes']:
+        route_data = {
+            'DestinationCidrBlock': route.get('DestinationCidrBlock'),
+            'DestinationIpv6CidrBlock': route.get('DestinationIpv6CidrBlock'),
+            'DestinationPrefixListId': route.get('DestinationPrefixListId'),
+            'GatewayId': route.get('GatewayId'),
+            'NatGatewayId': route.get('NatGatewayId'),
+            'TransitGatewayId': route.get('TransitGatewayId'),
+            'EgressOnlyInternetGatewayId': route.get('EgressOnlyInternetGatewayId'),
+            'InstanceId': route.get('InstanceId'),
+            'VpcPeeringConnectionId': route.get('VpcPeeringConnectionId'),
+            'NetworkInterfaceId': route.get('NetworkInterfaceId'),
+            'CoreNetworkArn': route.get('CoreNetworkArn'),
+            'State': route.get('State'),
+            'Origin': route.get('Origin')
+        }
+        routes.append({k: v for k, v in route_data.items() if v is not None})
+
+    return {
+        'RouteTableId': rt['RouteTableId'],
+        'IsMain': any(assoc['Main'] for assoc in rt.get('Associations', [])),
+        'SubnetIds': [assoc['SubnetId'] for assoc in rt.get('Associations', []) if assoc.get('SubnetId')],
+        'Routes': routes
+    }
+
+def iter_route_tables(vpc_id, region="us-west-2"):
+    ec2 = get_client('ec2', region=region)
+    pages = paginate(
+        ec2,
+        'describe_route_tables',
+        'RouteTables',
         Filters=[
             {
                 'Name': 'vpc-id',
@@ -65,122 +127,59 @@ def get_route_tables(vpc_id, region="us-west-2"):
             }
         ]
     )
-    route_tables = []
-    for rt in response['RouteTables']:
-        routes = []
-        for route in rt['Routes']:
-            route_data = {
-                'DestinationCidrBlock': route.get('DestinationCidrBlock'),
-                'GatewayId': route.get('GatewayId'),
-                'NatGatewayId': route.get('NatGatewayId'),
-                'InstanceId': route.get('InstanceId'),
-                'VpcPeeringConnectionId': route.get('VpcPeeringConnectionId'),
-                'NetworkInterfaceId': route.get('NetworkInterfaceId')
-            }
-            routes.append({k: v for k, v in route_data.items() if v is not None})
-        
-        route_tables.append({
-            'RouteTableId': rt['RouteTableId'],
-            'IsMain': any(assoc['Main'] for assoc in rt.get('Associations', [])),
-            'Routes': routes
-        })
-    
+    for page in pages:
+        yield [_format_route_table(rt) for rt in page]
+
+@tool("Get route tables for a specified VPC", group="vpc")
+@cached("get_route_tables")
+def get_route_tables(vpc_id: str, region: str = "us-west-2"):
+    route_tables = [rt for page in iter_route_tables(vpc_id, region) for rt in page]
     return {
         'vpc_id': vpc_id,
         'routeTables': route_tables
     }
 
+@cached("prefix_list_cidrs")
+def get_prefix_list_cidrs(prefix_list_id, region="us-west-2"):
+    ec2 = get_client('ec2', region=region)
+    try:
+        pages = paginate(ec2, 'get_managed_prefix_list_entries', 'Entries', PrefixListId=prefix_list_id)
+        return [entry['Cidr'] for page in pages for entry in page]
+    except Exception:
+        # AWS-managed prefix lists (e.g. for S3 gateway endpoints) are only readable through describe_prefix_lists
+        response = ec2.describe_prefix_lists(PrefixListIds=[prefix_list_id])
+        return [cidr for prefix_list in response['PrefixLists'] for cidr in prefix_list['Cidrs']]
 
-vpc_tools = [
-    {
-        "toolSpec": {
-            "name": "list_vpcs",
-            "description": "List VPCs in a specified AWS region",
-            "inputSchema": {
-                "json": {
-                    "type": "object",
-                    "properties": {
-                        "region": {"type": "string", "description": "AWS region (e.g., us-west-2)"}
-                    }
-                }
-            }
-        }
-    },
-    {
-        "toolSpec": {
-            "name": "check_internet_gateway",
-            "description": "Check Internet Gateway for a specified VPC",
-            "inputSchema": {
-                "json": {
-                    "type": "object",
-                    "properties": {
-                        "vpc_id": {"type": "string", "description": "VPC ID"},
-                        "region": {"type": "string", "description": "AWS region (e.g., us-west-2)"}
-                    },
-                    "required": ["vpc_id"]
-                }
-            }
-        }
-    },
-    {
-        "toolSpec": {
-            "name": "check_nat_gateway",
-            "description": "Check NAT Gateway for a specified VPC",
-            "inputSchema": {
-                "json": {
-                    "type": "object",
-                    "properties": {
-                        "vpc_id": {"type": "string", "description": "VPC ID"},
-                        "region": {"type": "string", "description": "AWS region (e.g., us-west-2)"}
-                    },
-                    "required": ["vpc_id"]
-                }
-            }
-        }
-    },
-    {
-        "toolSpec": {
-            "name": "get_route_tables",
-            "description": "Get route tables for a specified VPC",
-            "inputSchema": {
-                "json": {
-                    "type": "object",
-                    "properties": {
-                        "vpc_id": {"type": "string", "description": "VPC ID"},
-                        "region": {"type": "string", "description": "AWS region (e.g., us-west-2)"}
-                    },
-                    "required": ["vpc_id"]
-                }
-            }
-        }
-    }
-]
-
-
-def handle_vpc_tool(tool_use):
-    tool_name = tool_use['name']
-    input_data = tool_use['input']
-    
-    if tool_name == "list_vpcs":
-        result = list_vpcs(region=input_data.get('region', 'us-west-2'))
-    elif tool_name == "check_internet_gateway":
-        result = check_internet_gateway(input_data['vpc_id'], region=input_data.get('region', 'us-west-2'))
-    elif tool_name == "check_nat_gateway":
-        result = check_nat_gateway(input_data['vpc_id'], region=input_data.get('region', 'us-west-2'))
-    elif tool_name == "get_route_tables":
-        result = get_route_tables(input_data['vpc_id'], region=input_data.get('region', 'us-west-2'))
-    else:
-        result = {"error": f"Unknown VPC tool: {tool_name}"}
+@cached("subnet_vpc")
+def get_subnet_vpc(subnet_id, region="us-west-2"):
+    ec2 = get_client('ec2', region=region)
+    return ec2.describe_subnets(SubnetIds=[subnet_id])['Subnets'][0]['VpcId']
 
-    return {
-        "role": "user",
-        "content": [
-            {
-                "toolResult": {
-                    "toolUseId": tool_use['toolUseId'],
-                    "content": [{"json": result}],
-                    "status": "success"
-                }
-            }
-        ]
-    }
+def _load_prefix_list(prefix_list_id, region):
+    try:
+        return get_prefix_list_cidrs(prefix_list_id, region)
+    except Exception:
+        return None
+
+@tool(
+    "Resolve where traffic from a subnet to a destination IP is routed, using longest-prefix match over the subnet's route table (IPv4, IPv6 and prefix-list routes). Returns the route table, the matching route and its target. Prefer this over reading get_route_tables output to work out a route.",
+    group="vpc",
+    params={"destination_ip": "The destination IPv4 or IPv6 address (e.g., 10.1.2.3)."}
+)
+def resolve_route(subnet_id: str, destination_ip: str, region: str = "us-west-2"):
+    vpc_id = get_subnet_vpc(subnet_id, region)
+    route_tables = get_route_tables(vpc_id, region)['routeTables']
+    result = resolve(route_tables, subnet_id, destination_ip, lambda prefix_list_id: _load_prefix_list(prefix_list_id, region))
+    result['vpc_id'] = vpc_id
+    return result
+
+
+# asyncio variants for servers that run many sessions on one event loop
+alist_vpcs = make_async(list_vpcs)
+acheck_internet_gateway = make_async(check_internet_gateway)
+acheck_nat_gateway = make_async(check_nat_gateway)
+aget_route_tables = make_async(get_route_tables)
+aresolve_route = make_async(resolve_route)
+
+
+vpc_tools = registry.specs(group="vpc")
@@ -1,7 +1,11 @@
 import os
 import json
+import time
+import random
 import boto3
 
+from concurrent.futures import ThreadPoolExecutor
+
 from dotenv import load_dotenv
 
 from pprint import pprint
@@ -25,27 +29,29 @@ boto3.setup_default_session(
 
 network_manager = boto3.client('networkmanager')
 
+ROUTE_FETCH_WORKERS = 8
+ROUTE_FETCH_MAX_RETRIES = 5
+THROTTLING_ERROR_CODES = ('ThrottlingException', 'TooManyRequestsException', 'RequestLimitExceeded')
+
 def get_global_networks():
-    response = network_manager.describe_global_networks()
-    return response['GlobalNetworks']
+    paginator = network_manager.get_paginator('describe_global_networks')
+    return [network for page in paginator.paginate() for network in page['GlobalNetworks']]
 
 def get_core_networks():
-    response = network_manager.list_core_networks()
-    return response['CoreNetworks']
+    paginator = network_manager.get_paginator('list_core_networks')
+    return [network for page in paginator.paginate() for network in page['CoreNetworks']]
 
 def get_core_network_details(core_network_id):
     response = network_manager.get_core_network(CoreNetworkId=core_network_id)
     return response['CoreNetwork']
 
 def get_valid_segment_edge_combinations(core_network_id):
+    # Only the edge locations each segment is actually present at
     core_network = get_core_network_details(core_network_id)
     valid_combinations = []
-    segments = [segment['Name'] for segment in core_network.get('Segments', [])]
-    edge_locations = [edge['EdgeLocation'] for edge in core_network.get('Edges', [])]
-    
-    for segment in segments:
-        for edge_location in edge_locations:
-            valid_combinations.append((segment, edge_location))
+    for segment in core_network.get('Segments', []):
+        for edge_location in segment.get('EdgeLocations', []):
+            valid_combinations.append((segment['Name'], edge_location))
     
     return valid_combinations
 
@@ -90,25 +96,44 @@ def get_routes_for_segment_and_location(global_network_id, core_network_id, segm
     except network_manager.exceptions.ValidationException:
         return []
 
+def get_routes_with_backoff(global_network_id, core_network_id, segment_name, edge_location):
+    for attempt in range(ROUTE_FETCH_MAX_RETRIES + 1):
+        try:
+            return get_routes_for_segment_and_location(global_network_id, core_network_id, segment_name, edge_location)
+        except network_manager.exceptions.ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in THROTTLING_ERROR_CODES or attempt == ROUTE_FETCH_MAX_RETRIES:
+                raise
+            time.sleep(random.uniform(0, min(10.0, 0.5 * (2 ** attempt))))
+
 def get_all_routes_for_core_network(global_network_id, core_network_id):
+    # Fetch every (segment, edge) route table concurrently and join them into one columnar table
     valid_combinations = get_valid_segment_edge_combinations(core_network_id)
-    all_routes = []
-    
-    for segment_name, edge_location in valid_combinations:
-        routes = get_routes_for_segment_and_location(
-            global_network_id,
-            core_network_id,
-            segment_name,
-            edge_location
-        )
-        for route in routes:
-            all_routes.append({
-                'segment': segment_name,
-                'edge_location': edge_location,
-                'route': route
-            })
-    
-    return all_routes
+    rows = []
+
+    with ThreadPoolExecutor(max_workers=ROUTE_FETCH_WORKERS) as executor:
+        futures = [
+            (segment_name, edge_location, executor.submit(get_routes_with_backoff, global_network_id, core_network_id, segment_name, edge_location))
+            for segment_name, edge_location in valid_combinations
+        ]
+        for segment_name, edge_location, future in futures:
+            for route in future.result():
+                rows.append([
+                    segment_name,
+                    edge_location,
+                    route.get('DestinationCidrBlock') or route.get('PrefixListId'),
+                    route.get('State'),
+                    route.get('Type'),
+                    [
+                        destination.get('CoreNetworkAttachmentId') or destination.get('ResourceId') or destination.get('TransitGatewayAttachmentId')
+                        for destination in route.get('Destinations', [])
+                    ]
+                ])
+
+    rows.sort(key=lambda row: (row[0], row[1], row[2] or ''))
+    return {
+        'columns': ['segment', 'edge_location', 'prefix', 'state', 'type', 'destinations'],
+        'rows': rows
+    }
 
 def lambda_handler(event, context):
     global_networks = get_global_networks()
@@ -0,0 +1,134 @@
+"""
+Concurrent multi-region fan-out for the account scan scripts.
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_RETRIES = 5
+BASE_BACKOFF_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 20.0
+
+THROTTLING_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "RequestThrottled",
+    "SlowDown",
+}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(service: str, region: str = None):
+    """
+    Returns a shared client for a service and region.
+
+    Clients use botocore's adaptive retry mode, which rate-limits on the client side once
+    the service starts throttling, and a connection pool large enough for the fan-out.
+
+    Args:
+    service (str):  The AWS service name (e.g. "ec2")
+    region (str):   The AWS region, or None for the default region
+
+    Returns:
+    object:         A boto3 client
+    """
+    key = (service, region)
+    with _clients_lock:
+        if key not in _clients:
+            config = Config(
+                retries={"mode": "adaptive", "max_attempts": 10},
+                max_pool_connections=DEFAULT_MAX_WORKERS * 4,
+            )
+            _clients[key] = boto3.client(service, region_name=region, config=config)
+        return _clients[key]
+
+
+def get_all_regions() -> list:
+    """
+    Gets all available AWS regions.
+
+    Returns:
+    list:           A list containing the name of each region as a string
+    """
+    ec2 = get_client("ec2")
+    return [region["RegionName"] for region in ec2.describe_regions()["Regions"]]
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Full-jitter exponential backoff delay for a retry attempt.
+
+    Args:
+    attempt (int):  The retry attempt, starting at 0
+
+    Returns:
+    float:          Seconds to sleep before retrying
+    """
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * (2 ** attempt)))
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """
+    Checks whether an exception is an AWS throttling error.
+    """
+    return isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+def _run_region(func, region, max_retries):
+    start = time.perf_counter()
+    retries = 0
+    while True:
+        try:
+            result = func(region)
+            return {"result": result, "error": None, "seconds": time.perf_counter() - start, "retries": retries}
+        except Exception as e:
+            if is_throttling_error(e) and retries < max_retries:
+                time.sleep(backoff_delay(retries))
+                retries += 1
+                continue
+            return {"result": None, "error": str(e), "seconds": time.perf_counter() - start, "retries": retries}
+
+
+def run_in_regions(func, regions: list, max_workers: int = DEFAULT_MAX_WORKERS, max_retries: int = DEFAULT_MAX_RETRIES, timeout: float = None) -> dict:
+    """
+    Runs func(region) for every region concurrently.
+
+    Throttling errors are retried with jittered exponential backoff on top of the client's own
+    adaptive retries. Any other exception is captured for that region instead of stopping the scan.
+
+    Args:
+    func (callable):        Function taking a region name and returning that region's result
+    regions (list):         The regions to run in
+    max_workers (int):      Maximum number of regions processed at the same time
+    max_retries (int):      Maximum throttling retries per region
+    timeout (float):        Seconds to wait for the whole scan; unfinished regions report a timeout
+
+    Returns:
+    dict:                   Region name mapped to a dictionary with:
+        - 'result':         The value returned by func, or None on failure
+        - 'error':          The error message, or None on success
+        - 'seconds':        Wall-clock time spent on the region
+        - 'retries':        Number of throttling retries
+    """
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {executor.submit(_run_region, func, region, max_retries): region for region in regions}
+    done, not_done = wait(futures, timeout=timeout)
+    for future in done:
+        results[futures[future]] = future.result()
+    for future in not_done:
+        future.cancel()
+        results[futures[future]] = {"result": None, "error": f"timed out after {timeout}s", "seconds": timeout, "retries": 0}
+    executor.shutdown(wait=False)
+    return {region: results[region] for region in regions}
@@ -1,53 +1,91 @@
 """
 GET EC2 Instance SGs
 """
-import boto3
+from botocore.exceptions import ClientError
+
+from fanout import get_all_regions, get_client, run_in_regions
+
+
+# Security group IDs resolved per describe_security_groups call
+SG_BATCH_SIZE = 200
+
 
 def main():
     regions = get_all_regions()
+    scans = run_in_regions(scan_region, regions)
     for region in regions:
-        print("Region: " + region)
-        instances = get_all_instances(region)
-        for instance in instances:
-            instance_id = instance['Instances'][0]['InstanceId']
-            sg_ids = get_instance_sg(instance_id, region)
+        scan = scans[region]
+        print("Region: " + region + " ({:.2f}s, {} retries)".format(scan['seconds'], scan['retries']))
+        if scan['error']:
+            print("Error: " + scan['error'])
+            print("\n")
+            continue
+        index = scan['result']
+        for instance_id, sg_ids in index['instances'].items():
             for sg_id in sg_ids:
-                sg_rules = get_sg_rules(sg_id['GroupId'], region)
-                print("Instance: " + instance_id + " SG: " + sg_id['GroupId'])
-                for rule in sg_rules['SecurityGroups'][0]['IpPermissions']:
+                print("Instance: " + instance_id + " SG: " + sg_id)
+                for rule in index['security_groups'].get(sg_id, {}).get('IpPermissions', []):
                     print(rule)
                 print("\n")
         print("\n")
     return 0
 
 
-# Get a list all regions
-def get_all_regions():
-    ec2 = boto3.client('ec2')
-    regions = []
-    for region in ec2.describe_regions()['Regions']:
-        regions.append(region['RegionName'])
-    return regions
+# Build a deduplicated instance -> SG -> rules index for a region.
+# Each security group is fetched once, however many instances share it.
+def scan_region(region):
+    instances = get_all_instances(region)
+    instance_sgs = {instance['InstanceId']: get_instance_sg(instance) for instance in instances}
+    unique_sg_ids = sorted({sg_id for sg_ids in instance_sgs.values() for sg_id in sg_ids})
+    return {
+        'instances': instance_sgs,
+        'security_groups': get_sg_rules(unique_sg_ids, region)
+    }
 
 # Get a list of all instances in a region
 def get_all_instances(region):
-    ec2 = boto3.client('ec2', region_name=region)
-    instances = ec2.describe_instances()['Reservations']
+    ec2 = get_client('ec2', region)
+    paginator = ec2.get_paginator('describe_instances')
+    instances = []
+    for page in paginator.paginate():
+        for reservation in page['Reservations']:
+            instances.extend(reservation['Instances'])
     return instances
 
-# Get a list of all security groups attached to an instance
-def get_instance_sg(instance_id, region):
-    ec2 = boto3.client(service_name='ec2', region_name=region)
-    instance_details = ec2.describe_instances(InstanceIds=[instance_id])
-    security_group_ids = instance_details['Reservations'][0]['Instances'][0]['SecurityGroups']
-    return security_group_ids
-
-# Get a list of rules in a security group
-def get_sg_rules(security_group_id, region):
-    ec2 = boto3.client(service_name='ec2', region_name=region)
-    sg_rules = ec2.describe_security_groups(GroupIds=[security_group_id])
+# Get the IDs of the security groups attached to an instance, from its describe_instances data
+def get_instance_sg(instance):
+    return [sg['GroupId'] for sg in instance.get('SecurityGroups', [])]
+
+# Get the rules of many security groups with batched describe_security_groups calls
+def get_sg_rules(security_group_ids, region):
+    ec2 = get_client('ec2', region)
+    sg_rules = {}
+    for start in range(0, len(security_group_ids), SG_BATCH_SIZE):
+        describe_sg_batch(ec2, security_group_ids[start:start + SG_BATCH_SIZE], sg_rules)
     return sg_rules
 
+# Describe one batch of security groups into sg_rules.
+# A group deleted since describe_instances fails the whole call with InvalidGroup.NotFound,
+# so the batch is split in half until the missing IDs are isolated and skipped.
+def describe_sg_batch(ec2, batch, sg_rules):
+    paginator = ec2.get_paginator('describe_security_groups')
+    try:
+        pages = list(paginator.paginate(GroupIds=batch))
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') != 'InvalidGroup.NotFound':
+            raise
+        if len(batch) > 1:
+            middle = len(batch) // 2
+            describe_sg_batch(ec2, batch[:middle], sg_rules)
+            describe_sg_batch(ec2, batch[middle:], sg_rules)
+        return
+    for page in pages:
+        for sg in page['SecurityGroups']:
+            sg_rules[sg['GroupId']] = {
+                'GroupName': sg.get('GroupName'),
+                'IpPermissions': sg.get('IpPermissions', []),
+                'IpPermissionsEgress': sg.get('IpPermissionsEgress', [])
+            }
 
 if __name__ == "__main__":
     main()
@@ -1,34 +1,29 @@
-import boto3
 from pprint import pprint
 
+from fanout import get_all_regions, get_client, run_in_regions
+
 
 def main():
     regions = get_all_regions()
-    
-    # Get a list of all unallocated IP addresses in each region
+
+    # Find the unallocated IP addresses of all regions concurrently
+    scans = run_in_regions(get_unallocated_ids, regions)
+
     for region in regions:
-        for id in get_unallocated_ids(region):
+        scan = scans[region]
+        if scan['error']:
+            print(f"Could not scan region {region}: {scan['error']}")
+            continue
+        for id in scan['result']:
             result = input(f"Do you want to remove {id} from region {region}? (y/n) ")
             if result.lower() == "y" or result.lower() == "yes":
                 pprint(remove_unassigned_ips(region, id))
             else:
                 continue
 
-def get_all_regions() -> list:
-    """
-    Gets all available AWS regions.
-
-    Args:
-    None:           This function takes no arguments.
-    
-    Returns:
-    list:           A list containing the name of each region as a string
-    """
-    ec2 = boto3.client('ec2')
-    regions = []
-    for region in ec2.describe_regions()['Regions']:
-        regions.append(region['RegionName'])
-    return regions
+    print("\nScan time per region:")
+    for region in regions:
+        print(f"{region}: {scans[region]['seconds']:.2f}s ({scans[region]['retries']} retries)")
 
 def get_unallocated_ids(region: str) -> list:
     """
@@ -40,7 +35,7 @@ def get_unallocated_ids(region: str) -> list:
     Returns: 
     list:           A list containing the allocation IDs of any unassociated EIPs  
     """
-    ec2 = boto3.client('ec2', region_name=region)
+    ec2 = get_client('ec2', region)
     response = ec2.describe_addresses()
 
     unallocated_ids = []
@@ -64,7 +59,7 @@ def remove_unassigned_ips(region: str, allocated_id: str) -> dict:
         - 'status':         'removed' and 'id': allocation_id if successful  
         - 'status':         'failed', 'id': allocation_id, 'message': error if failed
     """
-    ec2 = boto3.client('ec2', region_name=region)
+    ec2 = get_client('ec2', region)
     
     try:
         ec2.release_address(AllocationId=allocated_id)
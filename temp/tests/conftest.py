@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+# The scripts import fanout as a top-level module, as when they are run from temp/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# moto needs a region and credentials but never checks them
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+
+@pytest.fixture
+def aws():
+    """
+    Run the test inside a fresh moto account, with no shared clients left from other tests.
+    """
+    moto = pytest.importorskip("moto")
+    import fanout
+
+    with moto.mock_aws():
+        fanout._clients.clear()
+        yield
+    fanout._clients.clear()
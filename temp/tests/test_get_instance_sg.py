@@ -0,0 +1,74 @@
+import boto3
+
+import get_instance_sg
+from fanout import get_client
+
+REGION = "us-east-1"
+
+
+def _create_groups(count):
+    ec2 = boto3.client("ec2", region_name=REGION)
+    vpc_id = ec2.create_vpc(CidrBlock="10.0.0.0/16")["Vpc"]["VpcId"]
+    group_ids = []
+    for i in range(count):
+        group_id = ec2.create_security_group(GroupName=f"sg-{i}", Description="test", VpcId=vpc_id)["GroupId"]
+        ec2.authorize_security_group_ingress(GroupId=group_id, IpPermissions=[
+            {"IpProtocol": "tcp", "FromPort": 443, "ToPort": 443, "IpRanges": [{"CidrIp": f"10.{i}.0.0/16"}]}])
+        group_ids.append(group_id)
+    return group_ids
+
+
+def _count_describe_calls():
+    calls = []
+    get_client("ec2", REGION).meta.events.register(
+        "before-parameter-build.ec2.DescribeSecurityGroups", lambda params, **kwargs: calls.append(params["GroupIds"]))
+    return calls
+
+
+def test_get_sg_rules_batches_ids(aws, monkeypatch):
+    monkeypatch.setattr(get_instance_sg, "SG_BATCH_SIZE", 2)
+    group_ids = sorted(_create_groups(5))
+    calls = _count_describe_calls()
+
+    rules = get_instance_sg.get_sg_rules(group_ids, REGION)
+
+    assert [len(batch) for batch in calls] == [2, 2, 1]
+    assert sorted(rules) == group_ids
+    for group_id in group_ids:
+        assert rules[group_id]["GroupName"].startswith("sg-")
+        assert rules[group_id]["IpPermissions"][0]["FromPort"] == 443
+
+
+def test_get_sg_rules_skips_missing_group(aws, monkeypatch):
+    monkeypatch.setattr(get_instance_sg, "SG_BATCH_SIZE", 4)
+    group_ids = _create_groups(5)
+    missing = "sg-0123456789abcdef0"
+    calls = _count_describe_calls()
+
+    rules = get_instance_sg.get_sg_rules(group_ids[:2] + [missing] + group_ids[2:], REGION)
+
+    assert sorted(rules) == sorted(group_ids)
+    # The failing batch of four is split until the missing ID is isolated; the last batch is unaffected
+    assert calls == [
+        group_ids[:2] + [missing, group_ids[2]],
+        group_ids[:2],
+        [missing, group_ids[2]],
+        [missing],
+        [group_ids[2]],
+        group_ids[3:],
+    ]
+
+
+def test_scan_region_indexes_instances(aws):
+    ec2 = boto3.client("ec2", region_name=REGION)
+    group_ids = _create_groups(2)
+    image_id = ec2.describe_images(Owners=["amazon"])["Images"][0]["ImageId"]
+    subnet_id = ec2.create_subnet(VpcId=ec2.describe_security_groups(GroupIds=group_ids[:1])["SecurityGroups"][0]["VpcId"],
+                                  CidrBlock="10.0.1.0/24")["Subnet"]["SubnetId"]
+    ec2.run_instances(ImageId=image_id, MinCount=2, MaxCount=2, SubnetId=subnet_id, SecurityGroupIds=group_ids)
+
+    index = get_instance_sg.scan_region(REGION)
+
+    assert len(index["instances"]) == 2
+    assert all(sorted(sg_ids) == sorted(group_ids) for sg_ids in index["instances"].values())
+    assert sorted(index["security_groups"]) == sorted(group_ids)
@@ -0,0 +1,17 @@
+import boto3
+
+from get_remove_unassociated_eip import get_unallocated_ids, remove_unassigned_ips
+
+REGION = "us-east-1"
+
+
+def test_find_and_release_unassociated_addresses(aws):
+    ec2 = boto3.client("ec2", region_name=REGION)
+    allocation_ids = [ec2.allocate_address(Domain="vpc")["AllocationId"] for _ in range(2)]
+
+    assert sorted(get_unallocated_ids(REGION)) == sorted(allocation_ids)
+    assert remove_unassigned_ips(REGION, allocation_ids[0]) == {"status": "removed", "id": allocation_ids[0]}
+    assert get_unallocated_ids(REGION) == allocation_ids[1:]
+
+    failed = remove_unassigned_ips(REGION, "eipalloc-00000000")
+    assert failed["status"] == "failed" and failed["id"] == "eipalloc-00000000" and failed["message"]